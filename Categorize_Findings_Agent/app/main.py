@@ -2,18 +2,62 @@ from fastapi import FastAPI
 from app.utils import (
     CategorizationRequest,
     CategorizationResponse,
-    categorize_findings
+    BatchCategorizationRequest,
+    BatchCategorizationResponse,
+    categorize_findings,
+    categorize_findings_batch,
+    warm_up_llm
 )
+from agent_common.llm_cache import llm_cache
+from agent_common.limiter import llm_limiter
+from agent_common.singleflight import inflight_calls
+from agent_common.deadline import DeadlineMiddleware
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
 
 app = FastAPI(
     title="Categorization API",
     version="1.0",
     description="API to categorize competitor findings based on search results using an LLM."
 )
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "categorize-findings")
+app.add_middleware(DeadlineMiddleware)
+add_warmup(app, [("llm_client", warm_up_llm)])
 
 @app.post("/categorize", response_model=CategorizationResponse)
-def categorize(request: CategorizationRequest):
+async def categorize(request: CategorizationRequest):
     # Convert the search results (Pydantic models) to dictionaries
     search_results_dict = [result.model_dump() for result in request.search_results]
-    results = categorize_findings(request.competitor, search_results_dict)
+    results = await categorize_findings(request.competitor, search_results_dict)
     return results
+
+@app.post("/categorize/batch", response_model=BatchCategorizationResponse)
+async def categorize_batch(request: BatchCategorizationRequest):
+    items = [
+        (item.competitor, [result.model_dump() for result in item.search_results])
+        for item in request.items
+    ]
+    return {"results": await categorize_findings_batch(items, request.token_budget)}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return llm_cache.stats()
+
+@app.delete("/cache/{competitor}")
+async def invalidate_cache(competitor: str):
+    # Forget cached categorizations for a competitor, e.g. after its sources changed
+    return {"competitor": competitor, "invalidated": await llm_cache.ainvalidate(competitor)}
+
+@app.get("/load")
+def load():
+    # In-flight and queued model calls, for autoscaling
+    return llm_limiter.stats()
+
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    # "coalesced" counts model calls that joined an identical prompt already in flight
+    return inflight_calls.stats()
@@ -1,11 +1,14 @@
+import asyncio
 import os
-import json
-import re
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from langchain_sambanova import ChatSambaNovaCloud
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from agent_common.llm_cache import llm_cache, make_cache_key
+from agent_common.singleflight import inflight_calls
+from agent_common.structured_output import invoke_structured
+from agent_common.instrumentation import warning_log
 
 # Load environment variables
 load_dotenv()
@@ -14,17 +17,44 @@ MODEL = "Meta-Llama-3.3-70B-Instruct"
 MAX_TOKENS = 2000
 TEMPERATURE = 0.7
 TOP_P = 0.01
+SAMPLING_PARAMS = {"max_tokens": MAX_TOKENS, "temperature": TEMPERATURE, "top_p": TOP_P}
+
+# Batch categorization: several competitors share one prompt up to a token budget
+BATCH_TOKEN_BUDGET = int(os.getenv("BATCH_TOKEN_BUDGET", 6000))  # Estimated prompt tokens per batched call
+BATCH_MAX_COMPETITORS = int(os.getenv("BATCH_MAX_COMPETITORS", 5))  # Bounded so the answer fits BATCH_MAX_TOKENS
+BATCH_MAX_TOKENS = int(os.getenv("BATCH_MAX_TOKENS", 8000))
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", 4))
+BATCH_SAMPLING_PARAMS = {**SAMPLING_PARAMS, "max_tokens": BATCH_MAX_TOKENS}
 
 if not MODEL:
     raise Exception("Missing required environment variable: MODEL")
 
-# Initialize SambaNova client
-llm = ChatSambaNovaCloud(
-    model=MODEL,
-    max_tokens=int(MAX_TOKENS),
-    temperature=float(TEMPERATURE),
-    top_p=float(TOP_P)
-)
+# SambaNova clients are built on first use (or by the startup warm-up), which keeps
+# the SDK import off the cold-start path
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_sambanova import ChatSambaNovaCloud
+    return ChatSambaNovaCloud(
+        model=MODEL,
+        max_tokens=int(MAX_TOKENS),
+        temperature=float(TEMPERATURE),
+        top_p=float(TOP_P)
+    )
+
+# Same model with room for several competitors' answers
+@lru_cache(maxsize=None)
+def get_batch_llm():
+    from langchain_sambanova import ChatSambaNovaCloud
+    return ChatSambaNovaCloud(
+        model=MODEL,
+        max_tokens=int(BATCH_MAX_TOKENS),
+        temperature=float(TEMPERATURE),
+        top_p=float(TOP_P)
+    )
+
+def warm_up_llm():
+    get_llm()
+    get_batch_llm()
 
 # Prompt template for competitor analysis
 categorization_prompt_template = """
@@ -55,37 +85,166 @@ Return JSON with:
 }}
 """
 
-def categorize_findings(competitor: str, search_results: List[Dict]) -> Dict:
+# Prompt template for analysing several competitors in one call
+batch_categorization_prompt_template = """
+Analyze each of the following competitors based on its own search results.
+
+{competitorSections}
+
+Key Analysis Points (for every competitor):
+- Core capabilities and technologies
+- Unique technological approaches and innovations
+- Unique selling points and target market segments
+- Recent innovations, strengths, and weaknesses
+- Company's capabilities and overall market positioning
+- Key products/services offered
+- Potential challenges and market hurdles
+- Business strategies and future vision
+
+Provide concise, actionable insights about each competitor.
+
+Return JSON with one entry per competitor, keyed by the competitor name exactly as given above:
+{{
+  "results": {{
+    "<competitor name>": {{
+      "key_insights": ["Detailed insights for the competitor"],
+      "unique_capabilities": ["Standout features and strengths"],
+      "unique_selling_points": ["Unique selling points and target market segments"],
+      "recent_innovations": ["Recent innovations, strengths, and weaknesses"],
+      "market_positioning": ["Overall market positioning, capabilities and differentiators"],
+      "challenges": ["Challenges faced in the market"],
+      "future_vision": ["Business strategies and plans for growth"]
+    }}
+  }}
+}}
+"""
+
+def empty_categorization() -> Dict:
+    return {
+        "key_insights": [],
+        "unique_capabilities": [],
+        "unique_selling_points": [],
+        "recent_innovations": [],
+        "market_positioning": [],
+        "challenges": [],
+        "future_vision": []
+    }
+
+def format_search_results(search_results: List[Dict]) -> str:
+    return "\n".join([f"{res['title']}: {res['summary']}" for res in search_results])
+
+def estimate_tokens(text: str) -> int:
+    # Rough 4-characters-per-token estimate; only used for packing batches
+    return len(text) // 4 + 1
+
+async def categorize_findings(competitor: str, search_results: List[Dict]) -> Dict:
     if not search_results:
-        print(f"⚠️ No research results available for {competitor}")
-        return {
-            "key_insights": [],
-            "unique_capabilities": [],
-            "unique_selling_points": [],
-            "recent_innovations": [],
-            "market_positioning": [],
-            "challenges": [],
-            "future_vision": []
-        }
+        warning_log("categorize.no_results", f"No research results available for {competitor}", competitor=competitor)
+        return empty_categorization()
     
-    search_results_text = "\n".join([f"{res['title']}: {res['summary']}" for res in search_results])
+    search_results_text = format_search_results(search_results)
     prompt = categorization_prompt_template.format(competitor=competitor, searchResults=search_results_text)
     
     messages = [("system", "You are a competitive analysis assistant."), ("human", prompt)]
-    response = llm.invoke(messages)
-    response_text = response.content.strip()
-    
-    try:
-        return json.loads(response_text)
-    except json.JSONDecodeError:
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
+
+    # Identical model, params and prompt -> reuse the earlier parsed response
+    cache_key = make_cache_key(MODEL, SAMPLING_PARAMS, messages)
+    cached = await llm_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    # Streams until the JSON object closes, validated against CategorizationResponse
+    async def call_model():
+        result = await invoke_structured(get_llm(), messages, CategorizationResponse)
+        await llm_cache.aset(cache_key, result, tag=competitor)
+        return result
+
+    # Identical prompts already in flight share that model call
+    return await inflight_calls.do(cache_key, call_model)
+
+def pack_batches(sections: List[Tuple[str, str]], token_budget: int) -> List[List[Tuple[str, str]]]:
+    """Greedily group (competitor, section text) pairs so each batch prompt stays within token_budget."""
+    overhead = estimate_tokens(batch_categorization_prompt_template)
+    batches = []
+    current, current_tokens = [], overhead
+    for competitor, section in sections:
+        section_tokens = estimate_tokens(section)
+        if current and (current_tokens + section_tokens > token_budget or len(current) >= BATCH_MAX_COMPETITORS):
+            batches.append(current)
+            current, current_tokens = [], overhead
+        current.append((competitor, section))
+        current_tokens += section_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+async def categorize_batch(batch: List[Tuple[str, str]]) -> Dict[str, Dict]:
+    """One LLM call for a packed batch; returns only the competitors that parsed and validated."""
+    competitor_sections = "\n\n".join(section for _, section in batch)
+    prompt = batch_categorization_prompt_template.format(competitorSections=competitor_sections)
+    messages = [("system", "You are a competitive analysis assistant."), ("human", prompt)]
+
+    cache_key = make_cache_key(MODEL, BATCH_SAMPLING_PARAMS, messages)
+    cached = await llm_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    async def call_model():
+        try:
+            batch_results = (await invoke_structured(get_batch_llm(), messages, BatchCategorizationOutput))["results"]
+        except HTTPException as e:
+            if e.status_code != 502:
+                raise
+            return {}  # Unparseable batch: every competitor falls back to a single call
+
+        results = {}
+        for competitor, _ in batch:
             try:
-                return json.loads(match.group(0))
-            except json.JSONDecodeError:
-                raise HTTPException(status_code=500, detail=f"Error decoding JSON after extraction. Raw output: {response_text}")
+                results[competitor] = CategorizationResponse(**batch_results[competitor]).model_dump()
+            except (KeyError, TypeError, ValidationError):
+                continue
+        if len(results) == len(batch):
+            # Tagged with every competitor, so invalidating any one of them drops the whole batch entry
+            await llm_cache.aset(cache_key, results, tag=[competitor for competitor, _ in batch])
+        return results
+
+    return await inflight_calls.do(cache_key, call_model)
+
+async def categorize_findings_batch(items: List[Tuple[str, List[Dict]]], token_budget: Optional[int] = None) -> Dict[str, Dict]:
+    """Categorize many competitors with as few LLM calls as the token budget allows.
+
+    Competitors missing from (or malformed in) a batch answer fall back to a single call.
+    """
+    token_budget = token_budget or BATCH_TOKEN_BUDGET
+    results = {}
+    sections = []
+    for competitor, search_results in items:
+        if not search_results:
+            results[competitor] = empty_categorization()
         else:
-            raise HTTPException(status_code=500, detail=f"Error decoding response from SambaNova LLM. Raw output: {response_text}")
+            sections.append((competitor, f"### {competitor}\n{format_search_results(search_results)}"))
+
+    # Bounded locally so one large batch request does not fill the limiter's queue by itself
+    parallel = asyncio.Semaphore(BATCH_MAX_PARALLEL)
+
+    async def bounded(coroutine):
+        async with parallel:
+            return await coroutine
+
+    batches = [batch for batch in pack_batches(sections, token_budget) if len(batch) > 1]
+    for batch_results in await asyncio.gather(*(bounded(categorize_batch(batch)) for batch in batches)):
+        results.update(batch_results)
+
+    search_results_by_competitor = dict(items)
+    fallback = [competitor for competitor, _ in sections if competitor not in results]
+    fallback_results = await asyncio.gather(
+        *(bounded(categorize_findings(competitor, search_results_by_competitor[competitor])) for competitor in fallback)
+    )
+    results.update(zip(fallback, fallback_results))
+
+    # Keep the caller's competitor order
+    return {competitor: results[competitor] for competitor, _ in items}
+
 
 # Pydantic models for requests and responses
 class SearchResult(BaseModel):
@@ -104,3 +263,14 @@ class CategorizationResponse(BaseModel):
     market_positioning: List[str]
     challenges: List[str]
     future_vision: List[str]
+
+# Batch answers are validated per competitor, so one bad entry does not sink the batch
+class BatchCategorizationOutput(BaseModel):
+    results: Dict[str, Any] = {}
+
+class BatchCategorizationRequest(BaseModel):
+    items: List[CategorizationRequest]
+    token_budget: Optional[int] = None  # Defaults to BATCH_TOKEN_BUDGET
+
+class BatchCategorizationResponse(BaseModel):
+    results: Dict[str, CategorizationResponse]
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from app import utils
+from agent_common.llm_cache import LLMCache
+from agent_common.singleflight import SingleFlight
+
+FINDING_FIELDS = list(utils.CategorizationResponse.model_fields)
+
+
+def categorization(competitor: str) -> dict:
+    return {field: [f"{competitor} {field}"] for field in FINDING_FIELDS}
+
+
+class FakeModel:
+    """Replaces invoke_structured: answers batch prompts for every competitor named in them."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def invoke(self, llm, messages, response_model):
+        self.calls.append(response_model.__name__)
+        prompt = messages[-1][1]
+        if response_model is utils.BatchCategorizationOutput:
+            competitors = [line[4:] for line in prompt.splitlines() if line.startswith("### ")]
+            return {"results": {competitor: categorization(competitor) for competitor in competitors}}
+        return categorization("single")
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(utils, "invoke_structured", fake.invoke)
+    monkeypatch.setattr(utils, "get_llm", lambda: None)
+    monkeypatch.setattr(utils, "get_batch_llm", lambda: None)
+    monkeypatch.setattr(utils, "llm_cache", LLMCache(max_entries=32))
+    monkeypatch.setattr(utils, "inflight_calls", SingleFlight())
+    return fake
+
+
+@pytest.fixture
+def run():
+    def run(coroutine):
+        return asyncio.run(coroutine)
+    return run
@@ -0,0 +1,44 @@
+import pytest
+from app import utils
+from agent_common.llm_cache import LLMCache
+
+ITEMS = [
+    (competitor, [{"title": f"{competitor} news", "summary": "launch", "url": f"https://{competitor}.example"}])
+    for competitor in ["Acme", "Globex", "Initech"]
+]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, monkeypatch, tmp_path):
+    path = str(tmp_path / "llm_cache.db") if request.param == "sqlite" else None
+    cache = LLMCache(max_entries=32, path=path)
+    monkeypatch.setattr(utils, "llm_cache", cache)
+    return cache
+
+
+def test_batch_entries_are_cached(model, cache, run):
+    first = run(utils.categorize_findings_batch(ITEMS))
+    second = run(utils.categorize_findings_batch(ITEMS))
+
+    assert second == first
+    assert model.calls == ["BatchCategorizationOutput"]
+
+
+def test_invalidating_one_competitor_drops_its_batch_entry(model, cache, run):
+    run(utils.categorize_findings_batch(ITEMS))
+
+    assert cache.invalidate(" globex ") == 1
+    run(utils.categorize_findings_batch(ITEMS))
+    assert model.calls == ["BatchCategorizationOutput", "BatchCategorizationOutput"]
+
+
+def test_invalidation_survives_a_restart(model, tmp_path, monkeypatch, run):
+    path = str(tmp_path / "llm_cache.db")
+    monkeypatch.setattr(utils, "llm_cache", LLMCache(max_entries=32, path=path))
+    run(utils.categorize_findings_batch(ITEMS))
+
+    restarted = LLMCache(max_entries=32, path=path)
+    assert restarted.invalidate("Initech") == 1
+    monkeypatch.setattr(utils, "llm_cache", LLMCache(max_entries=32, path=path))
+    run(utils.categorize_findings_batch(ITEMS))
+    assert model.calls == ["BatchCategorizationOutput", "BatchCategorizationOutput"]
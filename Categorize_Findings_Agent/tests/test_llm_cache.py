@@ -0,0 +1,61 @@
+import asyncio
+import threading
+from agent_common.llm_cache import LLMCache
+
+
+def test_disk_lookups_do_not_block_the_event_loop(tmp_path, run):
+    cache = LLMCache(max_entries=4, path=str(tmp_path / "llm_cache.db"))
+    cache.set("key", {"answer": 1})
+    cache.entries.clear()  # Only the disk tier has it now
+    release = threading.Event()
+    disk_get = cache._disk_get
+
+    def slow_disk_get(key):
+        release.wait(5)
+        return disk_get(key)
+
+    cache._disk_get = slow_disk_get
+
+    async def scenario():
+        lookup = asyncio.create_task(cache.aget("key"))
+        await asyncio.sleep(0.01)
+        # The loop is still free while the disk read waits on its thread
+        assert not lookup.done()
+        release.set()
+        return await lookup
+
+    assert run(scenario()) == {"answer": 1}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_memory_hits_do_not_wait_for_disk_work(tmp_path):
+    cache = LLMCache(max_entries=4, path=str(tmp_path / "llm_cache.db"))
+    cache.set("hot", ["cached"])
+    reading, release = threading.Event(), threading.Event()
+
+    def slow_disk_get(key):
+        reading.set()
+        release.wait(5)
+
+    cache._disk_get = slow_disk_get
+    reader = threading.Thread(target=cache.get, args=("cold",))
+    reader.start()
+    assert reading.wait(5)
+    try:
+        assert cache.get("hot") == ["cached"]
+    finally:
+        release.set()
+        reader.join()
+
+
+def test_async_set_and_invalidate_reach_the_disk(tmp_path, run):
+    path = str(tmp_path / "llm_cache.db")
+    cache = LLMCache(max_entries=4, path=path)
+
+    async def scenario():
+        await cache.aset("batch", {"Acme": {}, "Globex": {}}, tag=["Acme", "Globex"])
+        assert LLMCache(max_entries=4, path=path).get("batch") is not None
+        assert await cache.ainvalidate("globex") == 1
+        return await LLMCache(max_entries=4, path=path).aget("batch")
+
+    assert run(scenario()) is None
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+# Incremental re-analysis: findings are stored per industry and competitor with a hash of the search
+# results they were categorized from; a rerun only re-categorizes competitors whose hash changed
+INCREMENTAL_ANALYSIS = os.getenv("INCREMENTAL_ANALYSIS", "true").lower() == "true"  # Default when a request doesn't say
+ANALYSIS_STORE_PATH = os.getenv("ANALYSIS_STORE_PATH", "analysis_store.db")  # SQLite file; empty keeps findings in memory
+# Part of every sources hash: bump it when the categorizer's model or prompt changes so stored findings are recomputed
+CATEGORIZER_VERSION = os.getenv("CATEGORIZER_VERSION", "Meta-Llama-3.3-70B-Instruct/1")
+ANALYSIS_MAX_AGE = float(os.getenv("ANALYSIS_MAX_AGE", 7 * 86400))  # Seconds stored findings are reused; 0 means no limit
+
+
+def store_key(name: str) -> str:
+    # Industries and competitors are matched case- and whitespace-insensitively
+    return " ".join(name.split()).casefold()
+
+
+def sources_hash(search_results: List[dict], version: Optional[str] = None) -> str:
+    # Only the fields sent to categorization count; ranking changes alone don't trigger a recompute
+    sources = sorted(
+        (res.get("url", ""), res.get("title", ""), res.get("summary", "")) for res in search_results
+    )
+    return hashlib.sha256(json.dumps([version or CATEGORIZER_VERSION, sources], separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class MemoryAnalysisStore:
+    def __init__(self):
+        self.industries = {}
+
+    def load(self, industry: str) -> Dict[str, dict]:
+        return dict(self.industries.get(store_key(industry), {}))
+
+    def save(self, industry: str, entries: Dict[str, dict]):
+        stored_at = time.time()
+        stored = self.industries.setdefault(store_key(industry), {})
+        for competitor, entry in entries.items():
+            stored[store_key(competitor)] = {**entry, "stored_at": stored_at}
+
+
+class SQLiteAnalysisStore:
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS competitor_findings ("
+                "industry TEXT NOT NULL, competitor TEXT NOT NULL, sources_hash TEXT NOT NULL, "
+                "findings TEXT NOT NULL, stored_at REAL NOT NULL, PRIMARY KEY (industry, competitor))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def load(self, industry: str) -> Dict[str, dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT competitor, sources_hash, findings, stored_at FROM competitor_findings WHERE industry = ?",
+                (store_key(industry),)
+            ).fetchall()
+        return {
+            competitor: {"sources_hash": digest, "findings": json.loads(findings), "stored_at": stored_at}
+            for competitor, digest, findings, stored_at in rows
+        }
+
+    def save(self, industry: str, entries: Dict[str, dict]):
+        stored_at = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO competitor_findings (industry, competitor, sources_hash, findings, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (store_key(industry), store_key(competitor), entry["sources_hash"], json.dumps(entry["findings"]), stored_at)
+                    for competitor, entry in entries.items()
+                ]
+            )
+
+
+class PreviousFindings:
+    """Stored findings for one run; hands them out for competitors whose search results are unchanged."""
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None, max_age: Optional[float] = None):
+        self.entries = entries or {}
+        self.max_age = ANALYSIS_MAX_AGE if max_age is None else max_age
+        self.reused = []
+
+    def match(self, competitor: str, search_results: List[dict]) -> Optional[dict]:
+        entry = self.entries.get(store_key(competitor))
+        if entry is None or entry["sources_hash"] != sources_hash(search_results):
+            return None
+        if self.max_age and time.time() - entry["stored_at"] > self.max_age:
+            return None
+        self.reused.append(competitor)
+        return entry["findings"]
+
+    def was_reused(self, competitor: str) -> bool:
+        # Any spelling of a reused competitor counts; batch industries may spell it differently
+        return store_key(competitor) in {store_key(comp) for comp in self.reused}
+
+
+def create_analysis_store():
+    return SQLiteAnalysisStore(ANALYSIS_STORE_PATH) if ANALYSIS_STORE_PATH else MemoryAnalysisStore()
+
+
+analysis_store = create_analysis_store()
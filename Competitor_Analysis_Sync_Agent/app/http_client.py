@@ -0,0 +1,165 @@
+import asyncio
+import os
+import httpx
+from typing import Dict, List, Optional
+from agent_common import wire
+from agent_common.instrumentation import warning_log
+
+# Connection pool settings for the shared agent client
+MAX_CONNECTIONS = int(os.getenv("AGENT_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AGENT_MAX_KEEPALIVE_CONNECTIONS", 20))
+KEEPALIVE_EXPIRY = float(os.getenv("AGENT_KEEPALIVE_EXPIRY", 30))
+HTTP2_ENABLED = os.getenv("AGENT_HTTP2", "true").lower() == "true"
+CONNECT_TIMEOUT = float(os.getenv("AGENT_CONNECT_TIMEOUT", 10))
+DEFAULT_TIMEOUT = float(os.getenv("AGENT_DEFAULT_TIMEOUT", 120))
+
+_client: Optional[httpx.AsyncClient] = None
+_http2_active = False
+
+# Counters fed by httpcore trace events, used to confirm connections are being reused
+pool_stats = {
+    "requests": 0,
+    "connections_opened": 0,
+    "tls_handshakes": 0,
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def _trace(event_name: str, info: dict):
+    if event_name == "connection.connect_tcp.complete":
+        pool_stats["connections_opened"] += 1
+    elif event_name == "connection.start_tls.complete":
+        pool_stats["tls_handshakes"] += 1
+
+
+# What each endpoint said it accepts (Accept-Encoding / Accept-Post on its responses); until an
+# endpoint has answered once, requests to it go out as uncompressed JSON
+_peer_capabilities: Dict[str, dict] = {}
+
+
+def _learn_capabilities(url: str, response: httpx.Response):
+    if "accept-post" in response.headers or "accept-encoding" in response.headers:
+        _peer_capabilities[url] = {
+            "encodings": wire.parse_header_list(response.headers.get("accept-encoding")),
+            "media_types": [wire.media_type_of(value) for value in wire.parse_header_list(response.headers.get("accept-post"))],
+        }
+    else:
+        _peer_capabilities.pop(url, None)
+
+
+def _request_format(url: str):
+    peer = _peer_capabilities.get(url, {})
+    media_type = wire.preferred_media_type()
+    if media_type not in peer.get("media_types", []):
+        media_type = wire.JSON
+    encoding = next((name for name in wire.supported_encodings() if name in peer.get("encodings", [])), None)
+    return media_type, encoding
+
+
+def build_timeout(read_timeout: Optional[float] = None) -> httpx.Timeout:
+    return httpx.Timeout(read_timeout or DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    global _client, _http2_active
+    if _client is None:
+        http2 = HTTP2_ENABLED and _http2_available()
+        if HTTP2_ENABLED and not http2:
+            warning_log("http_client.no_h2", "AGENT_HTTP2 is enabled but the 'h2' package is not installed; falling back to HTTP/1.1")
+        _http2_active = http2
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=http2,
+            timeout=build_timeout(),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    # Created lazily so the helpers keep working outside the FastAPI lifespan (scripts, tests)
+    if _client is None:
+        return await start_http_client()
+    return _client
+
+
+async def post_json(
+    url: str,
+    payload: dict,
+    timeout: Optional[float] = None,
+    headers: Optional[dict] = None
+) -> httpx.Response:
+    """POST payload in the best format the endpoint has advertised (see agent_common.wire)."""
+    client = await get_http_client()
+    media_type, encoding = _request_format(url)
+    body = wire.encode(payload, media_type)
+    wire_headers = {
+        "Content-Type": media_type,
+        "Accept": wire.JSON if wire.preferred_media_type() == wire.JSON else f"{wire.MSGPACK}, {wire.JSON};q=0.9",
+        "Accept-Encoding": ", ".join(wire.supported_encodings()) or "identity",
+    }
+    if encoding and len(body) >= wire.WIRE_COMPRESSION_MIN_BYTES:
+        body = wire.compress(body, encoding)
+        wire_headers["Content-Encoding"] = encoding
+
+    async def send(content: bytes, request_headers: dict) -> httpx.Response:
+        pool_stats["requests"] += 1
+        return await client.post(
+            url,
+            content=content,
+            headers={**request_headers, **(headers or {})},
+            timeout=build_timeout(timeout),
+            extensions={"trace": _trace},
+        )
+
+    response = await send(body, wire_headers)
+    if response.status_code == 415 and (media_type != wire.JSON or "Content-Encoding" in wire_headers):
+        # The endpoint was replaced by one that accepts less: resend as plain JSON
+        _peer_capabilities.pop(url, None)
+        plain_headers = {name: value for name, value in wire_headers.items() if name != "Content-Encoding"}
+        response = await send(wire.dumps(payload), {**plain_headers, "Content-Type": wire.JSON})
+    _learn_capabilities(url, response)
+    return response
+
+
+async def open_connections(urls: List[str], timeout: float = CONNECT_TIMEOUT):
+    """GET each URL once so the pool holds a live (TLS-established) connection to every host."""
+    client = await get_http_client()
+
+    async def ping(url: str):
+        pool_stats["requests"] += 1
+        try:
+            await client.get(url, timeout=timeout, extensions={"trace": _trace})
+        except httpx.HTTPError as e:
+            warning_log("warmup.request_failed", f"Warm-up request to {url} failed: {e!r}", url=url)
+
+    await asyncio.gather(*(ping(url) for url in dict.fromkeys(urls)))
+
+
+def get_pool_stats() -> dict:
+    opened = pool_stats["connections_opened"]
+    return {
+        **pool_stats,
+        "connections_reused": max(pool_stats["requests"] - opened, 0),
+        "http2": _http2_active,
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive_connections": MAX_KEEPALIVE_CONNECTIONS,
+    }
@@ -0,0 +1,371 @@
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Optional, Tuple
+from agent_common.instrumentation import span, warning_log
+
+# Background job settings for long-running orchestrations
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))  # Orchestrations run concurrently per process
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", 100))  # Submits beyond this are rejected
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "")  # SQLite file; empty keeps jobs in memory
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", 1000))  # Finished jobs kept by the in-memory store
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 10))  # How often a process marks its jobs alive
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", 60))  # Unfinished jobs without a heartbeat this long are failed
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused with a different request body."""
+
+
+def request_hash(request: dict) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class MemoryJobStore:
+    def __init__(self, retention: int = JOB_RETENTION):
+        self.retention = retention
+        self.jobs = OrderedDict()
+        self.idempotency_keys = {}
+
+    def create(self, job: dict) -> bool:
+        """Store a new job; False if its idempotency key is already taken."""
+        if job.get("idempotency_key") in self.idempotency_keys:
+            return False
+        self.jobs[job["job_id"]] = job
+        if job.get("idempotency_key"):
+            self.idempotency_keys[job["idempotency_key"]] = job["job_id"]
+        self._prune()
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    def find_by_idempotency_key(self, key: str) -> Optional[dict]:
+        job_id = self.idempotency_keys.get(key)
+        return self.get(job_id) if job_id else None
+
+    def update(self, job_id: str, expected_status: Optional[str] = None, **fields) -> bool:
+        """Apply fields, only if the job is still in expected_status when given; returns whether it was updated."""
+        job = self.jobs.get(job_id)
+        if job is None or (expected_status is not None and job["status"] != expected_status):
+            return False
+        job.update(fields)
+        return True
+
+    def heartbeat(self, owner: str, at: float):
+        for job in self.jobs.values():
+            if job.get("owner") == owner and job["status"] in UNFINISHED_STATUSES:
+                job["heartbeat_at"] = at
+
+    def fail_stale(self, before: float, error: str) -> int:
+        stale = [
+            job for job in self.jobs.values()
+            if job["status"] in UNFINISHED_STATUSES and (job.get("heartbeat_at") or 0) < before
+        ]
+        for job in stale:
+            job.update(status="failed", error=error, finished_at=time.time())
+        return len(stale)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in FINISHED_STATUSES]
+        for job_id in finished[:max(len(finished) - self.retention, 0)]:
+            job = self.jobs.pop(job_id)
+            self.idempotency_keys.pop(job.get("idempotency_key"), None)
+
+
+class SQLiteJobStore:
+    COLUMNS = (
+        "job_id", "idempotency_key", "status", "request", "result", "error", "created_at", "started_at", "finished_at",
+        "owner", "request_hash", "heartbeat_at",
+    )
+    JSON_COLUMNS = ("request", "result")
+    ADDED_COLUMNS = {"owner": "TEXT", "request_hash": "TEXT", "heartbeat_at": "REAL"}  # Missing from older job stores
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, status TEXT NOT NULL, "
+                "request TEXT, result TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL)"
+            )
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in self.ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _to_row(self, fields: dict) -> dict:
+        return {k: json.dumps(v) if k in self.JSON_COLUMNS and v is not None else v for k, v in fields.items()}
+
+    def _from_row(self, row) -> dict:
+        job = dict(zip(self.COLUMNS, row))
+        for column in self.JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create(self, job: dict) -> bool:
+        """Store a new job; False if its idempotency key is already taken."""
+        row = self._to_row(job)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT INTO jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    [row.get(column) for column in self.COLUMNS]
+                )
+        except sqlite3.IntegrityError:
+            # Another request (possibly in another worker) created a job with this key first
+            return False
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def find_by_idempotency_key(self, key: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def update(self, job_id: str, expected_status: Optional[str] = None, **fields) -> bool:
+        """Apply fields, only if the job is still in expected_status when given; returns whether it was updated."""
+        row = self._to_row(fields)
+        condition, params = "job_id = ?", [job_id]
+        if expected_status is not None:
+            condition, params = "job_id = ? AND status = ?", [job_id, expected_status]
+        with self._connect() as conn:
+            updated = conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in row)} WHERE {condition}",
+                [*row.values(), *params]
+            ).rowcount
+        return updated > 0
+
+    def heartbeat(self, owner: str, at: float):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (at, owner, *UNFINISHED_STATUSES)
+            )
+
+    def fail_stale(self, before: float, error: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (error, time.time(), *UNFINISHED_STATUSES, before)
+            ).rowcount
+
+
+class JobManager:
+    """Runs submitted orchestrations on a bounded pool of worker tasks.
+
+    Each process owns the jobs it accepted and heartbeats them while they are queued or running.
+    Unfinished jobs whose owner stopped heartbeating (it crashed or restarted) are failed by
+    whichever process notices; jobs of live processes sharing the store are left alone.
+    """
+
+    def __init__(
+        self,
+        store,
+        runner: Callable[[dict], Awaitable[dict]],
+        workers: int = JOB_WORKERS,
+        max_queue: int = JOB_QUEUE_MAX,
+        heartbeat_interval: float = JOB_HEARTBEAT_SECONDS,
+        stale_after: float = JOB_STALE_SECONDS
+    ):
+        self.store = store
+        self.runner = runner
+        self.worker_count = workers
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.workers = []
+        self.heartbeat_task = None
+        self.running = {}
+        self.durations = deque(maxlen=500)
+        self.counters = {
+            "submitted": 0, "deduplicated": 0, "rejected": 0, "succeeded": 0, "failed": 0, "cancelled": 0, "reaped": 0,
+        }
+
+    async def start(self):
+        self.reap_stale()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        self.heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        tasks = self.workers + ([self.heartbeat_task] if self.heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.heartbeat_task = None
+
+    def reap_stale(self):
+        # Jobs whose owning process died cannot be resumed
+        self.counters["reaped"] += self.store.fail_stale(time.time() - self.stale_after, "Interrupted by server restart")
+
+    def beat(self):
+        """Keep this process's jobs alive and stop local jobs cancelled through another worker."""
+        self.store.heartbeat(self.instance_id, time.time())
+        for job_id, task in list(self.running.items()):
+            job = self.store.get(job_id)
+            if job is not None and job["status"] == "cancelled":
+                task.cancel()
+        self.reap_stale()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.beat()
+            except sqlite3.Error as e:
+                warning_log("jobs.heartbeat_failed", f"Job heartbeat failed: {e}")
+
+    def submit(self, request: dict, idempotency_key: Optional[str] = None) -> Tuple[dict, bool]:
+        """Queue a job; returns (job, created). A repeated idempotency key returns the original job.
+
+        Raises IdempotencyConflict when the key was first used with a different request.
+        """
+        digest = request_hash(request)
+        if idempotency_key:
+            existing = self.store.find_by_idempotency_key(idempotency_key)
+            if existing:
+                return self._deduplicated(existing, digest), False
+
+        if self.queue.full():
+            self.counters["rejected"] += 1
+            raise QueueFullError("Job queue is full")
+
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "idempotency_key": idempotency_key,
+            "status": "queued",
+            "request": request,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "owner": self.instance_id,
+            "request_hash": digest,
+            "heartbeat_at": now,
+        }
+        if not self.store.create(job):
+            # Lost a race with a concurrent submit using the same key
+            return self._deduplicated(self.store.find_by_idempotency_key(idempotency_key), digest), False
+        self.queue.put_nowait(job["job_id"])
+        self.counters["submitted"] += 1
+        return job, True
+
+    def _deduplicated(self, existing: dict, digest: str) -> dict:
+        # Jobs stored before request hashes were recorded are matched on the key alone
+        if existing.get("request_hash") not in (None, digest):
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+        self.counters["deduplicated"] += 1
+        return existing
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+        # Mark first so the worker knows the CancelledError came from here, not from shutdown.
+        # A job running in another worker is stopped by that worker's next heartbeat.
+        if self.store.update(job_id, expected_status=job["status"], status="cancelled", finished_at=time.time()):
+            self.counters["cancelled"] += 1
+            task = self.running.get(job_id)
+            if task:
+                task.cancel()
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self.queue.task_done()
+
+    async def _traced_run(self, job_id: str, request: dict) -> dict:
+        # Each job is its own trace; stage spans inside the runner become its children
+        with span("job", job_id=job_id):
+            return await self.runner(request)
+
+    async def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        started_at = time.time()
+        if job is None or not self.store.update(job_id, expected_status="queued", status="running", started_at=started_at):
+            return  # Cancelled while waiting in the queue
+
+        task = asyncio.create_task(self._traced_run(job_id, job["request"]))
+        self.running[job_id] = task
+        # Every outcome is recorded only while the job is still running, so a cancel that
+        # lands after the runner finished (or in another worker) is never overwritten
+        try:
+            result = await task
+            if self.store.update(job_id, expected_status="running", status="succeeded", result=result, finished_at=time.time()):
+                self.counters["succeeded"] += 1
+        except asyncio.CancelledError:
+            # The worker itself being cancelled is shutdown, even if the job was cancelled too
+            if asyncio.current_task().cancelling() or self.store.get(job_id)["status"] != "cancelled":
+                task.cancel()
+                self.store.update(job_id, expected_status="running", status="failed", error="Worker shut down", finished_at=time.time())
+                raise
+        except Exception as e:
+            if self.store.update(job_id, expected_status="running", status="failed", error=str(e), finished_at=time.time()):
+                self.counters["failed"] += 1
+        finally:
+            self.running.pop(job_id, None)
+            self.durations.append(time.time() - started_at)
+
+    def metrics(self) -> dict:
+        durations = sorted(self.durations)
+
+        def percentile(p: float) -> Optional[float]:
+            if not durations:
+                return None
+            return round(durations[min(int(p * len(durations)), len(durations) - 1)], 3)
+
+        return {
+            **self.counters,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "running": len(self.running),
+            "workers": self.worker_count,
+            "duration_seconds": {
+                "count": len(durations),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(durations[-1], 3) if durations else None,
+            },
+        }
+
+
+def create_job_store():
+    if JOB_STORE_PATH:
+        return SQLiteJobStore(JOB_STORE_PATH)
+    if WEB_CONCURRENCY > 1:
+        # Each worker process would see only its own jobs, so polls landing elsewhere would 404
+        raise RuntimeError("JOB_STORE_PATH must be set when WEB_CONCURRENCY > 1; the in-memory job store is per process")
+    return MemoryJobStore()
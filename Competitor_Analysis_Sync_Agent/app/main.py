@@ -1,17 +1,73 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
-from app.utils import orchestrate_analysis
+import httpx
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from agent_common.deadline import DeadlineMiddleware
+from app.http_client import start_http_client, close_http_client, get_pool_stats
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from app.jobs import IdempotencyConflict, JobManager, QueueFullError, create_job_store
+from app.resilience import CircuitOpenError, resilient_caller
+from app.transport import transport
+from app.utils import orchestrate_analysis, orchestrate_analysis_events, orchestrate_batch
+from agent_common.warmup import add_warmup
+
+job_manager = JobManager(create_job_store(), orchestrate_analysis)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled, keep-alive client per process for all downstream agent calls
+    await start_http_client()
+    # In-process mode imports the co-located agents once, before the first request
+    transport.load()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await close_http_client()
 
 app = FastAPI(
     title="Competitor Analysis Orchestrator",
     version="1.1",
-    description="Orchestrates agents to generate competitors, perform web search, categorize findings, and finalize the summary."
+    description="Orchestrates agents to generate competitors, perform web search, categorize findings, and finalize the summary.",
+    lifespan=lifespan
 )
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "orchestrator")
+app.add_middleware(DeadlineMiddleware)
+add_warmup(app, [("agent_connections", transport.warm_up)])
 
 class OrchestrationRequest(BaseModel):
     industry: str
     specified_competitors: Optional[List[str]] = []  # Optional list to seed competitor generation
+    concurrent: bool = True  # Pipeline each competitor independently instead of one at a time
+    batch_categorize: Optional[bool] = None  # Categorize all competitors via the batch endpoint (default: CATEGORIZE_BATCH_MODE)
+    deadline_seconds: Optional[float] = Field(None, gt=0)  # Time budget; unfinished work is omitted (default: ORCHESTRATION_DEADLINE)
+    incremental: Optional[bool] = None  # Reuse stored findings for competitors whose sources are unchanged (default: INCREMENTAL_ANALYSIS)
+
+class BatchIndustry(BaseModel):
+    industry: str
+    specified_competitors: Optional[List[str]] = []
+
+class BatchOrchestrationRequest(BaseModel):
+    industries: List[Union[str, BatchIndustry]] = Field(..., min_length=1)  # Names, or names with specified competitors
+    concurrent: bool = True
+    batch_categorize: Optional[bool] = None
+    deadline_seconds: Optional[float] = Field(None, gt=0)  # Budget for the whole batch
+    incremental: Optional[bool] = None
+
+def agent_error(e: Exception) -> HTTPException:
+    # Tell clients whether a downstream agent was unavailable, slow or failing, instead of a generic 500
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(int(e.retry_after), 1))})
+    if isinstance(e, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail=f"Agent call timed out: {e}")
+    if isinstance(e, httpx.HTTPError):
+        return HTTPException(status_code=502, detail=f"Agent call failed: {e}")
+    return HTTPException(status_code=500, detail=str(e))
 
 @app.post("/orchestrate")
 async def orchestrate(request: OrchestrationRequest):
@@ -19,4 +75,85 @@ async def orchestrate(request: OrchestrationRequest):
         result = await orchestrate_analysis(request.model_dump())
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise agent_error(e)
+
+@app.post("/orchestrate/stream")
+async def orchestrate_stream(request: OrchestrationRequest):
+    # NDJSON: one event per line as each stage finishes, ending with a "result" or "error" event
+    async def event_lines():
+        try:
+            async for event in orchestrate_analysis_events(request.model_dump()):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            error = agent_error(e)
+            yield json.dumps({"event": "error", "status": error.status_code, "detail": error.detail}) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+@app.post("/orchestrate/batch")
+async def orchestrate_batch_route(request: BatchOrchestrationRequest):
+    # Competitors shared between industries are searched and categorized once
+    try:
+        return await orchestrate_batch(request.model_dump())
+    except Exception as e:
+        raise agent_error(e)
+
+
+# -----------------------------
+# Asynchronous job API
+# -----------------------------
+def job_status(job: dict) -> dict:
+    return {key: value for key, value in job.items() if key not in ("request", "result", "request_hash", "heartbeat_at")}
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: OrchestrationRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    try:
+        job, created = job_manager.submit(request.model_dump(), idempotency_key)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not created:
+        response.status_code = 200  # Retried submit: report the original job
+    return job_status(job)
+
+@app.get("/jobs/metrics")
+async def job_metrics():
+    return job_manager.metrics()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}" + (f": {job['error']}" if job["error"] else ""))
+    return job["result"]
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@app.get("/resilience-stats")
+async def resilience_stats():
+    # Retries, hedges sent/won and circuit state per agent endpoint
+    return resilient_caller.stats()
+
+@app.get("/pool-stats")
+async def pool_stats():
+    return get_pool_stats()
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+import httpx
+from agent_common.deadline import expired, remaining
+from app.transport import DeadlineExceeded
+
+# Retries: attempts per call (1 disables), with full-jitter exponential backoff
+AGENT_RETRY_ATTEMPTS = int(os.getenv("AGENT_RETRY_ATTEMPTS", 3))
+AGENT_RETRY_BASE_DELAY = float(os.getenv("AGENT_RETRY_BASE_DELAY", 0.25))
+AGENT_RETRY_MAX_DELAY = float(os.getenv("AGENT_RETRY_MAX_DELAY", 4))
+
+# Hedging: send a duplicate request once the first has run longer than the endpoint's recent p95
+AGENT_HEDGE_ENABLED = os.getenv("AGENT_HEDGE_ENABLED", "true").lower() == "true"
+AGENT_HEDGE_QUANTILE = float(os.getenv("AGENT_HEDGE_QUANTILE", 0.95))
+AGENT_HEDGE_MIN_SAMPLES = int(os.getenv("AGENT_HEDGE_MIN_SAMPLES", 20))  # No hedging until this many latencies are known
+AGENT_HEDGE_MIN_DELAY = float(os.getenv("AGENT_HEDGE_MIN_DELAY", 0.05))
+LATENCY_WINDOW = 200
+
+# Circuit breaker per agent: open after consecutive failures, probe again after the reset timeout
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30))
+
+# Only endpoints listed here are retried or hedged. By default that is the deterministic ones: a search
+# answers from its cache and a summary is rendered from its input. LLM endpoints (generate, categorize,
+# categorize_batch, reflection, reflection_slim) are opt-in, since a repeat is a second paid model call
+# that may answer differently.
+IDEMPOTENT_ENDPOINTS = {
+    endpoint.strip() for endpoint in os.getenv("AGENT_RETRY_ENDPOINTS", "websearch,summary").split(",") if endpoint.strip()
+}
+
+
+class CircuitOpenError(httpx.HTTPStatusError):
+    """Raised without calling the agent while its circuit is open; looks like a 503 to callers."""
+
+    def __init__(self, agent: str, retry_after: float):
+        request = httpx.Request("POST", f"circuit://{agent}")
+        response = httpx.Response(
+            503,
+            json={"detail": f"Agent '{agent}' is unavailable; circuit open"},
+            headers={"Retry-After": str(max(int(retry_after), 1))},
+            request=request,
+        )
+        super().__init__(f"Circuit open for agent '{agent}'", request=request, response=response)
+        self.agent = agent
+        self.retry_after = retry_after
+
+
+def is_agent_failure(error: BaseException) -> bool:
+    # Timeouts caused by the caller's own deadline say nothing about the agent's health
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)) or expired():
+        return False
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    def __init__(self, agent: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.agent = agent
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probe_in_flight:
+            self.probe_in_flight = True  # One trial request decides whether to close again
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.agent, max(remaining, 1))
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {"calls": 0, "failures": 0, "retries": 0, "hedges_sent": 0, "hedges_won": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        if len(self.latencies) < AGENT_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(AGENT_HEDGE_QUANTILE * len(ordered)), len(ordered) - 1)
+        return max(ordered[index], AGENT_HEDGE_MIN_DELAY)
+
+    def stats(self) -> dict:
+        sent = self.counters["hedges_sent"]
+        return {
+            **self.counters,
+            "hedge_win_rate": self.counters["hedges_won"] / sent if sent else None,
+            "hedge_delay": self.hedge_delay(),
+        }
+
+
+class ResilientCaller:
+    """Wraps agent calls with per-agent circuit breakers, jittered retries and p95 hedging."""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def breaker(self, agent: str) -> CircuitBreaker:
+        if agent not in self.breakers:
+            self.breakers[agent] = CircuitBreaker(agent)
+        return self.breakers[agent]
+
+    def endpoint_stats(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointStats()
+        return self.endpoints[endpoint]
+
+    async def _attempt(self, agent: str, endpoint: str, send: Callable[[], Awaitable[dict]]) -> dict:
+        breaker = self.breaker(agent)
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = await send()
+        except asyncio.CancelledError:
+            # A losing hedge was cancelled: say nothing about the agent's health
+            breaker.probe_in_flight = False
+            raise
+        except Exception as e:
+            if is_agent_failure(e):
+                breaker.record_failure()
+            elif isinstance(e, httpx.HTTPStatusError):
+                breaker.record_success()  # The agent answered; the request itself was rejected
+            else:
+                breaker.probe_in_flight = False
+            raise
+        breaker.record_success()
+        self.endpoint_stats(endpoint).latencies.append(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, agent: str, endpoint: str, send: Callable[[], Awaitable[dict]]) -> dict:
+        stats = self.endpoint_stats(endpoint)
+        delay = stats.hedge_delay() if AGENT_HEDGE_ENABLED else None
+        primary = asyncio.create_task(self._attempt(agent, endpoint, send))
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        stats.counters["hedges_sent"] += 1
+        hedge = asyncio.create_task(self._attempt(agent, endpoint, send))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats.counters["hedges_won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, agent: str, endpoint: str, send: Callable[[], Awaitable[dict]]) -> dict:
+        stats = self.endpoint_stats(endpoint)
+        stats.counters["calls"] += 1
+        idempotent = endpoint in IDEMPOTENT_ENDPOINTS
+        attempts = AGENT_RETRY_ATTEMPTS if idempotent else 1
+        for attempt in range(attempts):
+            try:
+                if idempotent:
+                    return await self._hedged(agent, endpoint, send)
+                return await self._attempt(agent, endpoint, send)
+            except Exception as e:
+                if attempt == attempts - 1 or not is_agent_failure(e):
+                    stats.counters["failures"] += 1
+                    raise
+                stats.counters["retries"] += 1
+                backoff = min(AGENT_RETRY_MAX_DELAY, AGENT_RETRY_BASE_DELAY * 2 ** attempt, remaining() or AGENT_RETRY_MAX_DELAY)
+                await asyncio.sleep(random.uniform(0, backoff))
+
+    def stats(self) -> dict:
+        return {
+            "endpoints": {endpoint: stats.stats() for endpoint, stats in self.endpoints.items()},
+            "circuits": {agent: breaker.stats() for agent, breaker in self.breakers.items()},
+        }
+
+
+resilient_caller = ResilientCaller()
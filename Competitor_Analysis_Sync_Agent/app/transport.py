@@ -0,0 +1,201 @@
+import asyncio
+import importlib
+import os
+import sys
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from agent_common.deadline import cap_timeout, deadline_headers, expired
+from agent_common import wire
+from app.http_client import open_connections, post_json
+from agent_common.instrumentation import debug_log, record_payload, trace_headers, warning_log
+
+# "http" posts JSON to each agent; "inprocess" imports co-located agents and calls their endpoints directly
+AGENT_TRANSPORT = os.getenv("AGENT_TRANSPORT", "http").lower()
+
+# HTTP mode: AGENT_BASE_URL/<service>, unless a per-agent base URL is set
+AGENT_BASE_URL = os.getenv("AGENT_BASE_URL", "https://serverless.on-demand.io/apps").rstrip("/")
+AGENT_BASE_URLS = {
+    "generate": os.getenv("GENERATE_COMPETITORS_BASE_URL", f"{AGENT_BASE_URL}/generatecompetitorsapi"),
+    "websearch": os.getenv("WEBSEARCH_BASE_URL", f"{AGENT_BASE_URL}/websearchapi"),
+    "categorize": os.getenv("CATEGORIZE_FINDINGS_BASE_URL", f"{AGENT_BASE_URL}/categorizefindingsapi"),
+    "summary": os.getenv("FINAL_SUMMARY_BASE_URL", f"{AGENT_BASE_URL}/finalizesummaryapi"),
+    "reflection": os.getenv("REFLECTION_AGENT_BASE_URL", f"{AGENT_BASE_URL}/reflectionagentapi"),
+}
+
+# Warm-up: open pooled connections to every agent (GET /ready) before reporting ready
+AGENT_WARMUP = os.getenv("AGENT_WARMUP", "true").lower() == "true"
+
+# In-process mode: agent source directories, by default siblings of this orchestrator
+AGENTS_ROOT = os.getenv("AGENTS_ROOT", os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+AGENT_DIRS = {
+    "generate": "Generate_Competitors",
+    "websearch": "Web_search_Agent",
+    "categorize": "Categorize_Findings_Agent",
+    "summary": "Final_Summary_Agent",
+    "reflection": "Reflection__Notes_Agent",
+}
+
+# Endpoint name -> (agent, path)
+ENDPOINTS = {
+    "generate": ("generate", "/analysis/generate"),
+    "websearch": ("websearch", "/search"),
+    "categorize": ("categorize", "/categorize"),
+    "categorize_batch": ("categorize", "/categorize/batch"),
+    "summary": ("summary", "/finalize_summary"),
+    "reflection": ("reflection", "/reflect-and-improve"),
+    "reflection_slim": ("reflection", "/reflect-and-improve/slim"),
+}
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The request's time budget ran out before this agent call could be made."""
+
+
+def check_deadline(endpoint: str, timeout: Optional[float]) -> Optional[float]:
+    # Each attempt gets at most the time left on the request's deadline
+    if expired():
+        raise DeadlineExceeded(f"Request deadline exceeded before calling {endpoint}")
+    return cap_timeout(timeout)
+
+
+def agent_url(endpoint: str) -> str:
+    agent, path = ENDPOINTS[endpoint]
+    return AGENT_BASE_URLS[agent].rstrip("/") + path
+
+
+class HTTPTransport:
+    def load(self):
+        pass  # Connections are pooled by app.http_client
+
+    async def warm_up(self):
+        if AGENT_WARMUP:
+            await open_connections([base_url.rstrip("/") + "/ready" for base_url in AGENT_BASE_URLS.values()])
+
+    async def call(self, endpoint: str, payload: dict, timeout: Optional[float] = None) -> dict:
+        timeout = check_deadline(endpoint, timeout)
+        url = agent_url(endpoint)
+        route = urlsplit(url).path
+        response = await post_json(url, payload, timeout=timeout, headers={**trace_headers(), **deadline_headers()})
+        record_payload(route, "request", len(response.request.content))
+        record_payload(route, "response", response.num_bytes_downloaded)  # On-wire (compressed) size
+        debug_log("agent.call", url=url, status=response.status_code, payload=payload, response=response.content)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            warning_log("agent.call_failed", f"Error calling {url}: {e.response.status_code}", url=url, status=e.response.status_code)
+            raise
+        return wire.decode(response.content, response.headers.get("content-type"))
+
+
+def _is_app_module(name: str) -> bool:
+    return name == "app" or name.startswith("app.")
+
+
+def load_agent_main(agent_dir: str):
+    """Import <agent_dir>/app/main.py in isolation from this orchestrator's own `app` package.
+
+    Every agent names its package `app`, so the orchestrator's modules are set aside while the
+    agent is imported and restored afterwards. The agent_common modules are ordinary shared imports,
+    so in-process calls join the caller's trace, report into the same /metrics and see its deadline;
+    co-located LLM agents also share one response cache, in-flight table and model-call limiter.
+    """
+    saved = {name: module for name, module in sys.modules.items() if _is_app_module(name)}
+    for name in saved:
+        del sys.modules[name]
+    sys.path.insert(0, agent_dir)
+    try:
+        return importlib.import_module("app.main")
+    finally:
+        sys.path.remove(agent_dir)
+        for name in [name for name in sys.modules if _is_app_module(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+class InProcessTransport:
+    """Calls the agents' FastAPI endpoint functions directly: same request and response models
+    and the same HTTP status semantics, without serialization or a network hop."""
+
+    def __init__(self, agents_root: str = AGENTS_ROOT):
+        self.agents_root = agents_root
+        self.routes: Dict[str, APIRoute] = {}
+        self.apps = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            modules = {}
+            for endpoint, (agent, path) in ENDPOINTS.items():
+                if endpoint in self.routes:
+                    continue
+                if agent not in modules:
+                    modules[agent] = load_agent_main(os.path.join(self.agents_root, AGENT_DIRS[agent]))
+                    self.apps[agent] = modules[agent].app
+                self.routes[endpoint] = self._find_route(modules[agent].app, path)
+
+    async def warm_up(self):
+        # The agents' own lifespans never run here, so their warm-up steps (model and search clients) are run directly
+        await asyncio.gather(*(
+            agent_app.state.readiness.run()
+            for agent_app in self.apps.values() if hasattr(agent_app.state, "readiness")
+        ))
+
+    @staticmethod
+    def _find_route(agent_app, path: str) -> APIRoute:
+        for route in agent_app.routes:
+            if isinstance(route, APIRoute) and "POST" in route.methods and route.path.rstrip("/") == path:
+                return route
+        raise RuntimeError(f"No POST {path} route in agent app {agent_app.title!r}")
+
+    @staticmethod
+    def _status_error(endpoint: str, status_code: int, detail) -> httpx.HTTPStatusError:
+        # Same exception the HTTP transport raises, so callers handle both modes identically
+        url = agent_url(endpoint)
+        warning_log("agent.call_failed", f"Error calling {endpoint} in-process: {status_code}", url=url, status=status_code)
+        request = httpx.Request("POST", url)
+        response = httpx.Response(status_code, json={"detail": detail}, request=request)
+        return httpx.HTTPStatusError(f"In-process call to {endpoint} failed with {status_code}", request=request, response=response)
+
+    async def call(self, endpoint: str, payload: dict, timeout: Optional[float] = None) -> dict:
+        timeout = check_deadline(endpoint, timeout)
+        if endpoint not in self.routes:
+            self.load()
+        route = self.routes[endpoint]
+        body = route.dependant.body_params[0]
+        try:
+            kwargs = {body.name: body.field_info.annotation.model_validate(payload)}
+        except ValidationError as e:
+            raise self._status_error(endpoint, 422, e.errors(include_url=False, include_context=False))
+        # Header dependencies (e.g. Generate_Competitors' optional X-API-KEY) get None, as when the header is absent
+        kwargs.update({dependency.name: None for dependency in route.dependant.dependencies})
+
+        try:
+            result = await asyncio.wait_for(route.endpoint(**kwargs), timeout=timeout)
+        except HTTPException as e:
+            raise self._status_error(endpoint, e.status_code, e.detail)
+        except asyncio.TimeoutError:
+            raise httpx.ReadTimeout(f"In-process call to {endpoint} timed out after {timeout}s")
+        except Exception as e:
+            raise self._status_error(endpoint, 500, str(e))
+
+        response_model = route.response_model
+        if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+            result = response_model.model_validate(result)
+        return jsonable_encoder(result)
+
+
+def create_transport(name: str = AGENT_TRANSPORT):
+    if name == "inprocess":
+        return InProcessTransport()
+    if name == "http":
+        return HTTPTransport()
+    raise ValueError(f"Unknown AGENT_TRANSPORT {name!r}; expected 'http' or 'inprocess'")
+
+
+transport = create_transport()
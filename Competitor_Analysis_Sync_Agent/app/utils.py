@@ -1,46 +1,94 @@
+import asyncio
 import httpx
-import json
-from typing import Dict, List
+import os
+import time
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from app.analysis_store import INCREMENTAL_ANALYSIS, PreviousFindings, analysis_store, sources_hash
+from agent_common.deadline import current_deadline, deadline_after, earliest, expired, remaining, use_deadline
+from agent_common.instrumentation import span, warning_log
+from app.resilience import resilient_caller
+from app.transport import ENDPOINTS, transport
 
-# Agent Endpoints from the Solidus platform
-GENERATE_COMPETITORS_URL = "https://serverless.on-demand.io/apps/generatecompetitorsapi/analysis/generate"
-WEBSEARCH_URL = "https://serverless.on-demand.io/apps/websearchapi/search"
-CATEGORIZE_FINDINGS_URL = "https://serverless.on-demand.io/apps/categorizefindingsapi/categorize"
-FINAL_SUMMARY_URL = "https://serverless.on-demand.io/apps/finalizesummaryapi/finalize_summary"
-REFLECTION_AGENT_URL = "https://serverless.on-demand.io/apps/reflectionagentapi/reflect-and-improve"
+# Agent endpoints are reached through app.transport (AGENT_TRANSPORT=http|inprocess)
 
+# Send the reflection agent only what it reads: the analysis once per session, then feedback deltas
+REFLECTION_SLIM_MODE = os.getenv("REFLECTION_SLIM_MODE", "true").lower() == "true"
 
-# Helper function to call an agent's endpoint
-async def call_agent(url: str, payload: dict) -> dict:
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        try:
-            print(f"Calling: {url} with payload: {json.dumps(payload, indent=2)}")  # Debugging
-            response = await client.post(url, json=payload)
-            print(f"Response [{response.status_code}]: {response.text}")  # Debugging
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            print(f"Error calling {url}: {e.response.status_code}")
-            print("Response content:", e.response.text)
-            raise
+# Per-agent read timeouts (seconds); LLM-backed agents get more headroom than search/summary
+AGENT_TIMEOUTS = {
+    "generate": float(os.getenv("GENERATE_TIMEOUT", 120)),
+    "websearch": float(os.getenv("WEBSEARCH_TIMEOUT", 60)),
+    "categorize": float(os.getenv("CATEGORIZE_TIMEOUT", 120)),
+    "categorize_batch": float(os.getenv("CATEGORIZE_BATCH_TIMEOUT", 300)),
+    "summary": float(os.getenv("SUMMARY_TIMEOUT", 30)),
+    "reflection": float(os.getenv("REFLECTION_TIMEOUT", 120)),
+}
+
+# Max in-flight requests per downstream agent when competitors are processed concurrently
+MAX_CONCURRENT_SEARCHES = int(os.getenv("MAX_CONCURRENT_SEARCHES", 5))
+MAX_CONCURRENT_CATEGORIZATIONS = int(os.getenv("MAX_CONCURRENT_CATEGORIZATIONS", 5))
+
+# Ask the search agent to dedupe hits and condense them to ranked sentences within its token budget
+SEARCH_CONDENSE = os.getenv("SEARCH_CONDENSE", "false").lower() == "true"
+
+# Categorize all competitors through the agent's token-budgeted batch endpoint instead of one call each
+CATEGORIZE_BATCH_MODE = os.getenv("CATEGORIZE_BATCH_MODE", "false").lower() == "true"
+
+# Time budgets: competitors and reflection rounds that do not fit are dropped and reported as omitted
+ORCHESTRATION_DEADLINE = float(os.getenv("ORCHESTRATION_DEADLINE", 0)) or None  # Default budget (seconds); 0 = none
+SUMMARY_RESERVE_SECONDS = float(os.getenv("SUMMARY_RESERVE_SECONDS", 2))  # Held back from research for the summary...
+SUMMARY_RESERVE_FRACTION = float(os.getenv("SUMMARY_RESERVE_FRACTION", 0.25))  # ...but never more than this share of what is left
+REFLECTION_MIN_SECONDS = float(os.getenv("REFLECTION_MIN_SECONDS", 5))  # Don't start a reflection round with less left
+
+
+# Helper function to call an agent endpoint by name over the configured transport.
+# timeout bounds each attempt; retries, hedging and circuit breaking come from app.resilience.
+async def call_agent(endpoint: str, payload: dict, timeout: Optional[float] = None) -> dict:
+    agent = ENDPOINTS[endpoint][0]
+    with span("agent.call", endpoint=endpoint):
+        return await resilient_caller.call(agent, endpoint, lambda: transport.call(endpoint, payload, timeout=timeout))
 
 
 # Step 1: Generate Competitors (Only if not specified)
 async def call_generate_competitors(input_data: dict) -> dict:
-    return await call_agent(GENERATE_COMPETITORS_URL, input_data)
+    return await call_agent("generate", input_data, timeout=AGENT_TIMEOUTS["generate"])
 
 # Step 2: Websearch for a competitor
+class SearchFailed(Exception):
+    """The search agent answered but reported an error for this competitor instead of results."""
+
+    def __init__(self, competitor: str, error: str):
+        super().__init__(f"Search failed for {competitor}: {error}")
+        self.competitor = competitor
+        self.error = error
+
+
+class SearchOmitted(Exception):
+    """The search agent gave up on this competitor because the request's own deadline ran out.
+
+    Handled like a deadline timeout: the competitor is omitted, not reported as failed.
+    """
+
+
 async def call_websearch_agent(competitor: str) -> List[dict]:
     payload = {"competitors": [competitor], "max_results": 3}
-    result = await call_agent(WEBSEARCH_URL, payload)
+    if SEARCH_CONDENSE:
+        payload["condense"] = True
+    result = await call_agent("websearch", payload, timeout=AGENT_TIMEOUTS["websearch"])
+    error = result.get("errors", {}).get(competitor)
+    if error:
+        if expired():
+            raise SearchOmitted(f"Search for {competitor} stopped at the deadline: {error}")
+        raise SearchFailed(competitor, error)
     if "competitor_results" in result:
         return result["competitor_results"].get(competitor, [])
     return result.get("results", [])
 
 # Step 3: Categorize Findings for a competitor
-async def call_categorize_findings(competitor: str, search_results: List[dict]) -> dict:
+def filter_search_results(search_results: List[dict]) -> List[dict]:
     # Include "title", "summary", and "url" for each search result
-    filtered_results = [
+    return [
         {
             "title": res.get("title", ""),
             "summary": res.get("summary", ""),
@@ -48,45 +96,366 @@ async def call_categorize_findings(competitor: str, search_results: List[dict])
         }
         for res in search_results
     ]
-    payload = {"competitor": competitor, "search_results": filtered_results}
-    return await call_agent(CATEGORIZE_FINDINGS_URL, payload)
+
+async def call_categorize_findings(competitor: str, search_results: List[dict]) -> dict:
+    payload = {"competitor": competitor, "search_results": filter_search_results(search_results)}
+    return await call_agent("categorize", payload, timeout=AGENT_TIMEOUTS["categorize"])
+
+# Step 3 (batch mode): Categorize many competitors in as few LLM calls as the agent's token budget allows
+async def call_categorize_findings_batch(research_results: Dict[str, List[dict]]) -> Dict[str, dict]:
+    payload = {
+        "items": [
+            {"competitor": comp, "search_results": filter_search_results(results)}
+            for comp, results in research_results.items()
+        ]
+    }
+    result = await call_agent("categorize_batch", payload, timeout=AGENT_TIMEOUTS["categorize_batch"])
+    return result.get("results", {})
 
 # Step 4: Finalize Summary
-async def call_final_summary(industry: str, overview: str, findings: dict, sources: List[str]) -> dict:
+async def call_final_summary(
+    industry: str,
+    overview: str,
+    findings: dict,
+    sources: List[str],
+    omitted_competitors: Optional[List[str]] = None,
+    failed_competitors: Optional[Dict[str, str]] = None
+) -> dict:
     payload = {"industry": industry, "overview": overview, "findings": findings, "sources": sources}
-    return await call_agent(FINAL_SUMMARY_URL, payload)
+    if omitted_competitors:
+        payload["omitted_competitors"] = omitted_competitors
+    if failed_competitors:
+        payload["failed_competitors"] = list(failed_competitors)
+    return await call_agent("summary", payload, timeout=AGENT_TIMEOUTS["summary"])
 
 async def call_reflection_agent(state: dict) -> dict:
-    return await call_agent(REFLECTION_AGENT_URL, state)
+    return await call_agent("reflection", state, timeout=AGENT_TIMEOUTS["reflection"])
 
+# Slim reflection call: the first request opens a session with base_analysis, later ones
+# only carry the feedback added since the previous call
+async def call_reflection_agent_slim(session: dict, state: dict) -> dict:
+    delta = [fb for fb in state["reflection_feedback"] if fb not in session["sent_feedback"]]
+    payload = {"session_id": session["session_id"], "reflection_feedback_delta": delta}
+    if not session["opened"]:
+        payload.update(base_analysis=state["base_analysis"], industry=state["industry"])
 
-# Orchestrator: Executes each agent in sequence and stops at final summary
-async def orchestrate_analysis(input_data: dict) -> dict:
+    try:
+        result = await call_agent("reflection_slim", payload, timeout=AGENT_TIMEOUTS["reflection"])
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 409:
+            # Session expired or hit another instance: reopen it with the full analysis and feedback
+            payload.update(
+                base_analysis=state["base_analysis"],
+                industry=state["industry"],
+                reflection_feedback_delta=state["reflection_feedback"]
+            )
+            result = await call_agent("reflection_slim", payload, timeout=AGENT_TIMEOUTS["reflection"])
+        elif e.response.status_code in (404, 405):
+            # Agent predates slim mode: fall back to posting the full state for this session
+            session["unsupported"] = True
+            return await call_reflection_agent(state)
+        else:
+            raise
+
+    session["opened"] = True
+    session["sent_feedback"] = list(state["reflection_feedback"])
+    return result
+
+
+def research_deadline(deadline: Optional[float]) -> Optional[float]:
+    # Small budgets keep most of their time for research instead of expiring before it starts
+    if deadline is None:
+        return None
+    left = max(deadline - time.monotonic(), 0.0)
+    return deadline - min(SUMMARY_RESERVE_SECONDS, SUMMARY_RESERVE_FRACTION * left)
+
+
+def dropped_by_deadline(error: BaseException) -> bool:
+    # A timeout after the active deadline passed means the budget ran out, not that the agent failed
+    return isinstance(error, SearchOmitted) or (isinstance(error, httpx.TimeoutException) and expired())
+
+
+# Search one competitor. A failed search is recorded in failures and returns None, so the
+# competitor is reported as failed rather than categorized as if it had no findings.
+async def search_competitor(
+    competitor: str,
+    failures: Dict[str, str],
+    emit: Optional[Callable[[dict], None]] = None
+) -> Optional[List[dict]]:
+    try:
+        with span("search", competitor=competitor):
+            search_results = await call_websearch_agent(competitor)
+    except SearchFailed as e:
+        warning_log("search.failed", str(e), competitor=competitor)
+        failures[competitor] = e.error
+        if emit:
+            emit({"event": "search", "competitor": competitor, "results": [], "error": e.error})
+        return None
+    if emit:
+        emit({"event": "search", "competitor": competitor, "results": search_results})
+    return search_results
+
+# Steps 2 + 3 for a single competitor: categorization starts as soon as its search lands.
+# Returns None when the search failed.
+async def analyze_competitor(
+    competitor: str,
+    search_limit: asyncio.Semaphore,
+    categorize_limit: asyncio.Semaphore,
+    emit: Optional[Callable[[dict], None]] = None,
+    previous: Optional[PreviousFindings] = None,
+    failures: Optional[Dict[str, str]] = None
+) -> Optional[Tuple[List[dict], dict]]:
+    async with search_limit:
+        search_results = await search_competitor(competitor, {} if failures is None else failures, emit)
+    if search_results is None:
+        return None
+    # Unchanged search results: the stored findings stand in for a new categorization
+    findings = previous.match(competitor, search_results) if previous else None
+    reused = findings is not None
+    if not reused:
+        async with categorize_limit:
+            with span("categorize", competitor=competitor):
+                findings = await call_categorize_findings(competitor, search_results)
+    if emit:
+        emit({"event": "categorization", "competitor": competitor, "findings": findings, "reused": reused})
+    return search_results, findings
+
+# Batch mode: search every competitor concurrently, then categorize them all in one batch request
+async def research_competitors_batched(
+    competitors: List[str],
+    emit: Optional[Callable[[dict], None]] = None,
+    previous: Optional[PreviousFindings] = None,
+    failures: Optional[Dict[str, str]] = None
+) -> Tuple[Dict[str, List[dict]], Dict[str, dict]]:
+    search_limit = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    failures = {} if failures is None else failures
+
+    async def search(competitor: str) -> Optional[List[dict]]:
+        async with search_limit:
+            return await search_competitor(competitor, failures, emit)
+
+    tasks = [asyncio.create_task(search(comp)) for comp in competitors]
+    if tasks:
+        await asyncio.wait(tasks, timeout=remaining(), return_when=asyncio.FIRST_EXCEPTION)
+    research_results = {}
+    try:
+        for comp, task in zip(competitors, tasks):
+            if task.done() and not (task.exception() and dropped_by_deadline(task.exception())):
+                if (search_results := task.result()) is not None:
+                    research_results[comp] = search_results
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    reused_findings = {}
+    for comp, search_results in research_results.items():
+        findings = previous.match(comp, search_results) if previous else None
+        if findings is not None:
+            reused_findings[comp] = findings
+    changed = {comp: results for comp, results in research_results.items() if comp not in reused_findings}
+    try:
+        with span("categorize", competitors=len(changed)):
+            batch_findings = await call_categorize_findings_batch(changed) if changed else {}
+    except httpx.TimeoutException as e:
+        if not dropped_by_deadline(e):
+            raise
+        changed = {}  # Out of time: only competitors with stored findings make it in
+        batch_findings = {}
+    categorized_findings = {}
+    for comp in research_results:
+        if comp not in reused_findings and comp not in changed:
+            continue
+        categorized_findings[comp] = reused_findings[comp] if comp in reused_findings else batch_findings.get(comp, {})
+        if emit:
+            emit({
+                "event": "categorization", "competitor": comp,
+                "findings": categorized_findings[comp], "reused": comp in reused_findings
+            })
+    return research_results, categorized_findings
+
+# Search and categorize every competitor, either one at a time or as independent pipelines.
+# emit, if given, receives a progress event as each search and categorization finishes.
+# Competitors whose search failed are left out of both results and recorded in failures.
+async def research_competitors(
+    competitors: List[str],
+    concurrent: bool = True,
+    emit: Optional[Callable[[dict], None]] = None,
+    batch: bool = False,
+    previous: Optional[PreviousFindings] = None,
+    failures: Optional[Dict[str, str]] = None
+) -> Tuple[Dict[str, List[dict]], Dict[str, dict]]:
+    unique_competitors = list(dict.fromkeys(competitors))
+    failures = {} if failures is None else failures
+
+    if batch:
+        return await research_competitors_batched(unique_competitors, emit, previous, failures)
+
+    if not concurrent:
+        # Competitors not reached before the deadline are left out of both results
+        research_results = {}
+        categorized_findings = {}
+        try:
+            for comp in unique_competitors:
+                search_results = await search_competitor(comp, failures, emit)
+                if search_results is not None:
+                    research_results[comp] = search_results
+            for comp in research_results:
+                findings = previous.match(comp, research_results[comp]) if previous else None
+                reused = findings is not None
+                if not reused:
+                    with span("categorize", competitor=comp):
+                        findings = await call_categorize_findings(comp, research_results[comp])
+                categorized_findings[comp] = findings
+                if emit:
+                    emit({"event": "categorization", "competitor": comp, "findings": findings, "reused": reused})
+        except (httpx.TimeoutException, SearchOmitted) as e:
+            if not dropped_by_deadline(e):
+                raise
+        return research_results, categorized_findings
+
+    search_limit = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    categorize_limit = asyncio.Semaphore(MAX_CONCURRENT_CATEGORIZATIONS)
+    tasks = [
+        asyncio.create_task(analyze_competitor(comp, search_limit, categorize_limit, emit, previous, failures))
+        for comp in unique_competitors
+    ]
+    # Without a deadline this waits for every pipeline; with one, unfinished competitors are dropped
+    if tasks:
+        await asyncio.wait(tasks, timeout=remaining(), return_when=asyncio.FIRST_EXCEPTION)
+
+    # Results are collected in input order, so both dicts keep the competitor ordering
+    research_results = {}
+    categorized_findings = {}
+    try:
+        for comp, task in zip(unique_competitors, tasks):
+            if not task.done() or (task.exception() and dropped_by_deadline(task.exception())):
+                continue
+            if (outcome := task.result()) is not None:
+                research_results[comp], categorized_findings[comp] = outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+    return research_results, categorized_findings
+
+
+# Incremental re-analysis: stored findings for these industries, keyed by competitor.
+# incremental=False recomputes everything (the fresh findings are still stored).
+# Store I/O runs on a worker thread so a SQLite store never blocks the event loop.
+async def previous_findings(industries: List[str], incremental: Optional[bool] = None) -> PreviousFindings:
+    if not (INCREMENTAL_ANALYSIS if incremental is None else incremental):
+        return PreviousFindings()
+    entries = {}
+    for industry in industries:
+        try:
+            stored = await asyncio.to_thread(analysis_store.load, industry)
+        except Exception as e:
+            warning_log("analysis_store.load_failed", f"Could not load stored findings for {industry}: {e}", industry=industry)
+            continue
+        for competitor, entry in stored.items():
+            entries.setdefault(competitor, entry)  # Findings depend only on the competitor's sources
+    return PreviousFindings(entries)
+
+
+async def save_findings(industry: str, research_results: Dict[str, List[dict]], categorized_findings: Dict[str, dict]):
+    # Empty findings (e.g. a competitor the batch endpoint skipped) are not worth reusing
+    entries = {
+        comp: {"sources_hash": sources_hash(research_results[comp]), "findings": findings}
+        for comp, findings in categorized_findings.items() if findings and comp in research_results
+    }
+    if not entries:
+        return
+    try:
+        await asyncio.to_thread(analysis_store.save, industry, entries)
+    except Exception as e:
+        warning_log("analysis_store.save_failed", f"Could not store findings for {industry}: {e}", industry=industry)
+
+
+# Orchestrator: Executes each agent in sequence and stops at final summary.
+# Yields an event as each stage completes; the last event ("result") carries the full response.
+async def orchestrate_analysis_events(input_data: dict) -> AsyncIterator[dict]:
     industry = input_data["industry"]
     specified_competitors = input_data.get("specified_competitors", [])
+    # The tighter of the caller's propagated deadline and this request's own budget.
+    # Each stage runs under it explicitly, since context changes must not span a yield.
+    deadline = earliest(current_deadline(), deadline_after(input_data.get("deadline_seconds") or ORCHESTRATION_DEADLINE))
 
     if specified_competitors:
         competitors = specified_competitors
         overview = f"Analysis of specified competitors in {industry} industry."
     else:
         gen_payload = {"industry": industry}
-        gen_result = await call_generate_competitors(gen_payload)
+        with span("generate", industry=industry), use_deadline(deadline):
+            gen_result = await call_generate_competitors(gen_payload)
         competitors = gen_result.get("competitors", [])
         overview = gen_result.get("overview", "")
+    yield {"event": "competitors", "competitors": competitors, "overview": overview}
 
-    research_results = {comp: await call_websearch_agent(comp) for comp in competitors}
-    
-    categorized_findings = {
-        comp: await call_categorize_findings(comp, research_results.get(comp, []))
-        for comp in competitors
-    }
+    previous = await previous_findings([industry], input_data.get("incremental"))
+    failures = {}
+
+    # Relay per-competitor events while the research pipelines are still running
+    events = asyncio.Queue()
+    # Research stops early enough to leave time for the summary
+    with use_deadline(research_deadline(deadline)):
+        research = asyncio.create_task(research_competitors(
+            competitors,
+            concurrent=input_data.get("concurrent", True),
+            emit=events.put_nowait,
+            batch=CATEGORIZE_BATCH_MODE if input_data.get("batch_categorize") is None else input_data["batch_categorize"],
+            previous=previous,
+            failures=failures
+        ))
+    research.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        research_results, categorized_findings = research.result()
+    finally:
+        research.cancel()
+
+    async for event in complete_analysis_events(
+        industry, specified_competitors, competitors, overview, research_results, categorized_findings, deadline,
+        previous, failures
+    ):
+        yield event
 
+
+# Steps 4 + 5 for one industry once its competitors are researched: summary, then reflection.
+# research_results, categorized_findings and failures may hold other industries' competitors too.
+async def complete_analysis_events(
+    industry: str,
+    specified_competitors: List[str],
+    competitors: List[str],
+    overview: str,
+    research_results: Dict[str, List[dict]],
+    categorized_findings: Dict[str, dict],
+    deadline: Optional[float],
+    previous: Optional[PreviousFindings] = None,
+    failures: Optional[Dict[str, str]] = None
+) -> AsyncIterator[dict]:
+    unique_competitors = list(dict.fromkeys(competitors))
+    research_results = {comp: research_results[comp] for comp in unique_competitors if comp in research_results}
+    categorized_findings = {comp: categorized_findings[comp] for comp in unique_competitors if comp in categorized_findings}
+    failed_competitors = {comp: failures[comp] for comp in unique_competitors if failures and comp in failures}
+    omitted_competitors = [
+        comp for comp in unique_competitors if comp not in categorized_findings and comp not in failed_competitors
+    ]
+    reused_competitors = [comp for comp in categorized_findings if previous and previous.was_reused(comp)]
+    recomputed_competitors = [comp for comp in categorized_findings if comp not in reused_competitors]
+    await save_findings(industry, research_results, categorized_findings)
     sources = [
-        res.get("url") for comp_results in research_results.values() for res in comp_results if res.get("url")
+        res.get("url")
+        for comp, comp_results in research_results.items() if comp in categorized_findings
+        for res in comp_results if res.get("url")
     ]
-    
-    final_summary_result = await call_final_summary(industry, overview, categorized_findings, sources)
+
+    # The summary is always produced, even past the deadline, so the caller gets a partial result
+    with span("summary", competitors=len(categorized_findings)), use_deadline(None):
+        final_summary_result = await call_final_summary(
+            industry, overview, categorized_findings, sources, omitted_competitors, failed_competitors
+        )
     final_summary = final_summary_result.get("summary", "No analysis provided.")
+    yield {"event": "summary", "summary": final_summary, "sources": sources}
 
     # Initial analysis state before reflection
     analysis_state = {
@@ -105,19 +474,159 @@ async def orchestrate_analysis(input_data: dict) -> dict:
         "next": "reflection"
     }
 
-    # Reflection Iteration
+    truncated = {"iterations": 0}
+    async for event in reflection_rounds(analysis_state, deadline, truncated):
+        yield event
+
+    yield {
+        "event": "result",
+        "result": {
+            "final_summary": analysis_state["final_analysis"],
+            "sources": sources,
+            "reflection_feedback": analysis_state["reflection_feedback"],
+            # Explicit markers for work dropped to meet the deadline
+            "partial": bool(omitted_competitors or failed_competitors or truncated["iterations"]),
+            "omitted": {"competitors": omitted_competitors, "reflection_iterations": truncated["iterations"]},
+            "errors": failed_competitors,  # Competitor -> why its search failed; not analyzed
+            # Competitors categorized on this run vs. stored findings reused because their sources were unchanged
+            "incremental": {"recomputed": recomputed_competitors, "reused": reused_competitors}
+        }
+    }
+
+
+# Reflection Iteration: yields an event per round of new feedback.
+# A round skipped to meet the deadline sets truncated["iterations"] to 1: later rounds
+# depend on its feedback, so whether they would have run at all is unknown.
+async def reflection_rounds(analysis_state: dict, deadline: Optional[float], truncated: dict) -> AsyncIterator[dict]:
+    reflection_session = {"session_id": uuid.uuid4().hex, "opened": False, "sent_feedback": [], "unsupported": False}
+    last_round_seconds = 0.0
     for i in range(analysis_state["max_reflection_iterations"]):
-        reflection_result = await call_reflection_agent(analysis_state)
+        time_left = deadline - time.monotonic() if deadline is not None else None
+        if time_left is not None and time_left < max(REFLECTION_MIN_SECONDS, last_round_seconds):
+            truncated["iterations"] = 1
+            return
+        started = time.monotonic()
+        try:
+            with span("reflection", iteration=i + 1), use_deadline(deadline):
+                if REFLECTION_SLIM_MODE and not reflection_session["unsupported"]:
+                    reflection_result = await call_reflection_agent_slim(reflection_session, analysis_state)
+                else:
+                    reflection_result = await call_reflection_agent(analysis_state)
+        except httpx.HTTPError as e:
+            # Reflection only refines the notes; keep the summary and the feedback gathered so far
+            if isinstance(e, httpx.TimeoutException) and deadline is not None and time.monotonic() >= deadline:
+                truncated["iterations"] = 1
+            else:
+                warning_log("reflection.failed", f"Reflection agent failed ({e}); stopping reflection")
+            return
+        last_round_seconds = time.monotonic() - started
         feedback = reflection_result.get("reflection_feedback", [])
         
         if not feedback or feedback == analysis_state["reflection_feedback"]:
-            break  # Stop iterating if no new feedback
+            return  # Stop iterating if no new feedback
 
         analysis_state["reflection_feedback"] = feedback
         analysis_state["reflection_iteration"] += 1
+        yield {
+            "event": "reflection",
+            "iteration": analysis_state["reflection_iteration"],
+            "reflection_feedback": feedback
+        }
+
+
+async def orchestrate_analysis(input_data: dict) -> dict:
+    async for event in orchestrate_analysis_events(input_data):
+        if event["event"] == "result":
+            return event["result"]
+
+
+def competitor_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+# Batch orchestration: many industries, each competitor researched once.
+# Web search and categorization depend only on the competitor, so their findings are shared;
+# every industry still gets its own summary and reflection.
+async def orchestrate_batch(input_data: dict) -> dict:
+    requests = {}
+    for item in input_data["industries"]:
+        item = {"industry": item} if isinstance(item, str) else item
+        requests.setdefault(item["industry"], item.get("specified_competitors") or [])
+    deadline = earliest(current_deadline(), deadline_after(input_data.get("deadline_seconds") or ORCHESTRATION_DEADLINE))
 
+    async def plan(industry: str, specified_competitors: List[str]) -> Tuple[List[str], str]:
+        if specified_competitors:
+            return specified_competitors, f"Analysis of specified competitors in {industry} industry."
+        with span("generate", industry=industry), use_deadline(deadline):
+            gen_result = await call_generate_competitors({"industry": industry})
+        return gen_result.get("competitors", []), gen_result.get("overview", "")
+
+    plans = await asyncio.gather(*(plan(industry, specified) for industry, specified in requests.items()), return_exceptions=True)
+
+    # A failed industry is reported on its own; the rest of the batch carries on
+    errors = {}
+    planned = {}
+    canonical = {}  # competitor_key -> first spelling seen, so "OpenAI" and "openai" are researched once
+    for industry, outcome in zip(requests, plans):
+        if isinstance(outcome, Exception):
+            errors[industry] = outcome
+            continue
+        competitors, overview = outcome
+        own = {}  # Each industry keeps its own spelling in its result
+        for comp in competitors:
+            own.setdefault(competitor_key(comp), comp)
+            canonical.setdefault(competitor_key(comp), comp)
+        planned[industry] = (list(own.values()), overview)
+    unique_competitors = list(canonical.values())
+    previous = await previous_findings(list(planned), input_data.get("incremental"))
+    failures = {}
+
+    with span("research", competitors=len(unique_competitors)), \
+            use_deadline(research_deadline(deadline)):
+        research_results, categorized_findings = await research_competitors(
+            unique_competitors,
+            concurrent=input_data.get("concurrent", True),
+            batch=CATEGORIZE_BATCH_MODE if input_data.get("batch_categorize") is None else input_data["batch_categorize"],
+            previous=previous,
+            failures=failures
+        )
+
+    def respell(shared: dict, competitors: List[str]) -> dict:
+        # Shared research is keyed by the first spelling seen; map it back to this industry's spellings
+        return {
+            comp: shared[canonical[competitor_key(comp)]]
+            for comp in competitors if canonical[competitor_key(comp)] in shared
+        }
+
+    async def complete(industry: str) -> dict:
+        competitors, overview = planned[industry]
+        async for event in complete_analysis_events(
+            industry, requests[industry], competitors, overview, respell(research_results, competitors),
+            respell(categorized_findings, competitors), deadline, previous, respell(failures, competitors)
+        ):
+            if event["event"] == "result":
+                return {"competitors": competitors, **event["result"]}
+
+    outcomes = dict(zip(planned, await asyncio.gather(*(complete(industry) for industry in planned), return_exceptions=True)))
+    outcomes.update(errors)
+
+    # Keyed by industry in request order; a failed industry carries "error" instead of a result
+    results = {}
+    for industry in requests:
+        outcome = outcomes[industry]
+        if isinstance(outcome, Exception):
+            outcome = {"error": str(outcome) or type(outcome).__name__}
+        results[industry] = outcome
+    mentions = sum(len(competitors) for competitors, _ in planned.values())
     return {
-        "final_summary": analysis_state["final_analysis"],
-        "sources": sources,
-        "reflection_feedback": analysis_state["reflection_feedback"]
+        "results": results,
+        "stats": {
+            "industries": len(requests),
+            "failed_industries": sum("error" in result for result in results.values()),
+            "competitor_mentions": mentions,
+            "unique_competitors": len(unique_competitors),
+            "research_reused": mentions - len(unique_competitors),  # Search + categorize calls saved by sharing
+            "findings_reused": len(previous.reused),  # Categorizations skipped because stored sources were unchanged
+            "findings_recomputed": sum(comp not in previous.reused for comp in categorized_findings)
+        }
     }
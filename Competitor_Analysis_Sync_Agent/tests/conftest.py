@@ -0,0 +1,98 @@
+import asyncio
+import os
+
+# Keep stores in memory and agent calls local before app modules read their settings
+os.environ.setdefault("ANALYSIS_STORE_PATH", "")
+os.environ.setdefault("JOB_STORE_PATH", "")
+os.environ.setdefault("AGENT_WARMUP", "false")
+
+import httpx
+import pytest
+from app import utils
+from app.analysis_store import MemoryAnalysisStore
+from agent_common.deadline import cap_timeout
+from app.resilience import ResilientCaller
+from app.transport import check_deadline
+
+
+class FakeAgents:
+    """Stands in for transport.call: canned answers per endpoint with configurable latency and failures."""
+
+    def __init__(self):
+        self.latency = {}  # endpoint -> seconds
+        self.competitor_latency = {}  # competitor -> extra seconds on its search and categorization
+        self.failures = {}  # endpoint -> exception raised on every call
+        self.search_errors = {}  # competitor -> error reported in /search "errors"
+        self.generated = ["Acme", "Globex", "Initech"]
+        self.calls = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self.overlaps = {}  # (endpoint, other endpoint in flight when it started) -> count
+        self.cancelled = []  # Endpoints whose call was cancelled before answering
+        self.timed_out = []  # Endpoints whose call ran out of time
+
+    async def call(self, endpoint: str, payload: dict, timeout=None) -> dict:
+        timeout = check_deadline(endpoint, timeout)
+        self.calls.append((endpoint, payload))
+        for other, count in self.in_flight.items():
+            if count:
+                self.overlaps[(endpoint, other)] = self.overlaps.get((endpoint, other), 0) + 1
+        self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + 1
+        self.max_in_flight[endpoint] = max(self.max_in_flight.get(endpoint, 0), self.in_flight[endpoint])
+        try:
+            competitor = payload.get("competitor") or (payload.get("competitors") or [None])[0]
+            latency = self.latency.get(endpoint, 0) + self.competitor_latency.get(competitor, 0)
+            limit = cap_timeout(timeout)
+            if limit is not None and latency > limit:
+                await asyncio.sleep(limit)
+                self.timed_out.append(endpoint)
+                raise httpx.ReadTimeout(f"{endpoint} timed out")
+            await asyncio.sleep(latency)
+            if endpoint in self.failures:
+                raise self.failures[endpoint]
+            return self.respond(endpoint, payload)
+        except asyncio.CancelledError:
+            self.cancelled.append(endpoint)
+            raise
+        finally:
+            self.in_flight[endpoint] -= 1
+
+    def respond(self, endpoint: str, payload: dict) -> dict:
+        if endpoint == "generate":
+            return {"competitors": list(self.generated), "overview": f"{payload['industry']} overview"}
+        if endpoint == "websearch":
+            results, errors = {}, {}
+            for comp in payload["competitors"]:
+                if comp in self.search_errors:
+                    results[comp], errors[comp] = [], self.search_errors[comp]
+                else:
+                    results[comp] = [{"title": f"{comp} news", "summary": f"{comp} ships things", "url": f"https://{comp}.example"}]
+            return {"competitor_results": results, "errors": errors}
+        if endpoint == "categorize":
+            return {"key_insights": [f"{payload['competitor']} insight"]}
+        if endpoint == "categorize_batch":
+            return {"results": {item["competitor"]: {"key_insights": [f"{item['competitor']} insight"]} for item in payload["items"]}}
+        if endpoint == "summary":
+            return {"summary": "## " + ", ".join(payload["findings"])}
+        if endpoint in ("reflection", "reflection_slim"):
+            return {"reflection_feedback": ["Add pricing"]}
+        raise AssertionError(f"unexpected endpoint {endpoint}")
+
+    def count(self, endpoint: str) -> int:
+        return sum(called == endpoint for called, _ in self.calls)
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    fake = FakeAgents()
+    monkeypatch.setattr(utils.transport, "call", fake.call)
+    monkeypatch.setattr(utils, "resilient_caller", ResilientCaller())
+    monkeypatch.setattr(utils, "analysis_store", MemoryAnalysisStore())
+    return fake
+
+
+@pytest.fixture
+def run():
+    def run(coroutine):
+        return asyncio.run(coroutine)
+    return run
@@ -0,0 +1,44 @@
+from app import utils
+
+
+def test_each_industry_keeps_its_own_spelling(agents, run):
+    result = run(utils.orchestrate_batch({"industries": [
+        {"industry": "Widgets", "specified_competitors": ["OpenAI", "Acme"]},
+        {"industry": "Gadgets", "specified_competitors": ["openai ", "ACME", "acme"]},
+    ]}))
+
+    widgets, gadgets = result["results"]["Widgets"], result["results"]["Gadgets"]
+    assert widgets["competitors"] == ["OpenAI", "Acme"]
+    assert widgets["final_summary"] == "## OpenAI, Acme"
+    assert gadgets["competitors"] == ["openai ", "ACME"]
+    assert gadgets["final_summary"] == "## openai , ACME"
+    assert gadgets["incremental"]["recomputed"] == ["openai ", "ACME"]
+
+    # Research still ran once per competitor
+    searched = [comp for endpoint, payload in agents.calls if endpoint == "websearch" for comp in payload["competitors"]]
+    assert sorted(searched) == ["Acme", "OpenAI"]
+    assert result["stats"]["unique_competitors"] == 2
+    assert result["stats"]["research_reused"] == 2
+
+
+def test_failures_use_each_industrys_spelling(agents, run):
+    agents.search_errors["Globex"] = "boom"
+    result = run(utils.orchestrate_batch({"industries": [
+        {"industry": "Widgets", "specified_competitors": ["Globex"]},
+        {"industry": "Gadgets", "specified_competitors": ["GLOBEX", "Acme"]},
+    ]}))
+
+    assert result["results"]["Widgets"]["errors"] == {"Globex": "boom"}
+    assert result["results"]["Gadgets"]["errors"] == {"GLOBEX": "boom"}
+
+
+def test_reused_findings_are_reported_under_each_spelling(agents, run):
+    industries = {"industries": [
+        {"industry": "Widgets", "specified_competitors": ["Acme"]},
+        {"industry": "Gadgets", "specified_competitors": ["ACME"]},
+    ], "incremental": True}
+    run(utils.orchestrate_batch(industries))
+    result = run(utils.orchestrate_batch(industries))
+
+    assert result["results"]["Widgets"]["incremental"] == {"recomputed": [], "reused": ["Acme"]}
+    assert result["results"]["Gadgets"]["incremental"] == {"recomputed": [], "reused": ["ACME"]}
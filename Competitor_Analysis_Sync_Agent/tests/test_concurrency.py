@@ -0,0 +1,110 @@
+import httpx
+import pytest
+from app import utils
+
+
+def server_error(endpoint: str, status: int = 500) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", f"http://agents/{endpoint}")
+    return httpx.HTTPStatusError(f"{endpoint} failed", request=request, response=httpx.Response(status, request=request))
+
+
+def test_results_keep_input_order_when_pipelines_finish_out_of_order(agents, run):
+    agents.competitor_latency = {"Acme": 0.06, "Globex": 0.03}
+    events = []
+
+    research_results, categorized_findings = run(
+        utils.research_competitors(["Acme", "Globex", "Initech"], emit=events.append)
+    )
+
+    assert list(research_results) == ["Acme", "Globex", "Initech"]
+    assert list(categorized_findings) == ["Acme", "Globex", "Initech"]
+    # Progress events arrive as each pipeline finishes
+    finished = [event["competitor"] for event in events if event["event"] == "categorization"]
+    assert finished == ["Initech", "Globex", "Acme"]
+
+
+def test_categorization_starts_before_slower_searches_finish(agents, run):
+    agents.competitor_latency = {"Acme": 0.05}
+    events = []
+
+    run(utils.research_competitors(["Acme", "Globex"], emit=events.append))
+
+    order = [(event["event"], event["competitor"]) for event in events]
+    assert order.index(("categorization", "Globex")) < order.index(("search", "Acme"))
+    # Globex's categorization started while Acme's search was still in flight
+    assert agents.overlaps[("categorize", "websearch")] == 1
+
+
+def test_concurrent_and_serial_paths_agree(agents, run):
+    competitors = ["Acme", "Globex", "Initech", "Acme"]
+    concurrent = run(utils.research_competitors(competitors, concurrent=True))
+    serial = run(utils.research_competitors(competitors, concurrent=False))
+
+    assert concurrent == serial
+    assert list(concurrent[0]) == ["Acme", "Globex", "Initech"]
+
+
+@pytest.mark.parametrize("searches, categorizations", [(1, 1), (2, 1), (3, 2)])
+def test_semaphores_bound_calls_in_flight(agents, run, monkeypatch, searches, categorizations):
+    monkeypatch.setattr(utils, "MAX_CONCURRENT_SEARCHES", searches)
+    monkeypatch.setattr(utils, "MAX_CONCURRENT_CATEGORIZATIONS", categorizations)
+    agents.latency = {"websearch": 0.01, "categorize": 0.02}
+    competitors = [f"Competitor {index}" for index in range(8)]
+
+    research_results, _ = run(utils.research_competitors(competitors))
+
+    assert len(research_results) == 8
+    assert agents.max_in_flight["websearch"] == searches
+    assert agents.max_in_flight["categorize"] == categorizations
+
+
+def test_batched_searches_are_bounded(agents, run, monkeypatch):
+    monkeypatch.setattr(utils, "MAX_CONCURRENT_SEARCHES", 2)
+    agents.latency = {"websearch": 0.01}
+
+    run(utils.research_competitors([f"Competitor {index}" for index in range(6)], batch=True))
+
+    assert agents.max_in_flight["websearch"] == 2
+    assert agents.count("categorize_batch") == 1
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_categorization_errors_propagate(agents, run, concurrent):
+    agents.failures["categorize"] = server_error("categorize")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(utils.research_competitors(["Acme", "Globex"], concurrent=concurrent))
+    # Not an LLM retry candidate: one call per competitor at most
+    assert agents.count("categorize") <= 2
+
+
+def test_failed_pipeline_cancels_the_rest(agents, run):
+    agents.competitor_latency = {"Globex": 0.2}
+    agents.failures["categorize"] = server_error("categorize")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(utils.research_competitors(["Acme", "Globex"]))
+
+    # Globex's slow search is abandoned rather than awaited and then categorized
+    assert agents.cancelled == ["websearch"]
+    assert agents.count("categorize") == 1
+
+
+def test_generate_failure_fails_the_analysis(agents, run):
+    agents.failures["generate"] = server_error("generate", 400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(utils.orchestrate_analysis({"industry": "Widgets"}))
+    assert agents.count("websearch") == 0
+
+
+def test_generate_failure_is_reported_per_industry_in_a_batch(agents, run):
+    agents.failures["generate"] = server_error("generate", 400)
+
+    result = run(utils.orchestrate_batch({"industries": [
+        "Widgets", {"industry": "Gadgets", "specified_competitors": ["Acme"]},
+    ]}))
+
+    assert "generate failed" in result["results"]["Widgets"]["error"]
+    assert result["results"]["Gadgets"]["competitors"] == ["Acme"]
+    assert result["stats"]["failed_industries"] == 1
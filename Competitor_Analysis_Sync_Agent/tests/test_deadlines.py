@@ -0,0 +1,55 @@
+from app import utils
+from agent_common.deadline import deadline_after
+
+
+def test_research_keeps_most_of_a_small_budget():
+    deadline = deadline_after(1.0)
+    assert deadline - utils.research_deadline(deadline) <= 0.3
+    assert utils.research_deadline(None) is None
+
+
+def test_research_reserve_is_capped_for_large_budgets():
+    deadline = deadline_after(100)
+    assert deadline - utils.research_deadline(deadline) <= utils.SUMMARY_RESERVE_SECONDS + 1e-6
+
+
+def test_budget_under_reserve_still_researches_every_competitor(agents, run):
+    agents.latency.update(websearch=0.05, categorize=0.1)
+    result = run(utils.orchestrate_analysis({
+        "industry": "Widgets", "specified_competitors": ["Acme", "Globex"], "deadline_seconds": 1.5
+    }))
+    assert result["omitted"]["competitors"] == []
+    assert "Acme" in result["final_summary"] and "Globex" in result["final_summary"]
+    assert agents.count("categorize") == 2
+
+
+def test_small_budget_with_slow_model_keeps_what_fits(agents, run):
+    agents.latency.update(generate=0.8, websearch=0.1, categorize=0.8)
+    result = run(utils.orchestrate_analysis({"industry": "Widgets", "deadline_seconds": 4}))
+    assert agents.timed_out == []
+    assert result["omitted"]["competitors"] == []
+
+
+def test_competitors_that_do_not_fit_are_omitted(agents, run):
+    agents.latency.update(categorize=5)
+    result = run(utils.orchestrate_analysis({
+        "industry": "Widgets", "specified_competitors": ["Acme"], "deadline_seconds": 0.5
+    }))
+    assert result["partial"] is True
+    assert result["omitted"]["competitors"] == ["Acme"]
+    assert agents.count("summary") == 1  # The summary is produced regardless
+
+
+def test_skipped_reflection_reports_only_the_round_that_was_due(agents, run):
+    result = run(utils.orchestrate_analysis({
+        "industry": "Widgets", "specified_competitors": ["Acme"], "deadline_seconds": 1
+    }))
+    assert agents.count("reflection_slim") == 0
+    assert result["omitted"]["reflection_iterations"] == 1
+
+
+def test_no_budget_runs_reflection_and_reports_nothing_omitted(agents, run):
+    result = run(utils.orchestrate_analysis({"industry": "Widgets", "specified_competitors": ["Acme"]}))
+    assert result["partial"] is False
+    assert result["omitted"] == {"competitors": [], "reflection_iterations": 0}
+    assert result["reflection_feedback"] == ["Add pricing"]
@@ -0,0 +1,45 @@
+import threading
+import time
+from app import analysis_store as store_module
+from app import utils
+
+REQUEST = {"industry": "Widgets", "specified_competitors": ["Acme", "Globex"], "incremental": True}
+
+
+def test_unchanged_sources_reuse_stored_findings(agents, run):
+    run(utils.orchestrate_analysis(REQUEST))
+    result = run(utils.orchestrate_analysis(REQUEST))
+
+    assert result["incremental"] == {"recomputed": [], "reused": ["Acme", "Globex"]}
+    assert agents.count("categorize") == 2
+
+
+def test_new_categorizer_version_recomputes(agents, run, monkeypatch):
+    run(utils.orchestrate_analysis(REQUEST))
+    monkeypatch.setattr(store_module, "CATEGORIZER_VERSION", "another-model/2")
+    result = run(utils.orchestrate_analysis(REQUEST))
+
+    assert result["incremental"] == {"recomputed": ["Acme", "Globex"], "reused": []}
+    assert agents.count("categorize") == 4
+
+
+def test_findings_older_than_max_age_are_recomputed(agents, run, monkeypatch):
+    run(utils.orchestrate_analysis(REQUEST))
+    monkeypatch.setattr(store_module, "ANALYSIS_MAX_AGE", 60)
+    stored = utils.analysis_store.industries["widgets"]
+    for entry in stored.values():
+        entry["stored_at"] = time.time() - 120
+
+    result = run(utils.orchestrate_analysis(REQUEST))
+    assert result["incremental"]["reused"] == []
+
+
+def test_store_io_runs_off_the_event_loop(agents, run, monkeypatch):
+    threads = []
+    load, save = utils.analysis_store.load, utils.analysis_store.save
+    monkeypatch.setattr(utils.analysis_store, "load", lambda *a: threads.append(threading.current_thread()) or load(*a))
+    monkeypatch.setattr(utils.analysis_store, "save", lambda *a: threads.append(threading.current_thread()) or save(*a))
+
+    run(utils.orchestrate_analysis(REQUEST))
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
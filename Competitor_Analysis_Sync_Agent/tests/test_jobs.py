@@ -0,0 +1,150 @@
+import asyncio
+import pytest
+from app import jobs
+from app.jobs import IdempotencyConflict, JobManager, MemoryJobStore, SQLiteJobStore
+
+
+class Runner:
+    """Orchestration stand-in that blocks until released."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+        self.before_return = None
+
+    async def __call__(self, request: dict) -> dict:
+        self.started.set()
+        await self.release.wait()
+        if self.before_return:
+            self.before_return()
+        return {"industry": request["industry"]}
+
+
+async def wait_for_status(store, job_id: str, status: str):
+    for _ in range(200):
+        if store.get(job_id)["status"] == status:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"job never reached {status}: {store.get(job_id)}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def test_cancel_through_another_worker_stops_the_job(store, run):
+    async def scenario():
+        runner = Runner()
+        owner, other = JobManager(store, runner, workers=1), JobManager(store, Runner(), workers=1)
+        await owner.start()
+        job, _ = owner.submit({"industry": "Widgets"})
+        await runner.started.wait()
+
+        other.cancel(job["job_id"])
+        owner.beat()
+        await asyncio.sleep(0)
+        await owner.stop()
+        return store.get(job["job_id"]), owner.counters
+
+    job, counters = run(scenario())
+    assert job["status"] == "cancelled"
+    assert counters["succeeded"] == 0
+
+
+def test_late_success_does_not_overwrite_a_cancel(store, run):
+    async def scenario():
+        runner = Runner()
+        manager = JobManager(store, runner, workers=1)
+        await manager.start()
+        job, _ = manager.submit({"industry": "Widgets"})
+        await runner.started.wait()
+        # Cancelled elsewhere just as the runner returns, before any heartbeat noticed
+        runner.before_return = lambda: store.update(job["job_id"], status="cancelled")
+        runner.release.set()
+        await wait_for_status(store, job["job_id"], "cancelled")
+        await asyncio.sleep(0.01)
+        await manager.stop()
+        return store.get(job["job_id"]), manager.counters
+
+    job, counters = run(scenario())
+    assert job["status"] == "cancelled"
+    assert job["result"] is None
+    assert counters["succeeded"] == 0
+
+
+def test_starting_a_worker_leaves_live_workers_jobs_alone(store, run):
+    async def scenario():
+        runner = Runner()
+        owner = JobManager(store, runner, workers=1)
+        await owner.start()
+        job, _ = owner.submit({"industry": "Widgets"})
+        await runner.started.wait()
+
+        newcomer = JobManager(store, Runner(), workers=1, stale_after=60)
+        await newcomer.start()
+        alive = store.get(job["job_id"])["status"]
+        await newcomer.stop()
+
+        runner.release.set()
+        await wait_for_status(store, job["job_id"], "succeeded")
+        await owner.stop()
+        return alive
+
+    assert run(scenario()) == "running"
+
+
+def test_jobs_of_a_dead_worker_are_failed(store, run):
+    store.create({
+        "job_id": "orphan", "status": "running", "request": {"industry": "Widgets"},
+        "owner": "gone:1:dead", "heartbeat_at": 0.0,
+    })
+
+    async def scenario():
+        manager = JobManager(store, Runner(), workers=1, stale_after=60)
+        await manager.start()
+        await manager.stop()
+        return manager.counters["reaped"]
+
+    assert run(scenario()) == 1
+    job = store.get("orphan")
+    assert job["status"] == "failed"
+    assert job["error"] == "Interrupted by server restart"
+
+
+@pytest.mark.parametrize("store_type", ["memory", "sqlite"])
+def test_idempotency_key_race_returns_the_existing_job(store_type, tmp_path, monkeypatch, run):
+    shared = MemoryJobStore() if store_type == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+    async def scenario():
+        first, second = JobManager(shared, Runner()), JobManager(shared, Runner())
+        original, _ = first.submit({"industry": "Widgets"}, idempotency_key="abc")
+        # The second submit checked for the key before the first one stored it
+        find, misses = shared.find_by_idempotency_key, [None]
+        monkeypatch.setattr(shared, "find_by_idempotency_key", lambda key: misses.pop() if misses else find(key))
+        duplicate, created = second.submit({"industry": "Widgets"}, idempotency_key="abc")
+        return original, duplicate, created
+
+    original, duplicate, created = run(scenario())
+    assert created is False
+    assert duplicate["job_id"] == original["job_id"]
+
+
+def test_reused_idempotency_key_with_a_different_body_conflicts(run):
+    async def scenario():
+        manager = JobManager(MemoryJobStore(), Runner())
+        manager.submit({"industry": "Widgets"}, idempotency_key="abc")
+        same, created = manager.submit({"industry": "Widgets"}, idempotency_key="abc")
+        assert created is False
+        with pytest.raises(IdempotencyConflict):
+            manager.submit({"industry": "Gadgets"}, idempotency_key="abc")
+
+    run(scenario())
+
+
+def test_memory_store_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_STORE_PATH", "")
+    monkeypatch.setattr(jobs, "WEB_CONCURRENCY", 2)
+
+    with pytest.raises(RuntimeError, match="JOB_STORE_PATH"):
+        jobs.create_job_store()
@@ -0,0 +1,56 @@
+import httpx
+from app import utils
+
+
+def status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://reflection.example/reflect-and-improve/slim")
+    return httpx.HTTPStatusError(f"{code}", request=request, response=httpx.Response(code, request=request))
+
+
+def fail_once(agents, monkeypatch, code: int):
+    answer = agents.call
+    failed = []
+
+    async def call(endpoint, payload, timeout=None):
+        if endpoint == "reflection_slim" and not failed:
+            failed.append(dict(payload))  # The caller updates payload before retrying
+            raise status_error(code)
+        return await answer(endpoint, payload, timeout)
+
+    monkeypatch.setattr(utils.transport, "call", call)
+    return failed
+
+
+def test_slim_rounds_send_the_analysis_once(agents, run):
+    session = {"session_id": "s1", "opened": False, "sent_feedback": [], "unsupported": False}
+    state = {"industry": "Widgets", "base_analysis": "analysis", "reflection_feedback": []}
+
+    run(utils.call_reflection_agent_slim(session, state))
+    state["reflection_feedback"] = ["Add pricing"]
+    run(utils.call_reflection_agent_slim(session, state))
+
+    first, second = [payload for endpoint, payload in agents.calls if endpoint == "reflection_slim"]
+    assert first["base_analysis"] == "analysis"
+    assert "base_analysis" not in second and second["reflection_feedback_delta"] == ["Add pricing"]
+
+
+def test_unknown_session_is_reopened_with_the_full_analysis(agents, run, monkeypatch):
+    failed = fail_once(agents, monkeypatch, 409)
+    session = {"session_id": "s1", "opened": True, "sent_feedback": ["Add pricing"], "unsupported": False}
+    state = {"industry": "Widgets", "base_analysis": "analysis", "reflection_feedback": ["Add pricing"]}
+
+    assert run(utils.call_reflection_agent_slim(session, state)) == {"reflection_feedback": ["Add pricing"]}
+    assert "base_analysis" not in failed[0]
+    [(_, retried)] = [call for call in agents.calls if call[0] == "reflection_slim"]
+    assert retried["base_analysis"] == "analysis"
+    assert retried["reflection_feedback_delta"] == ["Add pricing"]
+
+
+def test_agents_without_slim_mode_get_the_full_state(agents, run, monkeypatch):
+    fail_once(agents, monkeypatch, 404)
+
+    result = run(utils.orchestrate_analysis({"industry": "Widgets", "specified_competitors": ["Acme"]}))
+    assert result["reflection_feedback"] == ["Add pricing"]
+    # Later rounds go straight to the full-state endpoint
+    assert agents.count("reflection") == 2
+    assert agents.count("reflection_slim") == 0
@@ -0,0 +1,129 @@
+import asyncio
+import httpx
+import pytest
+from app import resilience
+from app.resilience import CircuitOpenError, ResilientCaller
+
+
+def server_error(status: int = 503) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://agent")
+    return httpx.HTTPStatusError("failed", request=request, response=httpx.Response(status, request=request))
+
+
+class Flaky:
+    """send() that fails the first `failures` times, then answers after `latency` seconds."""
+
+    def __init__(self, failures: int = 0, latency: float = 0.0):
+        self.failures = failures
+        self.latency = latency
+        self.calls = 0
+
+    async def send(self) -> dict:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise server_error()
+        await asyncio.sleep(self.latency)
+        return {"ok": self.calls}
+
+
+class Stalling:
+    """send() whose first call never answers, so only a concurrent hedge can."""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self) -> dict:
+        self.calls += 1
+        call = self.calls
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if call == 1:
+                await asyncio.Event().wait()
+            return {"ok": call}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "AGENT_RETRY_BASE_DELAY", 0)
+
+
+@pytest.mark.parametrize("endpoint", ["websearch", "summary"])
+def test_deterministic_endpoints_are_retried(endpoint, run):
+    caller, agent = ResilientCaller(), Flaky(failures=2)
+
+    assert run(caller.call("agent", endpoint, agent.send)) == {"ok": 3}
+    assert caller.stats()["endpoints"][endpoint]["retries"] == 2
+
+
+@pytest.mark.parametrize("endpoint", ["generate", "categorize", "categorize_batch", "reflection", "reflection_slim"])
+def test_llm_endpoints_are_not_retried_by_default(endpoint, run):
+    caller, agent = ResilientCaller(), Flaky(failures=1)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(caller.call("agent", endpoint, agent.send))
+    assert agent.calls == 1
+
+
+def test_llm_endpoints_can_opt_in(monkeypatch, run):
+    monkeypatch.setattr(resilience, "IDEMPOTENT_ENDPOINTS", {"websearch", "summary", "categorize"})
+    caller, agent = ResilientCaller(), Flaky(failures=1)
+
+    assert run(caller.call("agent", "categorize", agent.send)) == {"ok": 2}
+
+
+def test_client_errors_are_not_retried(run):
+    caller = ResilientCaller()
+    calls = []
+
+    async def send():
+        calls.append(1)
+        raise server_error(422)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(caller.call("agent", "websearch", send))
+    assert len(calls) == 1
+    assert caller.breaker("agent").state == "closed"
+
+
+def test_slow_calls_are_hedged(monkeypatch, run):
+    monkeypatch.setattr(resilience, "AGENT_HEDGE_MIN_SAMPLES", 1)
+    caller = ResilientCaller()
+    caller.endpoint_stats("websearch").latencies.append(0.01)
+    agent = Stalling()
+
+    assert run(caller.call("agent", "websearch", agent.send)) == {"ok": 2}
+    assert agent.max_in_flight == 2
+    assert agent.in_flight == 0  # The stalled primary was cancelled, not left running
+    assert caller.stats()["endpoints"]["websearch"]["hedges_won"] == 1
+
+
+def test_llm_endpoints_are_not_hedged(monkeypatch, run):
+    monkeypatch.setattr(resilience, "AGENT_HEDGE_MIN_SAMPLES", 1)
+    caller = ResilientCaller()
+    caller.endpoint_stats("categorize").latencies.append(0.01)
+    agent = Flaky(latency=0.1)
+
+    run(caller.call("agent", "categorize", agent.send))
+    assert caller.stats()["endpoints"]["categorize"]["hedges_sent"] == 0
+    assert agent.calls == 1
+
+
+def test_circuit_opens_after_consecutive_failures(monkeypatch, run):
+    monkeypatch.setattr(resilience, "AGENT_RETRY_ATTEMPTS", 1)
+    caller = ResilientCaller()
+    agent = Flaky(failures=100)
+
+    for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(httpx.HTTPStatusError):
+            run(caller.call("agent", "websearch", agent.send))
+    with pytest.raises(CircuitOpenError) as error:
+        run(caller.call("agent", "websearch", agent.send))
+
+    assert error.value.response.status_code == 503
+    assert agent.calls == resilience.CIRCUIT_FAILURE_THRESHOLD
+    assert caller.stats()["circuits"]["agent"]["state"] == "open"
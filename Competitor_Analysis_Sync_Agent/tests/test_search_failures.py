@@ -0,0 +1,63 @@
+import pytest
+from app import utils
+
+
+@pytest.mark.parametrize("mode", [{"concurrent": True}, {"concurrent": False}, {"batch_categorize": True}])
+def test_failed_search_is_reported_not_categorized(agents, run, mode):
+    agents.search_errors["Globex"] = "Error fetching search results: quota exceeded"
+    result = run(utils.orchestrate_analysis({
+        "industry": "Widgets", "specified_competitors": ["Acme", "Globex", "Initech"], **mode
+    }))
+    assert result["errors"] == {"Globex": "Error fetching search results: quota exceeded"}
+    assert result["partial"] is True
+    assert result["omitted"]["competitors"] == []
+    categorized = [payload["competitor"] for endpoint, payload in agents.calls if endpoint == "categorize"]
+    categorized += [item["competitor"] for endpoint, payload in agents.calls if endpoint == "categorize_batch" for item in payload["items"]]
+    assert sorted(categorized) == ["Acme", "Initech"]
+    summary = next(payload for endpoint, payload in agents.calls if endpoint == "summary")
+    assert list(summary["findings"]) == ["Acme", "Initech"]
+    assert summary["failed_competitors"] == ["Globex"]
+
+
+def test_failed_search_emits_an_error_event(agents, run):
+    agents.search_errors["Acme"] = "Search timed out after 30s"
+
+    async def collect():
+        return [event async for event in utils.orchestrate_analysis_events({"industry": "Widgets", "specified_competitors": ["Acme"]})]
+
+    events = run(collect())
+    search = next(event for event in events if event["event"] == "search")
+    assert search == {"event": "search", "competitor": "Acme", "results": [], "error": "Search timed out after 30s"}
+    assert not any(event["event"] == "categorization" for event in events)
+
+
+def test_batch_reports_failures_per_industry(agents, run):
+    agents.search_errors["Globex"] = "boom"
+    result = run(utils.orchestrate_batch({"industries": [
+        {"industry": "Widgets", "specified_competitors": ["Acme", "Globex"]},
+        {"industry": "Gadgets", "specified_competitors": ["Acme"]},
+    ]}))
+    assert result["results"]["Widgets"]["errors"] == {"Globex": "boom"}
+    assert result["results"]["Gadgets"]["errors"] == {}
+
+
+@pytest.mark.parametrize("mode", [{"concurrent": True}, {"concurrent": False}, {"batch_categorize": True}])
+def test_search_stopped_by_our_deadline_is_omitted_not_failed(agents, run, monkeypatch, mode):
+    # The agent reports an error because this request's own budget ran out
+    agents.search_errors["Globex"] = "Search timed out after 1s"
+    monkeypatch.setattr(utils, "expired", lambda: True)
+
+    result = run(utils.orchestrate_analysis({
+        "industry": "Widgets", "specified_competitors": ["Acme", "Globex"], **mode
+    }))
+    assert result["errors"] == {}
+    # The serial path stops at the deadline, so Acme may not have been categorized either
+    assert "Globex" in result["omitted"]["competitors"]
+
+
+def test_omitted_search_raises_an_explicit_error(agents, run, monkeypatch):
+    agents.search_errors["Globex"] = "Search timed out after 1s"
+    monkeypatch.setattr(utils, "expired", lambda: True)
+
+    with pytest.raises(utils.SearchOmitted):
+        run(utils.call_websearch_agent("Globex"))
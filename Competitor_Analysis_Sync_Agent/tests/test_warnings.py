@@ -0,0 +1,44 @@
+import json
+from agent_common import instrumentation
+from app import utils
+
+
+def capture(monkeypatch) -> list:
+    lines = []
+    monkeypatch.setattr(instrumentation._warning_logger, "warning", lines.append)
+    return lines
+
+
+def test_search_failures_are_logged_with_the_trace(agents, run, monkeypatch):
+    lines = capture(monkeypatch)
+    agents.search_errors["Globex"] = "quota exceeded"
+
+    async def analyze():
+        with instrumentation.span("request"):
+            trace_id = instrumentation.current_trace()[0]
+            await utils.orchestrate_analysis({"industry": "Widgets", "specified_competitors": ["Globex"]})
+            return trace_id
+
+    trace_id = run(analyze())
+    record = json.loads(lines[0])
+    assert record["event"] == "search.failed"
+    assert record["level"] == "warning"
+    assert record["competitor"] == "Globex"
+    assert record["trace_id"] == trace_id
+
+
+def test_warnings_are_size_capped(monkeypatch):
+    lines = capture(monkeypatch)
+    monkeypatch.setattr(instrumentation, "DEBUG_LOG_MAX_BYTES", 100)
+
+    instrumentation.warning_log("big", "x" * 1000)
+    assert lines[0].startswith('{"event": "big"')
+    assert "[truncated" in lines[0]
+
+
+def test_warnings_are_sampled(monkeypatch):
+    lines = capture(monkeypatch)
+    monkeypatch.setattr(instrumentation, "WARNING_LOG_SAMPLE_RATE", 0.0)
+
+    instrumentation.warning_log("dropped", "not kept")
+    assert lines == []
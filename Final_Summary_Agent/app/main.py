@@ -1,19 +1,32 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
-from app.utils import finalize_summary
+from typing import Dict, List, Literal, Optional
+from app.utils import finalize_summary, iter_summary_chunks, section_cache
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
 
 app = FastAPI(
     title="Final Summary",
     version="1.0",
     description="API to summarize competitive analysis"
 )
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "final-summary")
+add_warmup(app)  # Nothing heavy to load; /ready answers once started
+
+STREAM_MEDIA_TYPES = {"markdown": "text/markdown; charset=utf-8", "html": "text/html; charset=utf-8"}
 
 class SummaryRequest(BaseModel):
     industry: str
     overview: Optional[str] = None
     findings: Dict[str, dict]
     sources: List[str] = []
+    format: Literal["markdown", "html", "json"] = "markdown"
+    omitted_competitors: List[str] = []  # Competitors dropped by the orchestrator's time budget
+    failed_competitors: List[str] = []  # Competitors whose search failed, so they were not analyzed
 
 @app.post("/finalize_summary")
 async def get_summary(request: SummaryRequest):
@@ -22,8 +35,31 @@ async def get_summary(request: SummaryRequest):
             industry=request.industry,
             overview=request.overview,
             findings=request.findings,
-            sources=request.sources
+            sources=request.sources,
+            output_format=request.format,
+            omitted_competitors=request.omitted_competitors,
+            failed_competitors=request.failed_competitors
         )
         return {"summary": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/finalize_summary/stream")
+async def stream_summary(request: SummaryRequest):
+    """Chunked report: the header, one chunk per competitor section, then sources."""
+    if request.format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Streaming supports markdown and html formats")
+    chunks = iter_summary_chunks(
+        industry=request.industry,
+        overview=request.overview,
+        findings=request.findings,
+        sources=request.sources,
+        output_format=request.format,
+        omitted_competitors=request.omitted_competitors,
+        failed_competitors=request.failed_competitors
+    )
+    return StreamingResponse(chunks, media_type=STREAM_MEDIA_TYPES[request.format])
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return section_cache.stats()
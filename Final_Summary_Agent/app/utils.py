@@ -1,27 +1,175 @@
-def finalize_summary(industry: str, overview: str, findings: dict, sources: list) -> str:
-    competitor_sections = "\n\n".join(
-        f"## {competitor}\n\n" +
-        "\n".join([
-            f"* **Key Insights:** {', '.join(data.get('key_insights', []))}",
-            f"* **Unique Capabilities:** {', '.join(data.get('unique_capabilities', []))}",
-            f"* **Unique Selling Points & Target Market:** {', '.join(data.get('unique_selling_points', []))}",
-            f"* **Recent Innovations, Strengths & Weaknesses:** {', '.join(data.get('recent_innovations', []))}",
-            f"* **Market Positioning:** {', '.join(data.get('market_positioning', []))}",
-            f"* **Challenges:** {', '.join(data.get('challenges', []))}",
-            f"* **Future Vision:** {', '.join(data.get('future_vision', []))}"
-        ])
-        for competitor, data in findings.items()
+import hashlib
+import html
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Rendered competitor sections kept for reuse across calls
+SECTION_CACHE_SIZE = int(os.getenv("SECTION_CACHE_SIZE", 1024))
+
+SUPPORTED_FORMATS = ("markdown", "html", "json")
+
+# Precompiled section template: findings key and label, in render order
+SECTION_FIELDS = [
+    ("key_insights", "Key Insights"),
+    ("unique_capabilities", "Unique Capabilities"),
+    ("unique_selling_points", "Unique Selling Points & Target Market"),
+    ("recent_innovations", "Recent Innovations, Strengths & Weaknesses"),
+    ("market_positioning", "Market Positioning"),
+    ("challenges", "Challenges"),
+    ("future_vision", "Future Vision"),
+]
+
+# Shown when the orchestrator ran out of time before researching some competitors
+OMITTED_NOTICE = "Omitted (time budget exceeded)"
+FAILED_NOTICE = "Not analyzed (search failed)"
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+class SectionCache:
+    """LRU of rendered sections keyed by a hash of (format, competitor, findings)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_render(self, output_format: str, competitor: str, data: dict) -> Union[str, dict]:
+        material = json.dumps([output_format, competitor, data], sort_keys=True, default=str)
+        key = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        with self.lock:
+            section = self.entries.get(key)
+            if section is not None:
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return section
+            self.counters["misses"] += 1
+
+        section = SECTION_RENDERERS[output_format](competitor, data)
+        with self.lock:
+            self.entries[key] = section
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+        return section
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**self.counters, "entries": len(self.entries), "max_entries": self.max_entries}
+
+
+def render_markdown_section(competitor: str, data: dict) -> str:
+    return f"## {competitor}\n\n" + "\n".join(
+        f"* **{label}:** {', '.join(data.get(key, []))}" for key, label in SECTION_FIELDS
     )
-    
-    summary = f"""✅ Final Competitive Analysis Summary:
 
-# Competitive Analysis: {industry}
 
-{overview or "Comprehensive Competitive Landscape Overview"}
+def render_html_section(competitor: str, data: dict) -> str:
+    items = "\n".join(
+        f"<li><strong>{html.escape(label)}:</strong> {html.escape(', '.join(data.get(key, [])))}</li>"
+        for key, label in SECTION_FIELDS
+    )
+    return f"<h2>{html.escape(competitor)}</h2>\n<ul>\n{items}\n</ul>"
+
+
+def render_json_section(competitor: str, data: dict) -> dict:
+    return {"competitor": competitor, **{key: list(data.get(key, [])) for key, _ in SECTION_FIELDS}}
+
+
+SECTION_RENDERERS = {
+    "markdown": render_markdown_section,
+    "html": render_html_section,
+    "json": render_json_section,
+}
+
+section_cache = SectionCache(SECTION_CACHE_SIZE)
+
+
+def canonicalize_url(url: str) -> str:
+    """Lower-case scheme/host, drop default ports, fragments, tracking params and trailing slashes."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if netloc.endswith(DEFAULT_PORTS.get(scheme, "\0")):
+        netloc = netloc[:-len(DEFAULT_PORTS[scheme])]
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMS)
+    ])
+    path = parts.path.rstrip("/") if parts.path not in ("", "/") else ""
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def dedupe_sources(sources: List[str]) -> List[str]:
+    return list(dict.fromkeys(canonicalize_url(source) for source in sources if source and source.strip()))
+
+
+def iter_summary_chunks(
+    industry: str,
+    overview: Optional[str],
+    findings: dict,
+    sources: list,
+    output_format: str = "markdown",
+    omitted_competitors: Optional[List[str]] = None,
+    failed_competitors: Optional[List[str]] = None
+) -> Iterator[str]:
+    """Yield the text report piece by piece: header, one chunk per competitor, then sources."""
+    sources = dedupe_sources(sources)
+    overview = overview or "Comprehensive Competitive Landscape Overview"
+    competitors = list(findings.items())
+
+    if output_format == "html":
+        yield f"<h1>Competitive Analysis: {html.escape(industry)}</h1>\n<p>{html.escape(overview)}</p>\n"
+        for competitor, data in competitors:
+            yield section_cache.get_or_render("html", competitor, data) + "\n"
+        if omitted_competitors:
+            yield f"<p><strong>{OMITTED_NOTICE}:</strong> {html.escape(', '.join(omitted_competitors))}</p>\n"
+        if failed_competitors:
+            yield f"<p><strong>{FAILED_NOTICE}:</strong> {html.escape(', '.join(failed_competitors))}</p>\n"
+        source_items = "\n".join(
+            f'<li><a href="{html.escape(source, quote=True)}">{html.escape(source)}</a></li>' for source in sources
+        )
+        yield f"<h3>Sources</h3>\n<ul>\n{source_items}\n</ul>\n" if sources else "<h3>Sources</h3>\n<p>No sources available.</p>\n"
+        return
+
+    yield f"✅ Final Competitive Analysis Summary:\n\n# Competitive Analysis: {industry}\n\n{overview}\n\n"
+    for index, (competitor, data) in enumerate(competitors):
+        separator = "\n\n" if index < len(competitors) - 1 else ""
+        yield section_cache.get_or_render("markdown", competitor, data) + separator
+    if omitted_competitors:
+        yield f"\n\n⚠️ **{OMITTED_NOTICE}:** {', '.join(omitted_competitors)}"
+    if failed_competitors:
+        yield f"\n\n⚠️ **{FAILED_NOTICE}:** {', '.join(failed_competitors)}"
+    yield f"\n\n### Sources\n{chr(10).join(sources) if sources else 'No sources available.'}\n"
 
-{competitor_sections}
 
-### Sources
-{chr(10).join(sources) if sources else "No sources available."}
-"""
-    return summary
+def finalize_summary(
+    industry: str,
+    overview: str,
+    findings: dict,
+    sources: list,
+    output_format: str = "markdown",
+    omitted_competitors: Optional[List[str]] = None,
+    failed_competitors: Optional[List[str]] = None
+) -> Union[str, Dict]:
+    if output_format == "json":
+        summary = {
+            "industry": industry,
+            "overview": overview or "Comprehensive Competitive Landscape Overview",
+            "competitors": [section_cache.get_or_render("json", competitor, data) for competitor, data in findings.items()],
+            "sources": dedupe_sources(sources),
+        }
+        if omitted_competitors:
+            summary["omitted_competitors"] = list(omitted_competitors)
+        if failed_competitors:
+            summary["failed_competitors"] = list(failed_competitors)
+        return summary
+    return "".join(iter_summary_chunks(
+        industry, overview, findings, sources, output_format, omitted_competitors, failed_competitors
+    ))
@@ -0,0 +1,16 @@
+import pytest
+from app import utils
+
+
+@pytest.fixture
+def section_cache(monkeypatch):
+    cache = utils.SectionCache(max_entries=2)
+    monkeypatch.setattr(utils, "section_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def client(section_cache):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
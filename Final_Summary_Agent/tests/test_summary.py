@@ -0,0 +1,80 @@
+from app import utils
+from app.utils import canonicalize_url, dedupe_sources, finalize_summary
+
+FINDINGS = {
+    "Acme": {"key_insights": ["Cheap", "Fast"], "challenges": ["Churn"]},
+    "Globex <Corp>": {"key_insights": ["R&D heavy"]},
+}
+SOURCES = ["https://Acme.example:443/news/?utm_source=x&id=1#top", "https://acme.example/news?id=1", "", "http://globex.example/"]
+
+
+def test_canonical_urls_drop_tracking_and_defaults():
+    assert canonicalize_url(" HTTPS://Acme.Example:443/news/?utm_source=x&id=1&fbclid=y#top ") == "https://acme.example/news?id=1"
+    assert canonicalize_url("http://acme.example:8080/") == "http://acme.example:8080"
+    assert dedupe_sources(SOURCES) == ["https://acme.example/news?id=1", "http://globex.example"]
+
+
+def test_markdown_report(section_cache):
+    summary = finalize_summary("Widgets", None, FINDINGS, SOURCES, omitted_competitors=["Initech"], failed_competitors=["Hooli"])
+
+    assert summary.startswith("✅ Final Competitive Analysis Summary:\n\n# Competitive Analysis: Widgets")
+    assert "## Acme\n\n* **Key Insights:** Cheap, Fast" in summary
+    assert "* **Challenges:** Churn" in summary
+    assert f"**{utils.OMITTED_NOTICE}:** Initech" in summary
+    assert f"**{utils.FAILED_NOTICE}:** Hooli" in summary
+    assert summary.endswith("### Sources\nhttps://acme.example/news?id=1\nhttp://globex.example\n")
+
+
+def test_html_report_escapes_content(section_cache):
+    summary = finalize_summary("Widgets & Co", "Overview", FINDINGS, [], output_format="html")
+
+    assert "<h1>Competitive Analysis: Widgets &amp; Co</h1>" in summary
+    assert "<h2>Globex &lt;Corp&gt;</h2>" in summary
+    assert "<li><strong>Key Insights:</strong> R&amp;D heavy</li>" in summary
+    assert "<p>No sources available.</p>" in summary
+
+
+def test_json_report(section_cache):
+    summary = finalize_summary("Widgets", "Overview", FINDINGS, SOURCES, output_format="json", omitted_competitors=["Initech"])
+
+    assert summary["competitors"][0]["competitor"] == "Acme"
+    assert summary["competitors"][0]["key_insights"] == ["Cheap", "Fast"]
+    assert summary["competitors"][1]["challenges"] == []
+    assert summary["sources"] == dedupe_sources(SOURCES)
+    assert summary["omitted_competitors"] == ["Initech"]
+    assert "failed_competitors" not in summary
+
+
+def test_sections_are_rendered_once_per_format_and_content(section_cache, monkeypatch):
+    rendered = []
+    render = utils.SECTION_RENDERERS["markdown"]
+    monkeypatch.setitem(utils.SECTION_RENDERERS, "markdown", lambda *args: rendered.append(args[0]) or render(*args))
+
+    first = finalize_summary("Widgets", None, FINDINGS, [])
+    assert finalize_summary("Widgets", "Another overview", FINDINGS, []) != first
+    finalize_summary("Widgets", None, {"Acme": {"key_insights": ["Changed"]}}, [])
+
+    assert rendered == ["Acme", "Globex <Corp>", "Acme"]
+    assert section_cache.stats()["hits"] == 2
+
+
+def test_section_cache_evicts_least_recently_used(section_cache):
+    for competitor in ("A", "B", "C"):
+        section_cache.get_or_render("markdown", competitor, {})
+
+    assert section_cache.stats()["evictions"] == 1
+    assert section_cache.stats()["entries"] == 2
+
+
+def test_stream_matches_the_full_report(client):
+    payload = {"industry": "Widgets", "findings": FINDINGS, "sources": SOURCES, "failed_competitors": ["Hooli"]}
+    with client.stream("POST", "/finalize_summary/stream", json=payload) as response:
+        assert response.headers["content-type"].startswith("text/markdown")
+        streamed = "".join(response.iter_text())
+
+    assert streamed == client.post("/finalize_summary", json=payload).json()["summary"]
+
+
+def test_stream_rejects_json(client):
+    response = client.post("/finalize_summary/stream", json={"industry": "Widgets", "findings": {}, "format": "json"})
+    assert response.status_code == 400
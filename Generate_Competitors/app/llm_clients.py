@@ -0,0 +1,51 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+# Maximum number of distinct (API key, sampling params) clients kept alive per process
+LLM_CLIENT_CACHE_SIZE = int(os.getenv("LLM_CLIENT_CACHE_SIZE", 16))
+
+
+def api_key_digest(api_key: str) -> str:
+    """Stable, non-reversible identity for an API key, for keying per-credential state."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class LLMClientRegistry:
+    """Process-wide, thread-safe LRU of LLM clients keyed by API key and sampling params."""
+
+    def __init__(self, factory: Callable[..., Any], max_clients: int = LLM_CLIENT_CACHE_SIZE):
+        self.factory = factory
+        self.max_clients = max_clients
+        self.clients = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"constructed": 0, "reused": 0, "evicted": 0}
+
+    def _key(self, api_key: str, params: dict) -> str:
+        # Only a digest of the API key is kept as the registry key
+        material = json.dumps({"api_key": api_key_digest(api_key), "params": params}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, api_key: str, **params) -> Any:
+        key = self._key(api_key, params)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is not None:
+                self.clients.move_to_end(key)
+                self.counters["reused"] += 1
+                return client
+
+            client = self.factory(api_key, **params)
+            self.clients[key] = client
+            self.counters["constructed"] += 1
+            while len(self.clients) > self.max_clients:
+                self.clients.popitem(last=False)
+                self.counters["evicted"] += 1
+            return client
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**self.counters, "clients": len(self.clients), "max_clients": self.max_clients}
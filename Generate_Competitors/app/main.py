@@ -1,9 +1,21 @@
 from fastapi import FastAPI, Header, Depends, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Annotated
-from app.utils import generate_competitors
+from app.utils import GenerateCompetitorsResponse, generate_competitors, llm_clients, warm_up_llm
+from agent_common.llm_cache import llm_cache
+from agent_common.limiter import llm_limiter
+from agent_common.singleflight import inflight_calls
+from agent_common.deadline import DeadlineMiddleware
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
 
 app = FastAPI(title="Competitive Analysis API Agent")
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "generate-competitors")
+app.add_middleware(DeadlineMiddleware)
+add_warmup(app, [("llm_client", warm_up_llm)])
 
 # -----------------------------
 # Pydantic Models for Requests/Responses
@@ -12,31 +24,45 @@ class GenerateCompetitorsRequest(BaseModel):
     industry: str
     specified_competitors: Optional[List[str]] = None
 
-class GenerateCompetitorsResponse(BaseModel):
-    competitors: List[str]
-    overview: str
-
-# Dependency to extract API key from header.
-#def get_api_key(x_api_key: str = Header(..., alias="X-API-KEY")) -> str:
-#    if not x_api_key:
-#        raise HTTPException(status_code=400, detail="X-API-KEY header missing")
-#    return x_api_key
+# Dependency to extract an optional API key from header; falls back to SAMBANOVA_API_KEY when absent.
+# Everything shared between requests (clients, response cache, coalesced calls) is keyed per credential.
+def get_api_key(x_api_key: Optional[str] = Header(None, alias="X-API-KEY")) -> Optional[str]:
+    return x_api_key or None
 
 # -----------------------------
 # API Endpoint
 # -----------------------------
 @app.post("/analysis/generate", response_model=GenerateCompetitorsResponse)
-def api_generate_competitors(
+async def api_generate_competitors(
     request: GenerateCompetitorsRequest,
-    #api_key: Annotated[str, Depends(get_api_key)]
+    api_key: Annotated[Optional[str], Depends(get_api_key)]
 ):
     """
     Generate competitors and industry overview using the provided API key (from header)
     and request body data.
     """
-    result = generate_competitors(
+    result = await generate_competitors(
         industry=request.industry,
-        specified_competitors=request.specified_competitors
-        #api_key=api_key
+        specified_competitors=request.specified_competitors,
+        api_key=api_key
     )
     return GenerateCompetitorsResponse(**result)
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return llm_cache.stats()
+
+@app.get("/llm-clients/stats")
+def llm_client_stats():
+    return llm_clients.stats()
+
+@app.get("/load")
+def load():
+    # In-flight and queued model calls, for autoscaling
+    return llm_limiter.stats()
+
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    # "coalesced" counts model calls that joined an identical prompt already in flight
+    return inflight_calls.stats()
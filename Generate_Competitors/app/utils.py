@@ -1,10 +1,14 @@
 import os
-import json
-import re
-from fastapi import HTTPException
 from dotenv import load_dotenv
-from langchain_sambanova import ChatSambaNovaCloud
-from typing import List, Optional
+from pydantic import BaseModel
+from typing import TYPE_CHECKING, List, Optional
+from agent_common.llm_cache import llm_cache, make_cache_key
+from agent_common.singleflight import inflight_calls
+from app.llm_clients import LLMClientRegistry, api_key_digest
+from agent_common.structured_output import invoke_structured
+
+if TYPE_CHECKING:
+    from langchain_sambanova import ChatSambaNovaCloud
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -15,11 +19,35 @@ MODEL = "Meta-Llama-3.3-70B-Instruct"
 MAX_TOKENS = 2000
 TEMPERATURE = 0.7
 TOP_P = 0.01
+SAMPLING_PARAMS = {"max_tokens": MAX_TOKENS, "temperature": TEMPERATURE, "top_p": TOP_P}
 
 if not MODEL:
     raise Exception("Missing required environment variable: MODEL")
 
-def generate_competitors(
+def build_llm(api_key: str, **params) -> "ChatSambaNovaCloud":
+    # Imported on first use (or by the startup warm-up), keeping the SDK off the cold-start path
+    from langchain_sambanova import ChatSambaNovaCloud
+    return ChatSambaNovaCloud(model=MODEL, sambanova_api_key=api_key, **params)
+
+# Clients are built once per (API key, sampling params) and shared across requests
+llm_clients = LLMClientRegistry(build_llm)
+
+def get_llm(api_key: str) -> "ChatSambaNovaCloud":
+    return llm_clients.get(
+        api_key,
+        max_tokens=int(MAX_TOKENS),
+        temperature=float(TEMPERATURE),
+        top_p=float(TOP_P)
+    )
+
+def warm_up_llm():
+    # Keys may also arrive per request via X-API-KEY; without a default one only the SDK is loaded
+    if SAMBANOVA_API_KEY:
+        get_llm(SAMBANOVA_API_KEY)
+    else:
+        import langchain_sambanova  # noqa: F401
+
+async def generate_competitors(
     industry: str,
     specified_competitors: Optional[List[str]] = None,
     api_key: Optional[str] = None
@@ -36,16 +64,8 @@ def generate_competitors(
     if not api_key:
         raise Exception("API key not provided either via header or environment variable.")
 
-    # Set the API key in the environment for the ChatSambaNovaCloud integration.
-    os.environ["SAMBANOVA_API_KEY"] = api_key
-
-    # Instantiate the ChatSambaNovaCloud model
-    llm = ChatSambaNovaCloud(
-        model=MODEL,
-        max_tokens=int(MAX_TOKENS),
-        temperature=float(TEMPERATURE),
-        top_p=float(TOP_P)
-    )
+    # Reuse the process-wide client for this key; the key is passed directly, never via os.environ
+    llm = get_llm(api_key)
 
     if specified_competitors:
         # Instruct the model to consider only the provided competitor names.
@@ -77,29 +97,26 @@ def generate_competitors(
         ("human", prompt)
     ]
 
-    response = llm.invoke(messages)
-    response_text = response.content.strip()
-
-    # Attempt to parse the response as JSON.
-    try:
-        response_json = json.loads(response_text)
-    except json.JSONDecodeError:
-        # Try to extract a JSON substring from the response using regex.
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
-            try:
-                response_json = json.loads(match.group(0))
-            except json.JSONDecodeError:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error decoding JSON after extraction. Raw output: {response_text}"
-                )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error decoding response from SambaNova LLM. Ensure the format is valid JSON. Raw output: {response_text}"
-            )
-
-    competitors = response_json.get("competitors", [])
-    overview = response_json.get("overview", "")
-    return {"competitors": competitors, "overview": overview}
+    # Keyed per credential, so a cached answer never stands in for checking another caller's key
+    cache_key = make_cache_key(MODEL, {**SAMPLING_PARAMS, "api_key": api_key_digest(api_key)}, messages)
+    cached = await llm_cache.aget(cache_key)
+    if cached is not None:
+        return cached
+
+    # Stream the answer, stop once the JSON object closes, and validate it (with bounded repair)
+    async def call_model():
+        result = await invoke_structured(llm, messages, GenerateCompetitorsResponse)
+        await llm_cache.aset(cache_key, result, tag=industry)
+        return result
+
+    # Identical prompts already in flight for the same credential share that model call;
+    # a caller with a different key always makes (and is authenticated by) its own call
+    return await inflight_calls.do(cache_key, call_model)
+
+
+# -----------------------------
+# Pydantic Models for Responses
+# -----------------------------
+class GenerateCompetitorsResponse(BaseModel):
+    competitors: List[str]
+    overview: str
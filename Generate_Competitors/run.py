@@ -1,6 +1,13 @@
 import os
 import uvicorn
 
+# "production" runs without the auto-reloader and with WEB_CONCURRENCY worker processes
+APP_ENV = os.getenv("APP_ENV", "development").lower()
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 3000))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
+    if APP_ENV == "production":
+        uvicorn.run("app.main:app", host="0.0.0.0", port=port, workers=WEB_CONCURRENCY)
+    else:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
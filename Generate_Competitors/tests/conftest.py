@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app import utils
+from agent_common.llm_cache import LLMCache
+from agent_common.singleflight import SingleFlight
+
+
+class FakeModel:
+    """Replaces invoke_structured: answers after a delay, rejecting keys listed in invalid_keys."""
+
+    def __init__(self):
+        self.latency = 0.0
+        self.invalid_keys = set()
+        self.calls = []
+
+    async def invoke(self, llm, messages, response_model):
+        self.calls.append(llm)
+        await asyncio.sleep(self.latency)
+        if llm in self.invalid_keys:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        return {"competitors": ["Acme"], "overview": f"answered with {llm}"}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(utils, "invoke_structured", fake.invoke)
+    monkeypatch.setattr(utils, "get_llm", lambda api_key: api_key)  # The "client" is just its key
+    monkeypatch.setattr(utils, "llm_cache", LLMCache(max_entries=32))
+    monkeypatch.setattr(utils, "inflight_calls", SingleFlight())
+    return fake
+
+
+@pytest.fixture
+def run():
+    def run(coroutine):
+        return asyncio.run(coroutine)
+    return run
@@ -0,0 +1,37 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app import utils
+
+
+def test_cached_answer_is_not_served_to_another_key(model, run):
+    run(utils.generate_competitors("Widgets", api_key="good-key"))
+    model.invalid_keys.add("revoked-key")
+    with pytest.raises(HTTPException) as error:
+        run(utils.generate_competitors("Widgets", api_key="revoked-key"))
+    assert error.value.status_code == 401
+
+
+def test_cached_answer_is_reused_for_the_same_key(model, run):
+    run(utils.generate_competitors("Widgets", api_key="good-key"))
+    run(utils.generate_competitors("Widgets", api_key="good-key"))
+    assert model.calls == ["good-key"]
+
+
+def test_concurrent_calls_coalesce_only_within_a_key(model, run):
+    model.latency = 0.1
+    model.invalid_keys.add("revoked-key")
+
+    async def burst():
+        return await asyncio.gather(
+            utils.generate_competitors("Widgets", api_key="good-key"),
+            utils.generate_competitors("Widgets", api_key="good-key"),
+            utils.generate_competitors("Widgets", api_key="revoked-key"),
+            return_exceptions=True
+        )
+
+    first, second, revoked = run(burst())
+    assert first == second == {"competitors": ["Acme"], "overview": "answered with good-key"}
+    assert isinstance(revoked, HTTPException) and revoked.status_code == 401
+    assert sorted(model.calls) == ["good-key", "revoked-key"]
+    assert utils.inflight_calls.stats()["coalesced"] == 1
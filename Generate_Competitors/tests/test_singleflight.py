@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from agent_common.deadline import deadline_after, remaining, use_deadline
+from agent_common.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call(run):
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": 42}
+
+    async def burst():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert run(burst()) == [{"answer": 42}] * 5
+    assert len(calls) == 1
+    assert flights.stats()["coalesced"] == 4
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter(run):
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise HTTPException(status_code=502, detail="bad output")
+
+    async def burst():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(error, HTTPException) and error.status_code == 502 for error in run(burst()))
+
+
+def test_short_deadline_caller_leaves_without_cancelling_the_rest(run):
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def impatient():
+        with use_deadline(deadline_after(0.05)):
+            return await flights.do("key", work)
+
+    async def burst():
+        return await asyncio.gather(impatient(), flights.do("key", work), return_exceptions=True)
+
+    timed_out, patient = run(burst())
+    assert isinstance(timed_out, HTTPException) and timed_out.status_code == 504
+    assert patient == "done"
+
+
+def test_call_is_cancelled_once_nobody_waits(run):
+    flights = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.2)
+        finished.append(True)
+
+    async def scenario():
+        with use_deadline(deadline_after(0.05)):
+            with pytest.raises(HTTPException):
+                await flights.do("key", work)
+        await asyncio.sleep(0.3)
+
+    run(scenario())
+    assert finished == []
+    assert flights.stats()["abandoned"] == 1
+
+
+def test_disabled_runs_every_call(run):
+    flights = SingleFlight(enabled=False)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def burst():
+        await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+
+    run(burst())
+    assert len(calls) == 3
+
+
+def test_call_runs_under_the_latest_waiting_deadline(run):
+    flights = SingleFlight()
+    seen = []
+
+    async def work():
+        seen.append(remaining())
+        await asyncio.sleep(0.05)
+        seen.append(remaining())
+        await asyncio.sleep(0.1)
+        seen.append(remaining())
+        return "done"
+
+    async def caller(budget, delay=0):
+        await asyncio.sleep(delay)
+        with use_deadline(deadline_after(budget)):
+            return await flights.do("key", work)
+
+    async def unbounded(delay):
+        await asyncio.sleep(delay)
+        return await flights.do("key", work)
+
+    async def burst():
+        return await asyncio.gather(caller(1), caller(5, delay=0.02), caller(2, delay=0.03), return_exceptions=True)
+
+    assert run(burst()) == ["done", "done", "done"]
+    # The first caller's budget is propagated, then extended to the more patient caller's
+    assert 0.9 < seen[0] <= 1
+    assert 4 < seen[1] <= 5
+
+    async def with_unbounded():
+        return await asyncio.gather(caller(1), unbounded(0.02))
+
+    seen.clear()
+    run(with_unbounded())
+    assert seen[0] is not None and seen[1] is None
+
+
+def test_deadline_shrinks_when_the_patient_caller_leaves(run):
+    flights = SingleFlight()
+    seen = []
+
+    async def work():
+        await asyncio.sleep(0.1)
+        seen.append(remaining())
+        return "done"
+
+    async def scenario():
+        with use_deadline(deadline_after(1)):
+            short = asyncio.create_task(flights.do("key", work))
+        with use_deadline(deadline_after(5)):
+            patient = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.02)
+        patient.cancel()  # e.g. the client disconnected
+        return await short
+
+    assert run(scenario()) == "done"
+    assert seen[0] <= 1
@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import List, Optional
-from app.utils import default_metrics
+from app.utils import metric_index
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
 
 
 app = FastAPI(
@@ -12,31 +15,28 @@ app = FastAPI(
         "If no metrics are provided, returns an empty list."
     )
 )
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "metrics")
+add_warmup(app)  # Nothing heavy to load; /ready answers once started
 
 class MetricsRequest(BaseModel):
     industry: str
     selected_metrics: Optional[List[str]] = []  # User may specify which metrics they want
 
+class BatchMetricsRequest(BaseModel):
+    industries: List[str]
+    selected_metrics: Optional[List[str]] = []  # Same selection expanded for every industry
+
 @app.post("/compare-metrics")
 async def compare_metrics(request: MetricsRequest):
-    if not request.selected_metrics:
-        # Return empty if nothing specified
-        return {
-            "industry": request.industry,
-            "selected_metrics": []
-        }
-    
-    # Otherwise, for each provided metric category, expand it using default_metrics.
-    expanded_metrics = []
-    for metric in request.selected_metrics:
-        # If the provided metric is a recognized category, expand it.
-        if metric in default_metrics:
-            expanded_metrics.extend(default_metrics[metric])
-        else:
-            # If it's not recognized, add it as is (or you could choose to ignore or error).
-            expanded_metrics.append(metric)
-            
+    # Categories ("financial", "fin"), metric names and abbreviations ("EPS") resolve case-insensitively;
+    # industry-specific metrics are narrowed to the request's industry. Output is deduplicated in order.
+    return metric_index.expand(request.industry, request.selected_metrics or [])
+
+@app.post("/compare-metrics/batch")
+async def compare_metrics_batch(request: BatchMetricsRequest):
+    industries = list(dict.fromkeys(industry.strip() for industry in request.industries if industry.strip()))
     return {
-        "industry": request.industry,
-        "selected_metrics": expanded_metrics
-    }
\ No newline at end of file
+        "results": [metric_index.expand(industry, request.selected_metrics or []) for industry in industries]
+    }
@@ -1,3 +1,5 @@
+import re
+from typing import Dict, List
 
 # Define default metrics for various categories
 default_metrics = {
@@ -33,4 +35,86 @@ default_metrics = {
         "SaaS: Churn Rate",
         "SaaS: Annual Recurring Revenue (ARR)"
     ]
-}
\ No newline at end of file
+}
+# Extra names accepted for each category, on top of the category key itself
+CATEGORY_ALIASES = {
+    "financial": ["fin", "finance", "financials"],
+    "market": ["mkt", "markets", "valuation"],
+    "operational": ["ops", "operations"],
+    "customer": ["cust", "customers"],
+    "industry_specific": ["industry", "industry specific", "sector"],
+}
+
+_SEPARATOR_RE = re.compile(r"[\s_\-]+")
+_ABBREVIATION_RE = re.compile(r"\(([^)]+)\)\s*$")
+
+
+def normalize_metric_name(name: str) -> str:
+    return _SEPARATOR_RE.sub(" ", name.strip().lower()).strip()
+
+
+def split_industry_prefix(metric: str):
+    # "Tech: Monthly Active Users (MAU)" -> ("tech", "Monthly Active Users (MAU)")
+    prefix, separator, name = metric.partition(":")
+    if not separator:
+        return None, metric
+    return normalize_metric_name(prefix), name.strip()
+
+
+class MetricIndex:
+    """Case-insensitive lookup of categories, metric names and abbreviations, built once at startup."""
+
+    def __init__(self, catalog: Dict[str, List[str]], aliases: Dict[str, List[str]]):
+        self.categories = {}  # normalized name -> category key
+        self.metrics = {}  # normalized name or abbreviation -> canonical metric
+        for category, metrics in catalog.items():
+            for name in [category, *aliases.get(category, [])]:
+                self.categories[normalize_metric_name(name)] = category
+            for metric in metrics:
+                _, name = split_industry_prefix(metric)
+                keys = [metric, name]
+                abbreviation = _ABBREVIATION_RE.search(name)
+                if abbreviation:
+                    keys += [abbreviation.group(1), _ABBREVIATION_RE.sub("", name)]
+                for key in keys:
+                    self.metrics.setdefault(normalize_metric_name(key), metric)
+        self.catalog = catalog
+
+    def industry_metrics(self, industry: str) -> List[str]:
+        """industry_specific entries whose prefix matches the industry, or all of them if none do."""
+        words = normalize_metric_name(industry).split()
+        matching = [
+            metric for metric in self.catalog["industry_specific"]
+            if any(word.startswith(split_industry_prefix(metric)[0] or "\0") for word in words)
+        ]
+        return matching or list(self.catalog["industry_specific"])
+
+    def resolve(self, term: str, industry: str):
+        """Returns (metrics, recognized) for one selected term."""
+        key = normalize_metric_name(term)
+        category = self.categories.get(key)
+        if category == "industry_specific":
+            return self.industry_metrics(industry), True
+        if category:
+            return list(self.catalog[category]), True
+        if key in self.metrics:
+            return [self.metrics[key]], True
+        return [term.strip()], False
+
+    def expand(self, industry: str, selected_metrics: List[str]) -> Dict:
+        expanded, unrecognized = [], []
+        for term in selected_metrics:
+            if not term or not term.strip():
+                continue
+            metrics, recognized = self.resolve(term, industry)
+            expanded.extend(metrics)
+            if not recognized:
+                unrecognized.append(term.strip())
+        return {
+            "industry": industry,
+            "selected_metrics": list(dict.fromkeys(expanded)),
+            "unrecognized_metrics": list(dict.fromkeys(unrecognized)),
+        }
+
+
+metric_index = MetricIndex(default_metrics, CATEGORY_ALIASES)
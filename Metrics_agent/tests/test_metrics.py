@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils import default_metrics, metric_index
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("term", ["financial", "FIN", "Finance", " financials "])
+def test_categories_resolve_by_name_and_alias(term):
+    assert metric_index.resolve(term, "Widgets") == (default_metrics["financial"], True)
+
+
+@pytest.mark.parametrize("term", ["EPS", "eps", "Earnings Per Share", "earnings-per_share", "Earnings Per Share (EPS)"])
+def test_metrics_resolve_by_name_and_abbreviation(term):
+    assert metric_index.resolve(term, "Widgets") == (["Earnings Per Share (EPS)"], True)
+
+
+def test_prefixed_metrics_resolve_without_their_industry():
+    assert metric_index.resolve("mau", "Widgets") == (["Tech: Monthly Active Users (MAU)"], True)
+
+
+def test_unknown_terms_are_kept_and_flagged():
+    assert metric_index.resolve(" Carbon Footprint ", "Widgets") == (["Carbon Footprint"], False)
+
+
+def test_industry_metrics_are_narrowed_to_the_industry():
+    assert metric_index.industry_metrics("SaaS platforms") == ["SaaS: Churn Rate", "SaaS: Annual Recurring Revenue (ARR)"]
+    assert metric_index.industry_metrics("Technology") == ["Tech: Monthly Active Users (MAU)", "Tech: Daily Active Users (DAU)"]
+    # No matching prefix: every industry-specific metric
+    assert metric_index.industry_metrics("Agriculture") == default_metrics["industry_specific"]
+
+
+def test_expansion_is_deduplicated_in_order():
+    result = metric_index.expand("Retail", ["eps", "financial", "sector", "EPS", "Carbon", "Carbon ", " "])
+
+    eps = "Earnings Per Share (EPS)"
+    financial = [metric for metric in default_metrics["financial"] if metric != eps]
+    # Unrecognized terms are still passed through, after being flagged
+    assert result["selected_metrics"] == [eps, *financial, "Retail: Same-Store Sales Growth", "Carbon"]
+    assert result["unrecognized_metrics"] == ["Carbon"]
+
+
+def test_batch_expands_each_distinct_industry_once():
+    response = client.post("/compare-metrics/batch", json={
+        "industries": ["Tech", " Tech ", "", "Retail"], "selected_metrics": ["industry"]
+    })
+
+    assert response.status_code == 200
+    assert [result["industry"] for result in response.json()["results"]] == ["Tech", "Retail"]
+    assert response.json()["results"][1]["selected_metrics"] == ["Retail: Same-Store Sales Growth"]
+
+
+def test_no_selection_returns_no_metrics():
+    response = client.post("/compare-metrics", json={"industry": "Tech"})
+    assert response.json() == {"industry": "Tech", "selected_metrics": [], "unrecognized_metrics": []}
@@ -1,28 +1,75 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Dict, List, Optional
-from app.utils import reflect_and_improve
+from typing import Any, Dict, List, Optional
+from app.utils import reflect_and_improve, open_reflection_session, get_reflection_session, reflect_in_session, get_llm
+from agent_common.llm_cache import llm_cache
+from agent_common.limiter import llm_limiter
+from agent_common.singleflight import inflight_calls
+from agent_common.deadline import DeadlineMiddleware
+from agent_common.instrumentation import instrument_app
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
 
 app = FastAPI()
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "reflection")
+app.add_middleware(DeadlineMiddleware)
+add_warmup(app, [("llm_client", get_llm)])
 
-# Pydantic model for request validation
+# Pydantic model for request validation.
+# Only base_analysis and reflection_feedback are read; the rest of the state is accepted
+# without deep validation so large research_results stay cheap to parse.
 class StateRequest(BaseModel):
     industry: str
-    specified_competitors: List[str]
-    competitors: List[str]
-    overview: str
-    selected_competitors: List[str]
-    research_results: Dict[str, List[Dict]]
-    categorized_findings: Dict[str, Dict]
+    specified_competitors: List[str] = []
+    competitors: List[str] = []
+    overview: str = ""
+    selected_competitors: List[str] = []
+    research_results: Dict[str, Any] = {}
+    categorized_findings: Dict[str, Any] = {}
     base_analysis: str
-    final_analysis: str
+    final_analysis: str = ""
     reflection_feedback: List[str]
-    reflection_iteration: int
-    max_reflection_iterations: int
-    next: str
+    reflection_iteration: int = 0
+    max_reflection_iterations: int = 3
+    next: str = "reflection"
+
+# Slim request: base_analysis opens the session, later calls send only new feedback
+class SlimReflectionRequest(BaseModel):
+    session_id: str
+    base_analysis: Optional[str] = None
+    industry: Optional[str] = None
+    reflection_feedback_delta: List[str] = []
 
 @app.post("/reflect-and-improve/")
-def reflect_and_improve_route(request: StateRequest):
+async def reflect_and_improve_route(request: StateRequest):
     state = request.model_dump()
-    result = reflect_and_improve(state)
+    result = await reflect_and_improve(state)
     return result
+
+@app.post("/reflect-and-improve/slim")
+async def reflect_and_improve_slim_route(request: SlimReflectionRequest):
+    if request.base_analysis is not None:
+        session = open_reflection_session(request.session_id, request.base_analysis, request.industry)
+    else:
+        session = get_reflection_session(request.session_id)
+        if session is None:
+            # Expired or served by another instance: the caller resends base_analysis
+            raise HTTPException(status_code=409, detail="Unknown reflection session; resend base_analysis")
+    return await reflect_in_session(session, request.reflection_feedback_delta)
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return llm_cache.stats()
+
+@app.get("/load")
+def load():
+    # In-flight and queued model calls, for autoscaling
+    return llm_limiter.stats()
+
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    # "coalesced" counts model calls that joined an identical prompt already in flight
+    return inflight_calls.stats()
@@ -1,8 +1,14 @@
 import os
-import json
-from typing import Dict, List
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
-from langchain_sambanova import ChatSambaNovaCloud
+from pydantic import BaseModel
+from agent_common.llm_cache import llm_cache, make_cache_key
+from agent_common.singleflight import inflight_calls
+from agent_common.structured_output import invoke_structured
 
 # Load environment variables
 load_dotenv()
@@ -11,14 +17,28 @@ MODEL = "Meta-Llama-3.3-70B-Instruct"
 MAX_TOKENS = 2000
 TEMPERATURE = 0.7
 TOP_P = 0.01
+SAMPLING_PARAMS = {"max_tokens": MAX_TOKENS, "temperature": TEMPERATURE, "top_p": TOP_P}
 
-# Initialize SambaNova Client
-llm = ChatSambaNovaCloud(
-    model=MODEL,
-    max_tokens=int(MAX_TOKENS),
-    temperature=float(TEMPERATURE),
-    top_p=float(TOP_P)
-)
+# Slim-mode sessions: the analysis is sent once, later iterations only send feedback deltas
+REFLECTION_SESSION_TTL = float(os.getenv("REFLECTION_SESSION_TTL", 900))
+REFLECTION_SESSION_MAX = int(os.getenv("REFLECTION_SESSION_MAX", 256))
+
+# The SambaNova client is built on first use (or by the startup warm-up), which keeps
+# the SDK import off the cold-start path
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_sambanova import ChatSambaNovaCloud
+    return ChatSambaNovaCloud(
+        model=MODEL,
+        max_tokens=int(MAX_TOKENS),
+        temperature=float(TEMPERATURE),
+        top_p=float(TOP_P)
+    )
+
+# Expected shape of the model's answer
+class ReflectionOutput(BaseModel):
+    critique: List[str] = []
+    suggestions: List[str] = []
 
 # Reflection Prompt Template
 reflection_prompt_template = """
@@ -42,7 +62,7 @@ Return JSON with:
 }}
 """
 
-def reflect_and_improve(state: Dict) -> Dict:
+async def reflect_and_improve(state: Dict) -> Dict:
     if not state.get("base_analysis"):
         return {"reflection_feedback": []}
     
@@ -55,13 +75,18 @@ def reflect_and_improve(state: Dict) -> Dict:
     )
     
     messages = [("system", "You are a competitive analysis assistant."), ("human", reflection_prompt)]
-    response = llm.invoke(messages)
-    response_text = response.content.strip()
-    
-    try:
-        feedback_json = json.loads(response_text)
-    except json.JSONDecodeError:
-        feedback_json = {"critique": [], "suggestions": []}
+
+    cache_key = make_cache_key(MODEL, SAMPLING_PARAMS, messages)
+    feedback_json = await llm_cache.aget(cache_key)
+    if feedback_json is None:
+        async def call_model():
+            # Malformed output is repaired or retried, and surfaces as a 502 instead of empty feedback
+            result = await invoke_structured(get_llm(), messages, ReflectionOutput)
+            await llm_cache.aset(cache_key, result, tag=state.get("industry"))
+            return result
+
+        # Identical prompts already in flight share that model call
+        feedback_json = await inflight_calls.do(cache_key, call_model)
     
     feedback = feedback_json.get("critique", []) + feedback_json.get("suggestions", [])
     new_feedback = [fb for fb in feedback if fb not in previous_feedback]
@@ -70,3 +95,37 @@ def reflect_and_improve(state: Dict) -> Dict:
     
     # Return only the reflection feedback (notes)
     return {"reflection_feedback": updated_feedback}
+
+
+# Slim reflection sessions, keyed by the orchestrator's session id
+reflection_sessions = OrderedDict()
+reflection_sessions_lock = threading.Lock()
+
+def open_reflection_session(session_id: str, base_analysis: str, industry: Optional[str] = None) -> Dict:
+    session = {"base_analysis": base_analysis, "industry": industry, "reflection_feedback": [], "touched_at": time.time()}
+    with reflection_sessions_lock:
+        reflection_sessions[session_id] = session
+        reflection_sessions.move_to_end(session_id)
+        while len(reflection_sessions) > REFLECTION_SESSION_MAX:
+            reflection_sessions.popitem(last=False)
+    return session
+
+def get_reflection_session(session_id: str) -> Optional[Dict]:
+    with reflection_sessions_lock:
+        session = reflection_sessions.get(session_id)
+        if session is None:
+            return None
+        if time.time() - session["touched_at"] > REFLECTION_SESSION_TTL:
+            del reflection_sessions[session_id]
+            return None
+        session["touched_at"] = time.time()
+        reflection_sessions.move_to_end(session_id)
+        return session
+
+async def reflect_in_session(session: Dict, feedback_delta: List[str]) -> Dict:
+    session["reflection_feedback"] += [fb for fb in feedback_delta if fb not in session["reflection_feedback"]]
+    return await reflect_and_improve({
+        "industry": session["industry"],
+        "base_analysis": session["base_analysis"],
+        "reflection_feedback": list(session["reflection_feedback"])
+    })
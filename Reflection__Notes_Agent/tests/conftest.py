@@ -0,0 +1,40 @@
+import asyncio
+import pytest
+from app import utils
+from agent_common.llm_cache import LLMCache
+from agent_common.singleflight import SingleFlight
+
+
+class FakeModel:
+    """Replaces invoke_structured: critiques every analysis with one note per call."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def invoke(self, llm, messages, response_model):
+        self.prompts.append(messages[-1][1])
+        return {"critique": [f"critique {len(self.prompts)}"], "suggestions": []}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(utils, "invoke_structured", fake.invoke)
+    monkeypatch.setattr(utils, "get_llm", lambda: None)
+    monkeypatch.setattr(utils, "llm_cache", LLMCache(max_entries=32))
+    monkeypatch.setattr(utils, "inflight_calls", SingleFlight())
+    return fake
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(utils, "reflection_sessions", type(utils.reflection_sessions)())
+    return utils.reflection_sessions
+
+
+@pytest.fixture
+def client(model, sessions):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    # Not entered as a context manager, so the startup warm-up never builds a real client
+    return TestClient(app)
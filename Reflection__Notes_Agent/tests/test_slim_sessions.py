@@ -0,0 +1,50 @@
+import time
+from app import utils
+
+
+def test_slim_session_sends_the_analysis_once(client, model):
+    first = client.post("/reflect-and-improve/slim", json={
+        "session_id": "s1", "base_analysis": "Acme leads on price", "industry": "Widgets"
+    })
+    assert first.status_code == 200
+    assert first.json() == {"reflection_feedback": ["critique 1"]}
+
+    second = client.post("/reflect-and-improve/slim", json={"session_id": "s1", "reflection_feedback_delta": ["critique 1"]})
+    assert second.status_code == 200
+    assert second.json() == {"reflection_feedback": ["critique 1", "critique 2"]}
+    # The later call still reflects on the stored analysis and the feedback so far
+    assert "Acme leads on price" in model.prompts[1] and "critique 1" in model.prompts[1]
+
+
+def test_unknown_session_is_a_conflict(client):
+    response = client.post("/reflect-and-improve/slim", json={"session_id": "missing", "reflection_feedback_delta": []})
+    assert response.status_code == 409
+
+
+def test_expired_session_is_a_conflict(client, sessions, monkeypatch):
+    monkeypatch.setattr(utils, "REFLECTION_SESSION_TTL", 60)
+    utils.open_reflection_session("old", "analysis")
+    sessions["old"]["touched_at"] = time.time() - 61
+
+    response = client.post("/reflect-and-improve/slim", json={"session_id": "old", "reflection_feedback_delta": []})
+    assert response.status_code == 409
+    assert "old" not in sessions
+
+
+def test_least_recently_used_sessions_are_evicted(sessions, monkeypatch):
+    monkeypatch.setattr(utils, "REFLECTION_SESSION_MAX", 2)
+    utils.open_reflection_session("a", "analysis a")
+    utils.open_reflection_session("b", "analysis b")
+    assert utils.get_reflection_session("a") is not None  # Touching "a" makes "b" the oldest
+    utils.open_reflection_session("c", "analysis c")
+
+    assert list(sessions) == ["a", "c"]
+    assert utils.get_reflection_session("b") is None
+
+
+def test_full_state_endpoint_still_works(client):
+    response = client.post("/reflect-and-improve/", json={
+        "industry": "Widgets", "base_analysis": "Acme leads on price", "reflection_feedback": ["earlier note"]
+    })
+    assert response.status_code == 200
+    assert response.json() == {"reflection_feedback": ["earlier note", "critique 1"]}
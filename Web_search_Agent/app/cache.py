@@ -0,0 +1,232 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# Cache settings for Tavily search results
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 86400))  # Seconds an entry is served as fresh
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", 3600))  # Extra seconds served stale while refreshing
+SEARCH_CACHE_EMPTY_TTL = float(os.getenv("SEARCH_CACHE_EMPTY_TTL", 300))  # Seconds an empty result is cached, never served stale
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024))  # In-memory LRU size
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "search_cache.db")  # Shared SQLite file; empty disables the disk tier
+SEARCH_CACHE_MAX_DISK_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_DISK_ENTRIES", 10000))  # Oldest rows beyond this are pruned
+SEARCH_CACHE_PRUNE_INTERVAL = float(os.getenv("SEARCH_CACHE_PRUNE_INTERVAL", 300))  # Seconds between disk prunes
+
+
+class MemoryTier:
+    """Per-process LRU tier."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, stored_at: float):
+        self.entries[key] = (value, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+
+
+class SQLiteTier:
+    """On-disk tier shared by every uvicorn worker on the host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS search_cache_stored_at ON search_cache (stored_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps this safe across threads and processes
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, stored_at: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), stored_at)
+            )
+
+    def delete(self, key: str, stored_at: Optional[float] = None):
+        # With stored_at, only that version is removed, never a fresher one written meanwhile
+        with self._connect() as conn:
+            if stored_at is None:
+                conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            else:
+                conn.execute("DELETE FROM search_cache WHERE key = ? AND stored_at = ?", (key, stored_at))
+
+    def prune(self, expired_before: float, max_entries: int) -> int:
+        """Drop expired rows, then the oldest rows beyond max_entries; returns the number removed."""
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM search_cache WHERE stored_at < ?", (expired_before,)).rowcount
+            removed += conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            ).rowcount
+        return removed
+
+
+class SearchCache:
+    """Two-tier TTL cache with a stale-while-revalidate window.
+
+    Empty results are negatively cached for the shorter empty_ttl, so a transient
+    miss upstream doesn't hide a competitor for a whole day. The lock only guards the memory tier and counters; SQLite reads and writes happen
+    outside it, so a slow disk never blocks memory hits.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int,
+        path: Optional[str] = None,
+        max_disk_entries: int = SEARCH_CACHE_MAX_DISK_ENTRIES,
+        prune_interval: float = SEARCH_CACHE_PRUNE_INTERVAL,
+        empty_ttl: float = SEARCH_CACHE_EMPTY_TTL
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.empty_ttl = empty_ttl
+        self.memory = MemoryTier(max_entries)
+        self.disk = SQLiteTier(path) if path else None
+        self.max_disk_entries = max_disk_entries
+        self.prune_interval = prune_interval
+        self.last_prune = 0.0
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.counters = {
+            "memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "expired": 0, "refreshes": 0, "disk_pruned": 0,
+        }
+
+    def get(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_stale); value is None on a miss."""
+        with self.lock:
+            entry = self.memory.get(key)
+        tier = "memory_hits"
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            tier = "disk_hits"
+            if entry is not None:
+                with self.lock:
+                    current = self.memory.get(key)
+                    if current is None or current[1] < entry[1]:  # Don't clobber a fresher set() made meanwhile
+                        self.memory.set(key, *entry)
+
+        if entry is None:
+            with self.lock:
+                self.counters["misses"] += 1
+            return None, False
+
+        value, stored_at = entry
+        age = time.time() - stored_at
+        ttl, stale_ttl = (self.ttl, self.stale_ttl) if value else (min(self.empty_ttl, self.ttl), 0)
+        if age >= ttl + stale_ttl:
+            with self.lock:
+                current = self.memory.get(key)
+                if current is not None and current[1] == stored_at:
+                    self.memory.delete(key)
+                self.counters["expired"] += 1
+                self.counters["misses"] += 1
+            if self.disk is not None:
+                self.disk.delete(key, stored_at)
+            return None, False
+
+        with self.lock:
+            self.counters[tier] += 1
+            if age >= ttl:
+                self.counters["stale_hits"] += 1
+        return value, age >= ttl
+
+    def set(self, key: str, value: Any):
+        stored_at = time.time()
+        with self.lock:
+            self.memory.set(key, value, stored_at)
+            prune = self.disk is not None and stored_at - self.last_prune >= self.prune_interval
+            if prune:
+                self.last_prune = stored_at  # Claimed under the lock so only one caller prunes
+        if self.disk is not None:
+            self.disk.set(key, value, stored_at)
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self) -> int:
+        """Bound the disk tier: expired rows go first, then the oldest beyond max_disk_entries."""
+        if self.disk is None:
+            return 0
+        removed = self.disk.prune(time.time() - self.ttl - self.stale_ttl, self.max_disk_entries)
+        with self.lock:
+            self.counters["disk_pruned"] += removed
+        return removed
+
+    def begin_refresh(self, key: str) -> bool:
+        """Claim a background refresh for key; False if one is already running."""
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+            self.counters["refreshes"] += 1
+            return True
+
+    def end_refresh(self, key: str):
+        with self.lock:
+            self.refreshing.discard(key)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "evictions": self.memory.evictions,
+                "memory_entries": len(self.memory.entries),
+                "disk_enabled": self.disk is not None,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "empty_ttl": self.empty_ttl,
+            }
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def open_search_cache() -> SearchCache:
+    """Create the process-wide cache (and its SQLite file) on startup rather than at import."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                ttl=SEARCH_CACHE_TTL,
+                stale_ttl=SEARCH_CACHE_STALE_TTL,
+                max_entries=SEARCH_CACHE_MAX_ENTRIES,
+                path=SEARCH_CACHE_PATH
+            )
+        return _search_cache
+
+
+def get_search_cache() -> SearchCache:
+    # Opened lazily so searches keep working outside the FastAPI lifespan (scripts, tests)
+    return _search_cache or open_search_cache()
@@ -1,22 +1,58 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from pydantic import BaseModel
-from typing import List
-from app.utils import search_competitor
+from typing import List, Optional
+from app.cache import get_search_cache, open_search_cache
+from app.utils import get_tavily_client, search_competitors_async
+from agent_common.deadline import DeadlineMiddleware
+from agent_common.instrumentation import instrument_app
+from agent_common.singleflight import inflight_calls
+from agent_common.wire import WireMiddleware
+from agent_common.warmup import add_warmup
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The cache's SQLite file is opened here, not at import, so importing the app touches no disk
+    open_search_cache()
+    yield
 
 # Initialize FastAPI app
-app = FastAPI(title="Competitor Search API", version="1.0")
+app = FastAPI(title="Competitor Search API", version="1.0", lifespan=lifespan)
+# Added before instrument_app so payload metrics record compressed, on-wire sizes
+app.add_middleware(WireMiddleware)
+instrument_app(app, "web-search")
+app.add_middleware(DeadlineMiddleware)
+add_warmup(app, [("tavily_client", get_tavily_client)])
 
 # Request model
 class CompetitorSearchRequest(BaseModel):
     competitors: List[str]
     max_results: int = 3
+    bypass_cache: bool = False  # Skip cached results and query Tavily directly
+    condense: bool = False  # Drop near-duplicate hits and keep only top-ranked sentences
+    token_budget: Optional[int] = None  # Per-competitor budget when condensing (default: SEARCH_TOKEN_BUDGET)
 
 
 # API endpoint to search competitors
 @app.post("/search")
-def search_competitors(request: CompetitorSearchRequest):
-    results = {}
-    for competitor in request.competitors:
-        results[competitor] = search_competitor(competitor, request.max_results)
-    return {"competitor_results": results}
+async def search_competitors(request: CompetitorSearchRequest):
+    # Failed or timed-out competitors come back with empty results and an entry in "errors"
+    results, errors = await search_competitors_async(
+        request.competitors,
+        request.max_results,
+        bypass_cache=request.bypass_cache,
+        condense=request.condense,
+        token_budget=request.token_budget
+    )
+    return {"competitor_results": results, "errors": errors}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return get_search_cache().stats()
+
 
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    # "coalesced" counts searches that joined an identical one already in flight
+    return inflight_calls.stats()
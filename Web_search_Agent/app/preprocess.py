@@ -0,0 +1,142 @@
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Local, CPU-only condensing of a competitor's search results before they reach the LLM agents
+SEARCH_TOKEN_BUDGET = int(os.getenv("SEARCH_TOKEN_BUDGET", 600))  # Estimated tokens kept per competitor
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.8))  # Estimated Jaccard similarity
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+MIN_SENTENCE_WORDS = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME or 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough 4-characters-per-token estimate, matching the categorization agent
+    return len(text) // 4 + 1
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def result_text(result: Dict) -> str:
+    full_content = result.get("full_content") or ""
+    if full_content == "Content not available":
+        full_content = ""
+    return f"{result.get('title', '')} {result.get('summary', '')} {full_content}"
+
+
+def minhash_signature(text: str) -> List[int]:
+    words = tokenize(text)
+    if not words:
+        return []  # Nothing to compare; results without any words are never treated as duplicates
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def remove_near_duplicates(results: List[Dict], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[Dict]:
+    """Drop results whose MinHash-estimated Jaccard similarity to an earlier result reaches threshold."""
+    kept, signatures = [], []
+    for result in results:
+        signature = minhash_signature(result_text(result))
+        if not signature:
+            kept.append(result)
+            continue
+        is_duplicate = any(
+            sum(x == y for x, y in zip(signature, other)) / NUM_PERMUTATIONS >= threshold
+            for other in signatures
+        )
+        if not is_duplicate:
+            kept.append(result)
+            signatures.append(signature)
+    return kept
+
+
+def split_sentences(result: Dict) -> List[str]:
+    sentences = []
+    seen = set()
+    for part in (result.get("summary") or "", result.get("full_content") or ""):
+        if part == "Content not available":
+            continue
+        for sentence in _SENTENCE_SPLIT_RE.split(part):
+            sentence = " ".join(sentence.split())
+            key = sentence.lower()
+            if len(sentence.split()) >= MIN_SENTENCE_WORDS and key not in seen:
+                seen.add(key)
+                sentences.append(sentence)
+    return sentences
+
+
+def rank_sentences(sentences: List[str]) -> List[float]:
+    """Centroid TF-IDF score per sentence: how representative it is of the competitor's coverage."""
+    term_counts = [Counter(tokenize(sentence)) for sentence in sentences]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+    total = len(sentences)
+    vectors = []
+    for counts in term_counts:
+        vector = {term: count * math.log(1 + total / document_frequency[term]) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+
+    centroid = Counter()
+    for vector in vectors:
+        centroid.update(vector)
+    return [sum(weight * centroid[term] for term, weight in vector.items()) for vector in vectors]
+
+
+def condense_results(results: List[Dict], token_budget: int = SEARCH_TOKEN_BUDGET) -> List[Dict]:
+    """Deduplicate results, then keep the highest-ranked sentences within token_budget.
+
+    Each surviving result's summary becomes its selected sentences in original order;
+    full_content is dropped since downstream agents only read title and summary. A result
+    with no selected sentence keeps its original snippet if that still fits the budget,
+    and is dropped otherwise rather than returned with an empty summary.
+    """
+    results = remove_near_duplicates(results)
+
+    candidates = []  # (result index, sentence), in document order
+    for index, result in enumerate(results):
+        for sentence in split_sentences(result):
+            candidates.append((index, sentence))
+
+    selected = set()
+    used_tokens = sum(estimate_tokens(result.get("title", "")) for result in results)
+    if candidates:
+        scores = rank_sentences([sentence for _, sentence in candidates])
+        for candidate_index in sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True):
+            sentence_tokens = estimate_tokens(candidates[candidate_index][1])
+            if used_tokens + sentence_tokens > token_budget:
+                continue
+            selected.add(candidate_index)
+            used_tokens += sentence_tokens
+
+    kept_sentences = [[] for _ in results]
+    for candidate_index, (index, sentence) in enumerate(candidates):
+        if candidate_index in selected:
+            kept_sentences[index].append(sentence)
+
+    condensed = []
+    for result, sentences in zip(results, kept_sentences):
+        summary = " ".join(sentences)
+        if not summary:
+            # Snippets made only of short sentences (or crowded out of the budget) are kept as they are
+            snippet = " ".join((result.get("summary") or "").split())
+            if snippet and used_tokens + estimate_tokens(snippet) <= token_budget:
+                summary = snippet
+                used_tokens += estimate_tokens(snippet)
+        if summary:
+            condensed.append({"title": result.get("title", ""), "url": result.get("url", ""), "summary": summary})
+    return condensed
@@ -1,21 +1,44 @@
+import asyncio
 import json
 from dotenv import load_dotenv
 from fastapi import HTTPException
 import os
-from tavily import TavilyClient
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.cache import get_search_cache
+from agent_common.deadline import cap_timeout, expired
+from agent_common.instrumentation import debug_log, span, warning_log
+from app.preprocess import SEARCH_TOKEN_BUDGET, condense_results
+from agent_common.singleflight import inflight_calls
 
 # Load environment variables
 load_dotenv()
 # Initialize Tavily API client
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")  # Ensure your API key is set in the environment
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
 
-# Search function
-def search_competitor(competitor: str, max_results=3):
-    print(f"🔍 Searching for {competitor} using Tavily API...")
+# Built on first use (or by the startup warm-up), keeping the SDK import off the cold-start path
+@lru_cache(maxsize=None)
+def get_tavily_client():
+    from tavily import TavilyClient
+    return TavilyClient(api_key=TAVILY_API_KEY)
+
+# Concurrency and per-query timeout for multi-competitor searches
+MAX_CONCURRENT_SEARCHES = int(os.getenv("MAX_CONCURRENT_SEARCHES", 5))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", 30))
+
+# Query Tavily and format the results (no caching)
+def fetch_search_results(competitor: str, max_results=3, client=None, include_raw_content: bool = False):
+    # Any object exposing Tavily's search(query=..., max_results=...) can stand in for the real client
+    client = client or get_tavily_client()
     try:
-        response = tavily_client.search(query=competitor, max_results=max_results)
+        with span("tavily.search", competitor=competitor):
+            if include_raw_content:
+                response = client.search(query=competitor, max_results=max_results, include_raw_content=True)
+            else:
+                response = client.search(query=competitor, max_results=max_results)
         search_results = response.get("results", [])
+        debug_log("tavily.search", competitor=competitor, max_results=max_results, results=len(search_results))
 
         unique_sources = {}
         for result in search_results:
@@ -40,3 +63,99 @@ def search_competitor(competitor: str, max_results=3):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching search results: {str(e)}")
+
+
+def cache_key(competitor: str, max_results: int, include_raw_content: bool = False) -> str:
+    return json.dumps([competitor.strip().lower(), max_results, include_raw_content])
+
+
+def refresh_cached_search(key: str, competitor: str, max_results: int, client=None, include_raw_content: bool = False):
+    search_cache = get_search_cache()
+    try:
+        search_cache.set(key, fetch_search_results(competitor, max_results, client, include_raw_content))
+    except HTTPException as e:
+        warning_log("search_cache.refresh_failed", f"Background refresh failed for {competitor}: {e.detail}", competitor=competitor)
+    finally:
+        search_cache.end_refresh(key)
+
+
+# Search function, served from the result cache when possible
+def search_competitor(
+    competitor: str,
+    max_results=3,
+    client=None,
+    bypass_cache: bool = False,
+    include_raw_content: bool = False
+):
+    key = cache_key(competitor, max_results, include_raw_content)
+    search_cache = get_search_cache()
+
+    if not bypass_cache:
+        cached, is_stale = search_cache.get(key)
+        if cached is not None:
+            # Stale-while-revalidate: answer now, refresh in the background
+            if is_stale and search_cache.begin_refresh(key):
+                threading.Thread(
+                    target=refresh_cached_search,
+                    args=(key, competitor, max_results, client, include_raw_content),
+                    daemon=True
+                ).start()
+            return cached
+
+    results = fetch_search_results(competitor, max_results, client, include_raw_content)
+    search_cache.set(key, results)
+    return results
+
+
+# Run searches for several competitors concurrently; failures are reported per competitor
+async def search_competitors_async(
+    competitors: List[str],
+    max_results: int = 3,
+    client=None,
+    max_concurrency: int = MAX_CONCURRENT_SEARCHES,
+    timeout: float = SEARCH_TIMEOUT_SECONDS,
+    bypass_cache: bool = False,
+    condense: bool = False,
+    token_budget: Optional[int] = None
+) -> Tuple[Dict[str, List[dict]], Dict[str, str]]:
+    limit = asyncio.Semaphore(max_concurrency)
+    unique_competitors = list(dict.fromkeys(competitors))
+
+    async def run_one(competitor: str):
+        async with limit:
+            try:
+                # The Tavily SDK is blocking, so each query runs on a worker thread.
+                # Raw page content is only requested when it will be condensed.
+                # No query runs past the caller's deadline.
+                # Identical searches already in flight (e.g. from overlapping orchestrations) are joined.
+                # Condensing is CPU-bound too, so it runs on the same thread rather than the event loop.
+                budget = (token_budget or SEARCH_TOKEN_BUDGET) if condense else None
+
+                def search():
+                    competitor_results = search_competitor(competitor, max_results, client, bypass_cache, condense)
+                    return condense_results(competitor_results, budget) if condense else competitor_results
+
+                key = json.dumps([cache_key(competitor, max_results, condense), bypass_cache, budget])
+                competitor_results = await asyncio.wait_for(
+                    inflight_calls.do(key, lambda: asyncio.to_thread(search)),
+                    timeout=cap_timeout(timeout)
+                )
+                return competitor_results, None
+            except asyncio.TimeoutError:
+                if expired():
+                    return [], "Request deadline exceeded"
+                return [], f"Search timed out after {timeout}s"
+            except HTTPException as e:
+                return [], e.detail
+            except Exception as e:
+                return [], f"Error fetching search results: {str(e)}"
+
+    outcomes = await asyncio.gather(*(run_one(comp) for comp in unique_competitors))
+
+    results = {}
+    errors = {}
+    for competitor, (competitor_results, error) in zip(unique_competitors, outcomes):
+        results[competitor] = competitor_results
+        if error:
+            errors[competitor] = error
+    return results, errors
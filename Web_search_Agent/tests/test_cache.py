@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+from app.cache import SearchCache
+
+
+def disk_keys(path) -> list:
+    with sqlite3.connect(path) as conn:
+        return sorted(key for (key,) in conn.execute("SELECT key FROM search_cache"))
+
+
+def make_cache(path, **kwargs) -> SearchCache:
+    options = {"ttl": 60, "stale_ttl": 10, "max_entries": 16, "path": str(path), "prune_interval": 3600}
+    return SearchCache(**{**options, **kwargs})
+
+
+def test_expired_disk_rows_are_deleted_on_read(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = make_cache(path)
+    cache.disk.set("old", ["result"], time.time() - 120)
+
+    assert cache.get("old") == (None, False)
+    assert disk_keys(path) == []
+    assert cache.stats()["expired"] == 1
+
+
+def test_disk_hits_are_promoted_and_served_stale(tmp_path):
+    path = tmp_path / "cache.db"
+    make_cache(path).disk.set("key", ["result"], time.time() - 65)
+    cache = make_cache(path)
+
+    assert cache.get("key") == (["result"], True)
+    assert "key" in cache.memory.entries
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_prune_drops_expired_then_oldest_rows(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = make_cache(path, max_disk_entries=2)
+    now = time.time()
+    cache.disk.set("expired", [], now - 120)
+    for index in range(3):
+        cache.disk.set(f"key{index}", [], now - 3 + index)
+
+    assert cache.prune_disk() == 2
+    assert disk_keys(path) == ["key1", "key2"]
+    assert cache.stats()["disk_pruned"] == 2
+
+
+def test_set_prunes_periodically(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = make_cache(path, max_disk_entries=2)
+    for index in range(4):
+        cache.set(f"key{index}", [index])
+
+    # Only the first set prunes; later ones wait for the interval
+    assert len(disk_keys(path)) == 4
+    cache.last_prune = 0.0
+    cache.set("key4", [4])
+    assert disk_keys(path) == ["key3", "key4"]
+
+
+def test_disk_reads_happen_outside_the_lock(tmp_path):
+    cache = make_cache(tmp_path / "cache.db")
+    cache.set("memory", ["hot"])
+    reading = threading.Event()
+    release = threading.Event()
+
+    class SlowDisk:
+        def get(self, key):
+            reading.set()
+            release.wait(5)
+            return None
+
+    cache.disk = SlowDisk()
+    reader = threading.Thread(target=cache.get, args=("cold",))
+    reader.start()
+    assert reading.wait(5)
+    try:
+        # A memory hit must not queue behind the slow disk read
+        assert cache.get("memory") == (["hot"], False)
+    finally:
+        release.set()
+        reader.join()
+
+
+def test_stale_disk_read_does_not_clobber_a_fresh_set(tmp_path):
+    cache = make_cache(tmp_path / "cache.db")
+    old = time.time() - 30
+
+    class RacingDisk:
+        def get(self, key):
+            cache.set(key, ["fresh"])  # Another request writes while this read is in progress
+            return ["old"], old
+
+        def set(self, key, value, stored_at):
+            pass
+
+        def prune(self, expired_before, max_entries):
+            return 0
+
+    cache.disk = RacingDisk()
+    cache.get("key")
+    assert cache.memory.get("key")[0] == ["fresh"]
+
+
+def test_empty_results_expire_after_the_empty_ttl(tmp_path):
+    cache = make_cache(tmp_path / "cache.db", empty_ttl=5)
+    now = time.time()
+    cache.memory.set("recent", [], now - 1)
+    cache.memory.set("empty", [], now - 6)
+    cache.memory.set("full", ["result"], now - 6)
+
+    assert cache.get("recent") == ([], False)
+    # Never served stale: an empty answer past its TTL is simply a miss
+    assert cache.get("empty") == (None, False)
+    assert cache.get("full") == (["result"], False)
+
+
+def test_cache_file_is_created_on_startup_not_import(tmp_path, monkeypatch):
+    import importlib
+    from fastapi.testclient import TestClient
+    from app import cache
+
+    path = tmp_path / "search_cache.db"
+    monkeypatch.setattr(cache, "SEARCH_CACHE_PATH", str(path))
+    monkeypatch.setattr(cache, "_search_cache", None)
+    main = importlib.import_module("app.main")
+    assert not path.exists()
+
+    with TestClient(main.app) as client:
+        assert path.exists()
+        assert client.get("/cache/stats").json()["disk_enabled"] is True
@@ -0,0 +1,47 @@
+from app.preprocess import condense_results, minhash_signature, remove_near_duplicates
+
+ARTICLE = (
+    "Acme launched a new analytics platform for retail customers this quarter. "
+    "The platform integrates with existing point of sale systems and inventory tools. "
+    "Analysts expect the launch to pressure competing vendors on pricing next year."
+)
+
+
+def test_near_duplicates_are_removed():
+    results = [
+        {"title": "Acme launch", "url": "https://a.example", "summary": ARTICLE},
+        {"title": "Acme launch", "url": "https://b.example", "summary": ARTICLE + " Shares rose."},
+        {"title": "Globex", "url": "https://c.example", "summary": "Globex opened three new offices in Europe and Asia."},
+    ]
+    assert [result["url"] for result in remove_near_duplicates(results)] == ["https://a.example", "https://c.example"]
+
+
+def test_results_without_words_are_not_duplicates_of_each_other():
+    assert minhash_signature("  -- ") == []
+    results = [{"url": "https://a.example"}, {"url": "https://b.example"}]
+    assert remove_near_duplicates(results) == results
+
+
+def test_condensing_keeps_top_sentences_within_the_budget():
+    results = [{"title": "Acme", "url": "https://a.example", "summary": ARTICLE, "full_content": " ".join([ARTICLE] * 20)}]
+    condensed = condense_results(results, token_budget=40)
+
+    assert len(condensed) == 1
+    assert set(condensed[0]) == {"title", "url", "summary"}
+    assert condensed[0]["summary"] and all(sentence in ARTICLE for sentence in condensed[0]["summary"].split(". "))
+    assert len(condensed[0]["summary"]) // 4 + 1 <= 40
+
+
+def test_short_snippets_are_kept_rather_than_emptied():
+    results = [{"title": "Acme", "url": "https://a.example", "summary": "Acme hires CFO.  Stock up."}]
+    assert condense_results(results)[0]["summary"] == "Acme hires CFO. Stock up."
+
+
+def test_results_with_nothing_left_are_dropped():
+    results = [
+        {"title": "Acme", "url": "https://a.example", "summary": ARTICLE},
+        {"title": "Empty", "url": "https://b.example", "summary": "", "full_content": "Content not available"},
+    ]
+    assert [result["url"] for result in condense_results(results)] == ["https://a.example"]
+    # Over budget, a short snippet is dropped too
+    assert condense_results([{"title": "Acme", "url": "https://a.example", "summary": "Acme hires CFO."}], token_budget=5) == []
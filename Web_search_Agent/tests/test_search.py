@@ -0,0 +1,41 @@
+import asyncio
+import threading
+import pytest
+from app import utils
+from agent_common.singleflight import SingleFlight
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    calls = []
+
+    def search_competitor(competitor, max_results, client, bypass_cache, include_raw_content):
+        calls.append(competitor)
+        return [{"title": competitor, "url": f"https://{competitor}.example", "summary": "news"}]
+
+    monkeypatch.setattr(utils, "search_competitor", search_competitor)
+    monkeypatch.setattr(utils, "inflight_calls", SingleFlight())
+    return calls
+
+
+def test_condensing_runs_off_the_event_loop(searches, monkeypatch):
+    threads = []
+
+    def condense_results(results, token_budget):
+        threads.append(threading.current_thread())
+        return [{**result, "condensed_to": token_budget} for result in results]
+
+    monkeypatch.setattr(utils, "condense_results", condense_results)
+    results, errors = asyncio.run(utils.search_competitors_async(["Acme"], condense=True, token_budget=200))
+
+    assert errors == {}
+    assert results["Acme"][0]["condensed_to"] == 200
+    assert threads and threading.main_thread() not in threads
+
+
+def test_raw_searches_are_not_condensed(searches, monkeypatch):
+    monkeypatch.setattr(utils, "condense_results", lambda results, token_budget: pytest.fail("condensed"))
+    results, errors = asyncio.run(utils.search_competitors_async(["Acme", "Globex"]))
+
+    assert list(results) == ["Acme", "Globex"]
+    assert searches == ["Acme", "Globex"]
@@ -0,0 +1,171 @@
+"""Measure each agent's cold start: import time of app.main, time until the port answers and time until /ready.
+
+    python benchmarks/cold_start.py                      # real SDKs if installed
+    python benchmarks/cold_start.py --sdk fake           # shadow the SDKs with benchmarks/fakes
+    python benchmarks/cold_start.py --save-baseline      # record benchmarks/cold_start_baseline.json
+    python benchmarks/cold_start.py --check              # exit 1 on regression vs the baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from stack import AGENTS, BENCHMARK_DIR, COMMON_DIR, FAKES_DIR, ORCHESTRATOR, REPO_ROOT
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "cold_start_baseline.json")
+# SDKs that should only be imported on first use or by the background warm-up
+HEAVY_MODULES = ["langchain_sambanova", "tavily"]
+METRICS = ["import_seconds", "listening_seconds", "ready_seconds"]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"import_seconds": elapsed, "heavy_modules": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def agent_env(agent_dir: str, port: int, sdk: str, state_dir: str) -> dict:
+    paths = [FAKES_DIR, agent_dir, COMMON_DIR] if sdk == "fake" else [agent_dir, COMMON_DIR]
+    return {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(paths),
+        "PORT": str(port),
+        "SAMBANOVA_API_KEY": "benchmark",
+        "TAVILY_API_KEY": "benchmark",
+        "SEARCH_CACHE_PATH": os.path.join(state_dir, "search_cache.db"),
+        "JOB_STORE_PATH": "",
+        "ANALYSIS_STORE_PATH": "",
+        "AGENT_WARMUP": "false",  # No agents are running for the orchestrator to connect to
+    }
+
+
+def measure_import(agent_dir: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE % (HEAVY_MODULES,)],
+        cwd=agent_dir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_startup(agent_dir: str, env: dict, port: int, timeout: float) -> dict:
+    command = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning", "app.main:app"]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=agent_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    listening = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"{agent_dir} exited during startup:\n{process.stderr.read().decode()[-2000:]}")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1)
+            except httpx.TransportError:
+                time.sleep(0.01)
+                continue
+            listening = listening or time.perf_counter() - started
+            # Builds without a /ready endpoint (404) are ready as soon as they answer
+            if response.status_code in (200, 404):
+                return {"listening_seconds": listening, "ready_seconds": time.perf_counter() - started,
+                        "warmup": response.json() if response.status_code == 200 else {}}
+            time.sleep(0.01)
+        raise RuntimeError(f"{agent_dir} was not ready within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run(args) -> dict:
+    state_dir = tempfile.mkdtemp(prefix="cold-start-")
+    agents = {}
+    for name, directory, offset in AGENTS + [ORCHESTRATOR]:
+        agent_dir = os.path.join(REPO_ROOT, directory)
+        port = args.base_port + offset
+        env = agent_env(agent_dir, port, args.sdk, state_dir)
+        imports = [measure_import(agent_dir, env) for _ in range(args.runs)]
+        startups = [measure_startup(agent_dir, env, port, args.timeout) for _ in range(args.runs)]
+        agents[name] = {
+            "import_seconds": statistics.median(run["import_seconds"] for run in imports),
+            "listening_seconds": statistics.median(run["listening_seconds"] for run in startups),
+            "ready_seconds": statistics.median(run["ready_seconds"] for run in startups),
+            "heavy_modules_at_import": imports[-1]["heavy_modules"],
+            "warmup_steps": startups[-1]["warmup"].get("steps", {}),
+        }
+    return {"config": {"sdk": args.sdk, "runs": args.runs}, "agents": agents}
+
+
+def print_report(report: dict):
+    print(f"{'agent':<14}{'import':>10}{'listening':>12}{'ready':>10}  eager SDK imports")
+    for name, agent in report["agents"].items():
+        print(
+            f"{name:<14}{agent['import_seconds'] * 1000:>8.0f}ms{agent['listening_seconds'] * 1000:>10.0f}ms"
+            f"{agent['ready_seconds'] * 1000:>8.0f}ms  {', '.join(agent['heavy_modules_at_import']) or '-'}"
+        )
+
+
+def check_regression(report: dict, baseline: dict, tolerance: float, slack: float) -> list:
+    problems = []
+    if report["config"]["sdk"] != baseline["config"]["sdk"]:
+        print(f"warning: sdk differs from the baseline ({report['config']['sdk']} vs {baseline['config']['sdk']})")
+    for name, agent in report["agents"].items():
+        reference = baseline["agents"].get(name)
+        if reference is None:
+            continue
+        for metric in METRICS:
+            # Absolute slack keeps millisecond-scale timings from flapping
+            if agent[metric] > reference[metric] * (1 + tolerance) + slack:
+                problems.append(f"{name} {metric} {agent[metric] * 1000:.0f}ms > baseline {reference[metric] * 1000:.0f}ms")
+        added = set(agent["heavy_modules_at_import"]) - set(reference["heavy_modules_at_import"])
+        if added:
+            problems.append(f"{name} now imports {', '.join(sorted(added))} at startup")
+    return problems
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per agent; medians are reported")
+    parser.add_argument("--sdk", choices=["real", "fake"], default="real",
+                        help="real: installed langchain_sambanova/tavily; fake: benchmarks/fakes")
+    parser.add_argument("--base-port", type=int, default=8200)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json-out", help="also write the report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="compare against --baseline and fail on regression")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression (0.3 = 30%%)")
+    parser.add_argument("--slack-ms", type=float, default=50, help="allowed absolute regression per timing")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run(args)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            problems = check_regression(report, json.load(f), args.tolerance, args.slack_ms / 1000)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+        print("no regression against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Local Tavily /search stand-in with configurable latency and deterministic results."""
+import asyncio
+import hashlib
+import os
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+FAKE_TAVILY_LATENCY_MS = float(os.getenv("FAKE_TAVILY_LATENCY_MS", 400))
+FAKE_TAVILY_CONTENT_SENTENCES = int(os.getenv("FAKE_TAVILY_CONTENT_SENTENCES", 12))
+
+app = FastAPI(title="Fake Tavily")
+
+
+class SearchRequest(BaseModel):
+    query: str
+    max_results: int = 5
+    include_raw_content: bool = False
+
+
+def sentences(query: str, index: int, count: int) -> str:
+    return " ".join(
+        f"{query} result {index} reports finding {hashlib.sha256(f'{query}:{index}:{n}'.encode()).hexdigest()[:8]} "
+        f"about products, pricing and market position."
+        for n in range(count)
+    )
+
+
+@app.post("/search")
+async def search(request: SearchRequest):
+    await asyncio.sleep(FAKE_TAVILY_LATENCY_MS / 1000)
+    slug = request.query.lower().replace(" ", "-")
+    results = []
+    for index in range(request.max_results):
+        result = {
+            "title": f"{request.query} - source {index + 1}",
+            "url": f"https://example.com/{slug}/{index + 1}",
+            "content": sentences(request.query, index, FAKE_TAVILY_CONTENT_SENTENCES // 2),
+            "score": round(1 - index * 0.1, 2),
+        }
+        if request.include_raw_content:
+            result["raw_content"] = sentences(request.query, index, FAKE_TAVILY_CONTENT_SENTENCES)
+        results.append(result)
+    return {"query": request.query, "results": results}
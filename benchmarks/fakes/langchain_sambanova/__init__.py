@@ -0,0 +1,123 @@
+"""Deterministic stand-in for langchain_sambanova.ChatSambaNovaCloud used by the benchmarks.
+
+Answers are chosen from the prompt (competitor generation, categorization, batch
+categorization, reflection) so every agent gets JSON its response model accepts.
+Latency is modelled as time-to-first-token plus a fixed streaming rate.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 300))  # Time to first token
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", 50))  # Uniform +/- jitter, seeded by the prompt
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", 400))  # 0 streams instantly
+FAKE_LLM_ITEMS = int(os.getenv("FAKE_LLM_ITEMS", 3))  # Entries per list field in generated JSON
+FAKE_COMPETITOR_COUNT = int(os.getenv("FAKE_COMPETITOR_COUNT", 5))
+FAKE_SEED = os.getenv("FAKE_SEED", "benchmark")
+
+CHUNK_TOKENS = 8  # Tokens per streamed chunk (4 characters per token)
+
+CATEGORIZATION_FIELDS = [
+    "key_insights", "unique_capabilities", "unique_selling_points", "recent_innovations",
+    "market_positioning", "challenges", "future_vision",
+]
+
+_INDUSTRY_RE = re.compile(r"Identify key players in the (.+?) domain")
+_SPECIFIED_RE = re.compile(r"consider only these companies: (.+?)\.\n")
+_COMPETITOR_RE = re.compile(r"Analyze (.+?) based on these search results")
+_SECTION_RE = re.compile(r"^### (.+)$", re.MULTILINE)
+
+
+@dataclass
+class AIMessageChunk:
+    content: str
+
+
+def _message_text(message) -> str:
+    if isinstance(message, tuple):
+        return message[1]
+    return getattr(message, "content", str(message))
+
+
+def _prompt(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    # The first human turn identifies the task; repair turns follow it
+    for message in messages:
+        role = message[0] if isinstance(message, tuple) else getattr(message, "type", "")
+        if role in ("human", "user"):
+            return _message_text(message)
+    return _message_text(messages[-1])
+
+
+def _items(label: str, digest: str):
+    return [f"{label} {digest[i:i + 6]}" for i in range(FAKE_LLM_ITEMS)]
+
+
+def _categorization(competitor: str) -> dict:
+    digest = hashlib.sha256(competitor.encode()).hexdigest()
+    return {field: _items(f"{competitor} {field.replace('_', ' ')}", digest) for field in CATEGORIZATION_FIELDS}
+
+
+def fake_answer(prompt: str) -> str:
+    digest = hashlib.sha256(prompt.encode()).hexdigest()
+    industry = _INDUSTRY_RE.search(prompt)
+    if industry:
+        specified = _SPECIFIED_RE.search(prompt)
+        if specified:
+            competitors = [name.strip() for name in specified.group(1).split(",")]
+        else:
+            competitors = [f"{industry.group(1)} Competitor {i + 1}" for i in range(FAKE_COMPETITOR_COUNT)]
+        return json.dumps({"competitors": competitors, "overview": f"Overview of the {industry.group(1)} domain."})
+    if "Analyze each of the following competitors" in prompt:
+        return json.dumps({"results": {name: _categorization(name) for name in _SECTION_RE.findall(prompt)}})
+    competitor = _COMPETITOR_RE.search(prompt)
+    if competitor:
+        return json.dumps(_categorization(competitor.group(1)))
+    # Reflection: the digest covers previous feedback, so each round returns new suggestions
+    return json.dumps({"critique": _items("Critique", digest), "suggestions": _items("Suggestion", digest)})
+
+
+class ChatSambaNovaCloud:
+    def __init__(self, model: str = "", sambanova_api_key: str = "", **params):
+        self.model = model
+        self.params = params
+
+    def _plan(self, messages):
+        prompt = _prompt(messages)
+        text = fake_answer(prompt)
+        rng = random.Random(f"{FAKE_SEED}:{prompt}")
+        first_token = max(FAKE_LLM_LATENCY_MS + rng.uniform(-FAKE_LLM_JITTER_MS, FAKE_LLM_JITTER_MS), 0) / 1000
+        step = CHUNK_TOKENS * 4
+        chunks = [text[i:i + step] for i in range(0, len(text), step)]
+        per_chunk = CHUNK_TOKENS / FAKE_LLM_TOKENS_PER_SECOND if FAKE_LLM_TOKENS_PER_SECOND > 0 else 0
+        return text, first_token, chunks, per_chunk
+
+    def invoke(self, messages, **kwargs) -> AIMessageChunk:
+        text, first_token, chunks, per_chunk = self._plan(messages)
+        time.sleep(first_token + per_chunk * len(chunks))
+        return AIMessageChunk(text)
+
+    async def ainvoke(self, messages, **kwargs) -> AIMessageChunk:
+        text, first_token, chunks, per_chunk = self._plan(messages)
+        await asyncio.sleep(first_token + per_chunk * len(chunks))
+        return AIMessageChunk(text)
+
+    def stream(self, messages, **kwargs):
+        _, first_token, chunks, per_chunk = self._plan(messages)
+        time.sleep(first_token)
+        for chunk in chunks:
+            time.sleep(per_chunk)
+            yield AIMessageChunk(chunk)
+
+    async def astream(self, messages, **kwargs):
+        _, first_token, chunks, per_chunk = self._plan(messages)
+        await asyncio.sleep(first_token)
+        for chunk in chunks:
+            await asyncio.sleep(per_chunk)
+            yield AIMessageChunk(chunk)
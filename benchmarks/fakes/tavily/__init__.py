@@ -0,0 +1,21 @@
+"""Stand-in for tavily.TavilyClient that queries the local fake Tavily server."""
+import os
+import httpx
+
+FAKE_TAVILY_URL = os.getenv("FAKE_TAVILY_URL", "http://127.0.0.1:8100")
+
+_client = httpx.Client(base_url=FAKE_TAVILY_URL, timeout=60)
+
+
+class TavilyClient:
+    def __init__(self, api_key=None, **kwargs):
+        self.api_key = api_key
+
+    def search(self, query: str, max_results: int = 5, include_raw_content: bool = False, **kwargs) -> dict:
+        response = _client.post("/search", json={
+            "query": query,
+            "max_results": max_results,
+            "include_raw_content": include_raw_content,
+        })
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,262 @@
+"""Drive /orchestrate against the local fake-backed stack and report latency percentiles.
+
+    python benchmarks/run_benchmark.py --requests 20 --concurrency 4 --competitors 5
+    python benchmarks/run_benchmark.py --save-baseline       # record benchmarks/baseline.json
+    python benchmarks/run_benchmark.py --check               # exit 1 on regression vs the baseline
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+import uuid
+from importlib import metadata
+import httpx
+from stack import BENCHMARK_DIR, Stack
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+STAGES = ["generate", "research", "summary", "reflection"]
+# Config keys that must match for a baseline comparison to be meaningful
+COMPARABLE_CONFIG = [
+    "requests", "concurrency", "competitors", "specified", "endpoint", "warm_cache", "transport",
+    "llm_latency_ms", "llm_tokens_per_second", "tavily_latency_ms",
+]
+
+
+# Packages whose version changes the numbers; recorded with every report
+ENVIRONMENT_PACKAGES = ["fastapi", "uvicorn", "httpx", "pydantic", "orjson", "msgpack", "zstandard"]
+
+
+def environment() -> dict:
+    """Where the report was captured, so a baseline is only compared against a similar machine."""
+    packages = {}
+    for name in ENVIRONMENT_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+def percentile(values, q):
+    # Nearest-rank percentile
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(values):
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else None,
+    }
+
+
+def build_payload(args, index: int, run_id: str) -> dict:
+    # Unique inputs miss every cache so each request exercises the full pipeline
+    suffix = "warm" if args.warm_cache else f"{run_id}-{index}"
+    industry = f"Benchmark {suffix}"
+    payload = {"industry": industry}
+    if args.specified:
+        payload["specified_competitors"] = [f"{industry} Company {i + 1}" for i in range(args.competitors)]
+    return payload
+
+
+async def run_streamed(client: httpx.AsyncClient, payload: dict) -> dict:
+    started = time.perf_counter()
+    marks = {}
+    async with client.stream("POST", "/orchestrate/stream", json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)["event"]
+            elapsed = time.perf_counter() - started
+            if event == "error":
+                raise RuntimeError(line)
+            if event in ("search", "categorization"):
+                marks["research_end"] = elapsed
+            else:
+                marks.setdefault(event, elapsed)
+    total = time.perf_counter() - started
+    competitors = marks.get("competitors", 0.0)
+    research_end = marks.get("research_end", competitors)
+    summary = marks.get("summary", research_end)
+    return {
+        "total": total,
+        "stages": {
+            "generate": competitors,
+            "research": research_end - competitors,
+            "summary": summary - research_end,
+            "reflection": marks.get("result", total) - summary,
+        },
+    }
+
+
+async def run_plain(client: httpx.AsyncClient, payload: dict) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/orchestrate", json=payload)
+    response.raise_for_status()
+    return {"total": time.perf_counter() - started, "stages": {}}
+
+
+async def drive(args, base_url: str) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    request = run_streamed if args.endpoint == "stream" else run_plain
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for index in range(args.warmup):
+            await request(client, build_payload(args, -index - 1, run_id))
+
+        gate = asyncio.Semaphore(args.concurrency)
+        samples, failures = [], []
+
+        async def one(index: int):
+            async with gate:
+                try:
+                    samples.append(await request(client, build_payload(args, index, run_id)))
+                except Exception as e:
+                    failures.append(f"{type(e).__name__}: {e}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(args.requests)))
+        wall = time.perf_counter() - started
+
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "competitors": args.competitors,
+            "specified": args.specified,
+            "endpoint": args.endpoint,
+            "warm_cache": args.warm_cache,
+            "transport": args.transport,
+            "llm_latency_ms": float(os.environ.get("FAKE_LLM_LATENCY_MS", args.llm_latency_ms)),
+            "llm_tokens_per_second": float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", args.llm_tokens_per_second)),
+            "tavily_latency_ms": float(os.environ.get("FAKE_TAVILY_LATENCY_MS", args.tavily_latency_ms)),
+        },
+        "completed": len(samples),
+        "failed": len(failures),
+        "errors": failures[:5],
+        "wall_seconds": wall,
+        "throughput_rps": len(samples) / wall if wall else 0.0,
+        "latency": summarize([sample["total"] for sample in samples]),
+        "stages": {
+            stage: summarize([sample["stages"][stage] for sample in samples if stage in sample["stages"]])
+            for stage in STAGES
+        } if args.endpoint == "stream" else {},
+    }
+
+
+def print_report(report: dict):
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:8.1f}"
+
+    print(f"completed {report['completed']}  failed {report['failed']}  "
+          f"wall {report['wall_seconds']:.2f}s  throughput {report['throughput_rps']:.2f} req/s")
+    print(f"{'':12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    rows = [("total", report["latency"])] + list(report["stages"].items())
+    for name, stats in rows:
+        print(f"{name:12} {ms(stats['p50'])} {ms(stats['p95'])} {ms(stats['p99'])} {ms(stats['mean'])}")
+    for error in report["errors"]:
+        print(f"error: {error}")
+
+
+def check_regression(report: dict, baseline: dict, tolerance: float) -> list:
+    problems = []
+    for key in COMPARABLE_CONFIG:
+        if report["config"].get(key) != baseline["config"].get(key):
+            print(f"warning: config '{key}' differs from the baseline "
+                  f"({report['config'].get(key)} vs {baseline['config'].get(key)})")
+    for metric in ("p50", "p95", "p99"):
+        current, reference = report["latency"][metric], baseline["latency"][metric]
+        if current is not None and reference and current > reference * (1 + tolerance):
+            problems.append(f"latency {metric} {current * 1000:.1f}ms > baseline {reference * 1000:.1f}ms")
+    if baseline["throughput_rps"] and report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        problems.append(f"throughput {report['throughput_rps']:.2f} < baseline {baseline['throughput_rps']:.2f} req/s")
+    if report["failed"] > baseline.get("failed", 0):
+        problems.append(f"{report['failed']} failed requests (baseline {baseline.get('failed', 0)})")
+    return problems
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--competitors", type=int, default=5, help="competitors per analysis")
+    parser.add_argument("--specified", action="store_true", help="send specified_competitors instead of generating them")
+    parser.add_argument("--warm-cache", action="store_true", help="repeat one input so agent caches are hit")
+    parser.add_argument("--endpoint", choices=["stream", "plain"], default="stream",
+                        help="stream gives the per-stage breakdown; plain calls /orchestrate")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--transport", choices=["http", "inprocess"], default="http",
+                        help="orchestrator AGENT_TRANSPORT; inprocess calls the agents without HTTP")
+    parser.add_argument("--base-port", type=int, default=8100)
+    parser.add_argument("--orchestrator-url", help="drive an already running stack instead of starting one")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=400)
+    parser.add_argument("--tavily-latency-ms", type=float, default=400)
+    parser.add_argument("--json-out", help="also write the report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="compare against --baseline and fail on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.orchestrator_url:
+        report = asyncio.run(drive(args, args.orchestrator_url))
+    else:
+        fake_env = {
+            "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+            "FAKE_LLM_TOKENS_PER_SECOND": str(args.llm_tokens_per_second),
+            "FAKE_TAVILY_LATENCY_MS": str(args.tavily_latency_ms),
+            "FAKE_COMPETITOR_COUNT": str(args.competitors),
+            "AGENT_TRANSPORT": args.transport,
+        }
+        os.environ.update(fake_env)
+        with Stack(args.base_port, env=fake_env) as stack:
+            report = asyncio.run(drive(args, stack.orchestrator_url))
+
+    report["environment"] = environment()
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("python", "machine", "cpu_count"):
+            if baseline.get("environment", {}).get(key) != report["environment"][key]:
+                print(f"warning: environment '{key}' differs from the baseline "
+                      f"({report['environment'][key]} vs {baseline.get('environment', {}).get(key)})")
+        problems = check_regression(report, baseline, args.tolerance)
+        if problems:
+            print("REGRESSION: " + "; ".join(problems))
+            sys.exit(1)
+        print("no regression against the baseline")
+
+
+if __name__ == "__main__":
+    main()
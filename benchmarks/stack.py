@@ -0,0 +1,119 @@
+"""Launches the fake Tavily server and all seven agents as local uvicorn processes."""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+FAKES_DIR = os.path.join(BENCHMARK_DIR, "fakes")
+COMMON_DIR = os.path.join(REPO_ROOT, "common")  # agent_common, importable without installing it
+
+# (name, agent directory, port offset from the base port); the orchestrator is started last
+AGENTS = [
+    ("generate", "Generate_Competitors", 1),
+    ("websearch", "Web_search_Agent", 2),
+    ("categorize", "Categorize_Findings_Agent", 3),
+    ("summary", "Final_Summary_Agent", 4),
+    ("reflection", "Reflection__Notes_Agent", 5),
+    ("metrics", "Metrics_agent", 6),
+]
+ORCHESTRATOR = ("orchestrator", "Competitor_Analysis_Sync_Agent", 7)
+STARTUP_TIMEOUT = 60
+
+
+class Stack:
+    """Context manager; exposes orchestrator_url once every process answers."""
+
+    def __init__(self, base_port: int = 8100, env: dict = None, log_dir: str = None):
+        self.base_port = base_port
+        self.extra_env = env or {}
+        self.log_dir = log_dir or tempfile.mkdtemp(prefix="bench-logs-")
+        self.state_dir = tempfile.mkdtemp(prefix="bench-state-")
+        self.processes = []
+
+    def url(self, offset: int) -> str:
+        return f"http://127.0.0.1:{self.base_port + offset}"
+
+    @property
+    def orchestrator_url(self) -> str:
+        return self.url(ORCHESTRATOR[2])
+
+    def _env(self, agent_dir: str, port: int) -> dict:
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join([FAKES_DIR, agent_dir, COMMON_DIR]),
+            "PORT": str(port),
+            "SAMBANOVA_API_KEY": "benchmark",
+            "TAVILY_API_KEY": "benchmark",
+            "FAKE_TAVILY_URL": self.url(0),
+            # Keep cache and job files out of the source tree
+            "SEARCH_CACHE_PATH": os.path.join(self.state_dir, "search_cache.db"),
+            "JOB_STORE_PATH": "",
+            # Benchmark iterations rerun the same industry; reusing findings would skip categorization
+            "ANALYSIS_STORE_PATH": "",
+            "INCREMENTAL_ANALYSIS": "false",
+            # Orchestrator: reach each agent on its local port
+            "GENERATE_COMPETITORS_BASE_URL": self.url(1),
+            "WEBSEARCH_BASE_URL": self.url(2),
+            "CATEGORIZE_FINDINGS_BASE_URL": self.url(3),
+            "FINAL_SUMMARY_BASE_URL": self.url(4),
+            "REFLECTION_AGENT_BASE_URL": self.url(5),
+        }
+        env.update(self.extra_env)
+        return env
+
+    def _spawn(self, name: str, command: list, cwd: str, port: int):
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "w")
+        process = subprocess.Popen(command, cwd=cwd, env=self._env(cwd, port), stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append((name, process, log, port))
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        for name, process, _, port in self.processes:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{name} exited during startup; see {self.log_dir}/{name}.log")
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{name} did not start within {STARTUP_TIMEOUT}s; see {self.log_dir}/{name}.log")
+                time.sleep(0.2)
+
+    def start(self):
+        uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+        self._spawn("tavily", uvicorn + ["--port", str(self.base_port), "fake_tavily_server:app"], BENCHMARK_DIR, self.base_port)
+        for name, directory, offset in AGENTS:
+            port = self.base_port + offset
+            self._spawn(name, uvicorn + ["--port", str(port), "app.main:app"], os.path.join(REPO_ROOT, directory), port)
+        name, directory, offset = ORCHESTRATOR
+        port = self.base_port + offset
+        self._spawn(name, uvicorn + ["--port", str(port), "app.main:app"], os.path.join(REPO_ROOT, directory), port)
+        try:
+            self._wait_ready()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def stop(self):
+        for _, process, _, _ in self.processes:
+            process.terminate()
+        for _, process, log, _ in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            log.close()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
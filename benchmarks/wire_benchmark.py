@@ -0,0 +1,150 @@
+"""Compare bytes on the wire and (de)serialization time for orchestrator <-> agent payloads.
+
+Payloads are synthetic but shaped like the real ones (batch categorization, summary and full
+reflection state) and grow with the competitor count. Codecs come from agent_common.wire.
+
+    python benchmarks/wire_benchmark.py --competitors 10 50 200
+    python benchmarks/wire_benchmark.py --json-out wire.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from stack import REPO_ROOT
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "common"))
+from agent_common import wire  # noqa: E402
+
+FINDING_FIELDS = [
+    "key_insights", "unique_capabilities", "unique_selling_points", "recent_innovations",
+    "market_positioning", "challenges", "future_vision",
+]
+
+
+class TextGenerator:
+    """Seeded pseudo-prose: a fixed vocabulary gives realistic repetition for the compressors."""
+
+    def __init__(self, seed: int = 7, vocabulary_size: int = 800):
+        self.random = random.Random(seed)
+        syllables = ["ka", "lo", "mi", "ter", "an", "sol", "ver", "cu", "dat", "ion", "pro", "ex", "net", "ai", "gen"]
+        self.words = ["".join(self.random.choice(syllables) for _ in range(self.random.randint(1, 4))) for _ in range(vocabulary_size)]
+
+    def sentence(self, words: int = 14) -> str:
+        return " ".join(self.random.choice(self.words) for _ in range(words)).capitalize() + "."
+
+    def paragraph(self, sentences: int = 4) -> str:
+        return " ".join(self.sentence() for _ in range(sentences))
+
+
+def build_payloads(competitors: int, text: TextGenerator) -> dict:
+    names = [f"Competitor {index + 1}" for index in range(competitors)]
+    research_results = {
+        name: [
+            {"title": text.sentence(8), "url": f"https://example.com/{index}/{hit}", "summary": text.paragraph(3), "score": 0.9 - hit / 10}
+            for hit in range(3)
+        ]
+        for index, name in enumerate(names)
+    }
+    findings = {name: {field: [text.sentence(10) for _ in range(3)] for field in FINDING_FIELDS} for name in names}
+    sources = [hit["url"] for hits in research_results.values() for hit in hits]
+    summary = "\n\n".join(
+        f"## {name}\n\n" + "\n".join(f"* **{field}:** {', '.join(values)}" for field, values in data.items())
+        for name, data in findings.items()
+    )
+    return {
+        "categorize_batch": {
+            "items": [
+                {"competitor": name, "search_results": [{key: hit[key] for key in ("title", "summary", "url")} for hit in hits]}
+                for name, hits in research_results.items()
+            ]
+        },
+        "summary": {"industry": "Benchmark", "overview": text.paragraph(), "findings": findings, "sources": sources},
+        "reflection_state": {
+            "industry": "Benchmark", "specified_competitors": [], "competitors": names, "overview": text.paragraph(),
+            "selected_competitors": names, "research_results": research_results, "categorized_findings": findings,
+            "base_analysis": summary, "final_analysis": summary, "reflection_feedback": [text.sentence() for _ in range(6)],
+            "reflection_iteration": 1, "max_reflection_iterations": 3, "next": "reflection",
+        },
+    }
+
+
+def codecs() -> dict:
+    # name -> (encode, decode); "json (httpx)" is what the orchestrator sent before agent_common.wire
+    available = {
+        "json (httpx)": (lambda obj: json.dumps(obj).encode("utf-8"), json.loads),
+        "json compact": (lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), json.loads),
+    }
+    if wire.orjson is not None:
+        available["orjson"] = (wire.orjson.dumps, wire.orjson.loads)
+    if wire.msgpack is not None:
+        available["msgpack"] = (lambda obj: wire.encode(obj, wire.MSGPACK), lambda data: wire.decode(data, wire.MSGPACK))
+    return available
+
+
+def timed(function, repeats: int) -> tuple:
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - started)
+    return result, statistics.median(durations)
+
+
+def measure(payload: dict, repeats: int) -> list:
+    rows = []
+    for codec, (encode, decode) in codecs().items():
+        for encoding in ["identity"] + wire.supported_encodings():
+            def send():
+                return wire.compress(encode(payload), encoding)
+
+            def receive():
+                return decode(wire.decompress(body, encoding))
+
+            body, encode_seconds = timed(send, repeats)
+            _, decode_seconds = timed(receive, repeats)
+            rows.append({
+                "codec": codec, "encoding": encoding, "bytes": len(body),
+                "encode_ms": encode_seconds * 1000, "decode_ms": decode_seconds * 1000,
+            })
+    return rows
+
+
+def print_table(name: str, competitors: int, rows: list):
+    baseline = next(row for row in rows if row["codec"] == "json (httpx)" and row["encoding"] == "identity")
+    print(f"\n{name}, {competitors} competitors")
+    print(f"{'codec':<14}{'encoding':<10}{'bytes':>10}{'vs base':>9}{'encode ms':>11}{'decode ms':>11}")
+    for row in rows:
+        print(
+            f"{row['codec']:<14}{row['encoding']:<10}{row['bytes']:>10}{row['bytes'] / baseline['bytes']:>8.0%}"
+            f"{row['encode_ms']:>11.2f}{row['decode_ms']:>11.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--competitors", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=15, help="timings are medians over this many runs")
+    parser.add_argument("--json-out", help="also write the results to this file")
+    args = parser.parse_args()
+
+    missing = [name for name, module in [("orjson", wire.orjson), ("msgpack", wire.msgpack), ("zstandard", wire.zstandard)] if module is None]
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+
+    report = {}
+    for competitors in args.competitors:
+        for name, payload in build_payloads(competitors, TextGenerator()).items():
+            rows = measure(payload, args.repeats)
+            report.setdefault(name, {})[competitors] = rows
+            print_table(name, competitors, rows)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
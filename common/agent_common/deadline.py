@@ -0,0 +1,105 @@
+import contextvars
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Remaining time budget sent with every agent call; each hop turns it into a local deadline.
+# A relative budget (like gRPC's grpc-timeout) is immune to clock skew between hosts.
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+_deadline = contextvars.ContextVar("request_deadline", default=None)  # time.monotonic() value
+
+
+def current_deadline() -> Optional[float]:
+    return _deadline.get()
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    return time.monotonic() + seconds if seconds is not None else None
+
+
+def earliest(*deadlines: Optional[float]) -> Optional[float]:
+    known = [deadline for deadline in deadlines if deadline is not None]
+    return min(known) if known else None
+
+
+def latest(*deadlines: Optional[float]) -> Optional[float]:
+    # None is no deadline at all, which outlasts any other
+    return None if not deadlines or None in deadlines else max(deadlines)
+
+
+def set_deadline(context: contextvars.Context, deadline: Optional[float]):
+    """Move the deadline seen by code running in context (e.g. a task created with context=...)."""
+    context.run(_deadline.set, deadline)
+
+
+@contextmanager
+def use_deadline(deadline: Optional[float]):
+    """Run the enclosed block (and tasks it creates) under deadline; None removes any deadline."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the active deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """The smaller of timeout and the time left; never negative."""
+    left = remaining()
+    if left is None:
+        return timeout
+    left = max(left, 0.0)
+    return left if timeout is None else min(timeout, left)
+
+
+def deadline_headers() -> Dict[str, str]:
+    left = remaining()
+    if left is None:
+        return {}
+    return {DEADLINE_HEADER: str(max(int(left * 1000), 0))}
+
+
+class DeadlineMiddleware:
+    """Applies an incoming X-Request-Timeout-Ms budget to the request; an exhausted budget gets 504."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = dict(scope.get("headers") or []).get(DEADLINE_HEADER.lower().encode())
+        try:
+            budget_ms = float(header) if header else None
+        except ValueError:
+            budget_ms = None
+        if budget_ms is None:
+            await self.app(scope, receive, send)
+            return
+
+        if budget_ms <= 0:
+            body = json.dumps({"detail": "Request deadline already exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        with use_deadline(earliest(_deadline.get(), deadline_after(budget_ms / 1000))):
+            await self.app(scope, receive, send)
@@ -0,0 +1,269 @@
+import bisect
+import contextvars
+import json
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+# Shared tracing, metrics and debug logging; the same module is deployed with every agent
+SERVICE_NAME = os.getenv("SERVICE_NAME", "")  # Overrides the name passed to instrument_app
+DEBUG_LOG_ENABLED = os.getenv("DEBUG_LOG", "false").lower() == "true"
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", 1.0))  # Fraction of debug records kept
+DEBUG_LOG_MAX_BYTES = int(os.getenv("DEBUG_LOG_MAX_BYTES", 2048))  # Longer records are truncated
+WARNING_LOG_SAMPLE_RATE = float(os.getenv("WARNING_LOG_SAMPLE_RATE", 1.0))  # Fraction of warning records kept; always on
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_debug_logger = logging.getLogger("agent.debug")
+_warning_logger = logging.getLogger("agent.warning")
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...], labelnames: Tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labelnames = labelnames
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series_items = [(key, list(series)) for key, series in self.series.items()]
+        for key, series in series_items:
+            labels = ",".join(f'{name}="{value}"' for name, value in zip(self.labelnames, key))
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines)
+
+
+REQUEST_LATENCY = Histogram(
+    "agent_request_duration_seconds", "Server-side request latency.", LATENCY_BUCKETS,
+    ("service", "method", "route", "status"),
+)
+PAYLOAD_BYTES = Histogram(
+    "agent_payload_bytes", "Request and response body sizes.", BYTES_BUCKETS,
+    ("service", "route", "direction"),
+)
+SPAN_LATENCY = Histogram(
+    "agent_span_duration_seconds", "Duration of named spans.", LATENCY_BUCKETS,
+    ("service", "span", "status"),
+)
+LLM_TOKENS = Histogram(
+    "agent_llm_tokens", "Estimated LLM tokens per call.", TOKEN_BUCKETS,
+    ("service", "kind"),
+)
+HISTOGRAMS = [REQUEST_LATENCY, PAYLOAD_BYTES, SPAN_LATENCY, LLM_TOKENS]
+
+
+def render_metrics() -> str:
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+
+
+# -----------------------------
+# Trace context (W3C traceparent)
+# -----------------------------
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def current_trace() -> Optional[Tuple[str, str]]:
+    """(trace_id, span_id) of the active span, if any."""
+    return _current_span.get()
+
+
+def trace_headers() -> Dict[str, str]:
+    """Headers that make the receiving agent's spans children of the active span."""
+    trace = _current_span.get()
+    if trace is None:
+        return {}
+    return {"traceparent": f"00-{trace[0]}-{trace[1]}-01"}
+
+
+@contextmanager
+def span(name: str, parent: Optional[Tuple[str, str]] = None, **attributes):
+    """Time a unit of work as a child of the active span (or of parent, or as a new trace)."""
+    parent = parent or _current_span.get()
+    trace_id = parent[0] if parent else secrets.token_hex(16)
+    span_id = secrets.token_hex(8)
+    token = _current_span.set((trace_id, span_id))
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _current_span.reset(token)
+        SPAN_LATENCY.observe(duration, service=SERVICE_NAME, span=name, status=status)
+        debug_log(
+            "span", name=name, trace_id=trace_id, span_id=span_id,
+            parent_id=parent[1] if parent else None, duration_ms=round(duration * 1000, 2),
+            status=status, **attributes
+        )
+
+
+# -----------------------------
+# Metrics helpers
+# -----------------------------
+def estimate_tokens(text: str) -> int:
+    # Rough 4-characters-per-token estimate
+    return len(text) // 4 + 1
+
+
+def record_llm_tokens(prompt_text: str, completion_text: str):
+    LLM_TOKENS.observe(estimate_tokens(prompt_text), service=SERVICE_NAME, kind="prompt")
+    LLM_TOKENS.observe(estimate_tokens(completion_text), service=SERVICE_NAME, kind="completion")
+
+
+def record_payload(route: str, direction: str, size: int):
+    PAYLOAD_BYTES.observe(size, service=SERVICE_NAME, route=route, direction=direction)
+
+
+# -----------------------------
+# Debug logging
+# -----------------------------
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+def _log_line(event: str, fields: dict) -> str:
+    trace = _current_span.get()
+    record = {"event": event, "service": SERVICE_NAME, "trace_id": trace[0] if trace else None, **fields}
+    line = json.dumps(record, default=_json_default)
+    if len(line) > DEBUG_LOG_MAX_BYTES:
+        line = line[:DEBUG_LOG_MAX_BYTES] + f"...[truncated {len(line) - DEBUG_LOG_MAX_BYTES} bytes]"
+    return line
+
+
+def debug_log(event: str, **fields):
+    """Sampled, size-capped JSON debug record; returns immediately unless DEBUG_LOG=true."""
+    if not DEBUG_LOG_ENABLED or random.random() >= DEBUG_LOG_SAMPLE_RATE:
+        return
+    _debug_logger.debug(_log_line(event, fields))
+
+
+def warning_log(event: str, message: str, **fields):
+    """Same record format as debug_log, but always on (subject to WARNING_LOG_SAMPLE_RATE)."""
+    if random.random() >= WARNING_LOG_SAMPLE_RATE:
+        return
+    _warning_logger.warning(_log_line(event, {"level": "warning", "message": message, **fields}))
+
+
+def _add_handler(logger: logging.Logger, level: int):
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+if DEBUG_LOG_ENABLED and not _debug_logger.handlers:
+    _add_handler(_debug_logger, logging.DEBUG)
+if not _warning_logger.handlers:
+    _add_handler(_warning_logger, logging.WARNING)
+
+
+# -----------------------------
+# ASGI middleware and /metrics
+# -----------------------------
+class InstrumentationMiddleware:
+    """Opens a server span per request (continuing an incoming traceparent) and records
+    latency and body sizes labelled by the matched route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        sizes = {"request": 0, "response": 0}
+        status = {"code": 500}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                trace = _current_span.get()
+                if trace is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"traceparent", f"00-{trace[0]}-{trace[1]}-01".encode())
+                    ]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            with span("http.server", parent=parent, method=scope["method"], path=scope["path"]):
+                await self.app(scope, counting_receive, counting_send)
+        finally:
+            # Route templates keep label cardinality bounded; plain Starlette routes have fixed paths
+            route = getattr(scope.get("route"), "path", None)
+            if route is None:
+                route = scope["path"] if status["code"] != 404 else "unmatched"
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                service=SERVICE_NAME, method=scope["method"], route=route, status=status["code"]
+            )
+            record_payload(route, "request", sizes["request"])
+            record_payload(route, "response", sizes["response"])
+
+
+def instrument_app(app: FastAPI, service: str):
+    """Add tracing/metrics middleware and a Prometheus /metrics endpoint to an agent."""
+    global SERVICE_NAME
+    SERVICE_NAME = SERVICE_NAME or service
+    app.add_middleware(InstrumentationMiddleware)
+
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,77 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from agent_common.deadline import cap_timeout, expired
+
+# Per-process admission control for model calls
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))  # Model calls in flight
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 32))  # Calls allowed to wait for a slot
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 30))  # Seconds a call may wait before giving up
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", 5))
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent model calls with a bounded wait queue.
+
+    A full queue is rejected immediately with 429; a call that waits longer than
+    queue_timeout gets 503. Both carry Retry-After so clients back off.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.counters = {"admitted": 0, "rejected": 0, "timed_out": 0}
+
+    @asynccontextmanager
+    async def slot(self):
+        if not self.semaphore.locked():
+            # A free slot is taken without yielding, so the checks below see an accurate count
+            await self.semaphore.acquire()
+        elif self.queued >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many concurrent model requests; retry later",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+        else:
+            self.queued += 1
+            try:
+                # Waiting past the request's deadline is pointless
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=cap_timeout(self.queue_timeout))
+            except asyncio.TimeoutError:
+                self.counters["timed_out"] += 1
+                if expired():
+                    raise HTTPException(status_code=504, detail="Request deadline exceeded while waiting for model capacity")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Model capacity saturated; retry later",
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+                )
+            finally:
+                self.queued -= 1
+
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+
+llm_limiter = ConcurrencyLimiter(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
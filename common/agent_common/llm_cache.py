@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+# Content-addressed cache for parsed LLM responses
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512))  # In-memory LRU size
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")  # Optional SQLite backend; empty keeps the cache in memory only
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", 10000))
+
+
+def make_cache_key(model: str, params: dict, messages: List) -> str:
+    """Hash of the model, sampling params and rendered prompt messages."""
+    material = json.dumps({"model": model, "params": params, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def normalize_tag(tag: Optional[str]) -> Optional[str]:
+    return tag.strip().lower() if tag else None
+
+
+def normalize_tags(tag: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    # One tag or several (a batch entry is tagged with every competitor in it)
+    tags = [tag] if isinstance(tag, str) or tag is None else tag
+    return tuple(sorted({normalize_tag(t) for t in tags if t}))
+
+
+class LLMCache:
+    def __init__(self, max_entries: int, path: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path
+        self.entries = OrderedDict()  # key -> (value, tags)
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        if path:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache "
+                    "(key TEXT PRIMARY KEY, tag TEXT, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_tag ON llm_cache (tag)")
+                # Tags live here; llm_cache.tag is only read for rows written before entries could have several
+                conn.execute("CREATE TABLE IF NOT EXISTS llm_cache_tags (key TEXT NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (key, tag))")
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_tags_tag ON llm_cache_tags (tag)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _remember(self, key: str, value: Any, tags: Tuple[str, ...]):
+        self.entries[key] = (value, tags)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    # The lock only guards the memory tier and counters; SQLite work runs outside it, and the
+    # async variants below move it onto a worker thread so a disk lookup never blocks the event loop
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[0]
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        if self.path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value, tag FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                tags = [tag for (tag,) in conn.execute("SELECT tag FROM llm_cache_tags WHERE key = ?", (key,))]
+            if row is not None:
+                value = json.loads(row[0])
+                with self.lock:
+                    if key not in self.entries:  # A set() made meanwhile is at least as fresh
+                        self._remember(key, value, normalize_tags([row[1], *tags]))
+                    self.counters["disk_hits"] += 1
+                return value
+        with self.lock:
+            self.counters["misses"] += 1
+        return None
+
+    def _disk_set(self, key: str, value: Any, tags: Tuple[str, ...]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, tag, value, stored_at) VALUES (?, NULL, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            conn.execute("DELETE FROM llm_cache_tags WHERE key = ?", (key,))
+            conn.executemany("INSERT INTO llm_cache_tags (key, tag) VALUES (?, ?)", [(key, t) for t in tags])
+            # Keep the disk backend bounded by dropping the oldest rows
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+            conn.execute("DELETE FROM llm_cache_tags WHERE key NOT IN (SELECT key FROM llm_cache)")
+
+    def _disk_invalidate(self, tag: str) -> int:
+        with self._connect() as conn:
+            deleted = conn.execute(
+                "DELETE FROM llm_cache WHERE tag = ? OR key IN (SELECT key FROM llm_cache_tags WHERE tag = ?)",
+                (tag, tag)
+            ).rowcount
+            conn.execute("DELETE FROM llm_cache_tags WHERE key NOT IN (SELECT key FROM llm_cache)")
+        return deleted
+
+    def _memory_invalidate(self, tag: str) -> int:
+        with self.lock:
+            keys = [key for key, (_, entry_tags) in self.entries.items() if tag in entry_tags]
+            for key in keys:
+                del self.entries[key]
+            return len(keys)
+
+    def _count_invalidations(self, removed: int) -> int:
+        with self.lock:
+            self.counters["invalidations"] += removed
+        return removed
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._memory_get(key)
+        return value if value is not None else self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if not self.path:
+            return self._disk_get(key)  # Only counts the miss
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def set(self, key: str, value: Any, tag: Union[str, Iterable[str], None] = None):
+        tags = normalize_tags(tag)
+        with self.lock:
+            self._remember(key, value, tags)
+        if self.path:
+            self._disk_set(key, value, tags)
+
+    async def aset(self, key: str, value: Any, tag: Union[str, Iterable[str], None] = None):
+        tags = normalize_tags(tag)
+        with self.lock:
+            self._remember(key, value, tags)
+        if self.path:
+            await asyncio.to_thread(self._disk_set, key, value, tags)
+
+    def invalidate(self, tag: str) -> int:
+        """Drop every entry stored under tag (e.g. a competitor name); returns the number removed."""
+        tag = normalize_tag(tag)
+        removed = self._memory_invalidate(tag)
+        if self.path:
+            removed = max(removed, self._disk_invalidate(tag))
+        return self._count_invalidations(removed)
+
+    async def ainvalidate(self, tag: str) -> int:
+        tag = normalize_tag(tag)
+        removed = self._memory_invalidate(tag)
+        if self.path:
+            removed = max(removed, await asyncio.to_thread(self._disk_invalidate, tag))
+        return self._count_invalidations(removed)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                **self.counters,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": bool(self.path),
+            }
+
+
+llm_cache = LLMCache(
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    path=LLM_CACHE_PATH,
+    max_disk_entries=LLM_CACHE_MAX_DISK_ENTRIES
+)
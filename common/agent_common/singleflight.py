@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import os
+from typing import Any, Awaitable, Callable, Dict
+from fastapi import HTTPException
+from agent_common.deadline import cap_timeout, current_deadline, expired, latest, set_deadline
+
+# Concurrent identical requests share one upstream call instead of each making their own.
+# Unlike the result caches this also covers first-time bursts, before anything is cached.
+COALESCE_INFLIGHT = os.getenv("COALESCE_INFLIGHT", "true").lower() == "true"
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task, context: contextvars.Context):
+        self.task = task
+        self.context = context
+        self.waiters = []  # Deadline of every caller still waiting
+
+    def extend_deadline(self):
+        # The call may run as long as the most patient caller still waiting for it
+        if self.waiters:
+            set_deadline(self.context, latest(*self.waiters))
+
+
+class SingleFlight:
+    """Runs one call per key at a time; callers arriving while it is in flight await the same result.
+
+    The shared call runs under the latest deadline among the callers waiting for it, so it still
+    propagates a budget downstream without cutting short a more patient caller that joined later.
+    Each caller enforces its own deadline while waiting, and the call is cancelled once nobody
+    is waiting for it any more.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.flights: Dict[str, _Flight] = {}
+        self.counters = {"calls": 0, "executed": 0, "coalesced": 0, "abandoned": 0}
+
+    def _forget(self, key: str, flight: _Flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.counters["calls"] += 1
+        if not self.enabled:
+            self.counters["executed"] += 1
+            return await call()
+
+        flight = self.flights.get(key)
+        if flight is None:
+            self.counters["executed"] += 1
+            context = contextvars.copy_context()
+            flight = _Flight(asyncio.create_task(call(), context=context), context)
+            self.flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.counters["coalesced"] += 1
+
+        deadline = current_deadline()
+        flight.waiters.append(deadline)
+        flight.extend_deadline()
+        try:
+            # shield: one caller leaving (deadline, disconnect) must not cancel the call for the rest
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout=cap_timeout(None))
+        except asyncio.TimeoutError:
+            if expired():
+                raise HTTPException(status_code=504, detail="Request deadline exceeded while waiting for a shared call")
+            raise
+        finally:
+            flight.waiters.remove(deadline)
+            flight.extend_deadline()
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+                self.counters["abandoned"] += 1
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": len(self.flights), "enabled": self.enabled}
+
+
+inflight_calls = SingleFlight(COALESCE_INFLIGHT)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from agent_common.deadline import cap_timeout, expired
+from agent_common.instrumentation import debug_log, record_llm_tokens, span
+from agent_common.limiter import llm_limiter
+
+# Attempts per call: the first answer plus bounded repair requests to the model
+STRUCTURED_OUTPUT_MAX_ATTEMPTS = int(os.getenv("STRUCTURED_OUTPUT_MAX_ATTEMPTS", 2))
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+class JsonObjectScanner:
+    """Tracks streamed text until the first top-level JSON object is closed."""
+
+    def __init__(self):
+        self.text = ""
+        self.start = None
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Add a chunk; returns the complete object text once its closing brace arrives."""
+        offset = len(self.text)
+        self.text += chunk
+        for index in range(offset, len(self.text)):
+            char = self.text[index]
+            if self.start is None:
+                if char == "{":
+                    self.start = index
+                    self.stack.append(char)
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in _CLOSERS:
+                self.stack.append(char)
+            elif char in ("}", "]") and self.stack:
+                self.stack.pop()
+                if not self.stack:
+                    return self.text[self.start:index + 1]
+        return None
+
+    def partial(self) -> str:
+        """Best-effort text when the stream ended before the object closed."""
+        if self.start is None:
+            return self.text
+        closing = ('"' if self.in_string else "") + "".join(_CLOSERS[opener] for opener in reversed(self.stack))
+        return self.text[self.start:] + closing
+
+
+def parse_json(text: str) -> Any:
+    """json.loads with cheap local repairs: code fences and trailing commas."""
+    text = _CODE_FENCE_RE.sub("", text.strip())
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", text))
+
+
+def _message_text(message) -> str:
+    return message[1] if isinstance(message, tuple) else getattr(message, "content", str(message))
+
+
+async def _read_json_object(stream, scanner: JsonObjectScanner) -> str:
+    async for chunk in stream:
+        closed = scanner.feed(chunk.content)
+        if closed is not None:
+            return closed
+    return scanner.partial()
+
+
+async def stream_json_object(llm, messages: List) -> str:
+    """Stream a completion and stop generating as soon as the top-level JSON object closes."""
+    scanner = JsonObjectScanner()
+    async with llm_limiter.slot():
+        with span("llm.stream"):
+            stream = llm.astream(messages)
+            try:
+                # Generation stops when the caller's deadline passes; nobody is waiting for the answer
+                return await asyncio.wait_for(_read_json_object(stream, scanner), timeout=cap_timeout(None))
+            except asyncio.TimeoutError:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded during model call")
+            finally:
+                await stream.aclose()
+                record_llm_tokens("".join(_message_text(message) for message in messages), scanner.text)
+                debug_log("llm.stream", completion=scanner.text)
+
+
+async def invoke_structured(llm, messages: List, response_model: Type[BaseModel]) -> Dict:
+    """Stream, parse and validate a JSON answer against response_model.
+
+    Invalid output is sent back to the model with the error for a bounded number of
+    repair attempts; after that a 502 is raised with the last raw output.
+    """
+    attempt_messages = list(messages)
+    for _ in range(STRUCTURED_OUTPUT_MAX_ATTEMPTS):
+        text = await stream_json_object(llm, attempt_messages)
+        try:
+            return response_model.model_validate(parse_json(text)).model_dump()
+        except (json.JSONDecodeError, ValidationError) as e:
+            if expired():
+                break  # No time left for a repair round
+            error = str(e).splitlines()[0]
+            attempt_messages = list(messages) + [
+                ("ai", text),
+                ("human", f"That response was not valid JSON for the requested format ({error}). "
+                          "Return ONLY the corrected JSON object.")
+            ]
+
+    raise HTTPException(
+        status_code=502,
+        detail=f"Error decoding response from SambaNova LLM after {STRUCTURED_OUTPUT_MAX_ATTEMPTS} attempts. Raw output: {text}"
+    )
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, Tuple
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from agent_common.instrumentation import warning_log
+
+# Startup warm-up runs in the background so the port opens at once; /ready answers 503 until it is done
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 30))  # Seconds per warm-up step
+
+
+class Readiness:
+    """Runs warm-up steps (heavy imports, client construction, connection setup) and reports progress."""
+
+    def __init__(self, steps: List[Tuple[str, Callable]]):
+        self.steps = steps
+        self.started = time.monotonic()
+        self.ready_after: Optional[float] = None
+        self.results = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    async def run(self):
+        for name, step in self.steps:
+            started = time.perf_counter()
+            try:
+                # Blocking steps (imports, client constructors) run on a thread so /ready stays responsive
+                result = step() if asyncio.iscoroutinefunction(step) else asyncio.to_thread(step)
+                await asyncio.wait_for(result, timeout=WARMUP_TIMEOUT)
+                self.results[name] = {"status": "ok"}
+            except Exception as e:
+                # Whatever failed is built lazily by the first request that needs it
+                warning_log("warmup.step_failed", f"Warm-up step '{name}' failed: {e!r}", step=name)
+                self.results[name] = {"status": "error", "error": repr(e)}
+            self.results[name]["seconds"] = round(time.perf_counter() - started, 4)
+        self.ready_after = time.monotonic() - self.started
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": round(self.ready_after, 4) if self.ready else None,
+            "steps": self.results,
+        }
+
+
+def add_warmup(app: FastAPI, steps: Optional[List[Tuple[str, Callable]]] = None) -> Readiness:
+    """Run steps after startup, alongside the app's own lifespan, and add a GET /ready endpoint."""
+    readiness = Readiness(steps or [])
+    app.state.readiness = readiness  # Also run directly by the orchestrator's in-process transport
+    inner_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with inner_lifespan(app) as state:
+            task = asyncio.create_task(readiness.run())
+            try:
+                yield state
+            finally:
+                task.cancel()
+
+    app.router.lifespan_context = lifespan
+
+    async def ready():
+        return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+    app.add_api_route("/ready", ready, methods=["GET"], include_in_schema=False)
+    return readiness
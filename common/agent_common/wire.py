@@ -0,0 +1,270 @@
+import gzip
+import io
+import json
+import os
+from typing import Any, List, Optional
+from agent_common.instrumentation import warning_log
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Wire format between the orchestrator and the agents, negotiated per request: Content-Type/Accept
+# choose JSON or msgpack, Content-Encoding/Accept-Encoding choose zstd, gzip or no compression
+WIRE_COMPRESSION = [name.strip() for name in os.getenv("WIRE_COMPRESSION", "zstd,gzip").lower().split(",") if name.strip()]  # Preference order
+WIRE_COMPRESSION_MIN_BYTES = int(os.getenv("WIRE_COMPRESSION_MIN_BYTES", 1024))  # Smaller bodies are not worth compressing
+WIRE_FORMAT = os.getenv("WIRE_FORMAT", "json").lower()  # Body encoding callers prefer: json or msgpack
+WIRE_MAX_BODY_BYTES = int(os.getenv("WIRE_MAX_BODY_BYTES", 64 * 1024 * 1024))  # Larger (decompressed) request bodies get 413
+GZIP_LEVEL = int(os.getenv("WIRE_GZIP_LEVEL", 6))
+ZSTD_LEVEL = int(os.getenv("WIRE_ZSTD_LEVEL", 3))
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MEDIA_TYPE_ALIASES = {"application/json": JSON, "application/msgpack": MSGPACK, "application/x-msgpack": MSGPACK}
+
+if "zstd" in WIRE_COMPRESSION and zstandard is None:
+    warning_log("wire.no_zstandard", "WIRE_COMPRESSION lists zstd but the 'zstandard' package is not installed; skipping it")
+if WIRE_FORMAT == "msgpack" and msgpack is None:
+    warning_log("wire.no_msgpack", "WIRE_FORMAT is msgpack but the 'msgpack' package is not installed; falling back to JSON")
+
+
+def supported_encodings() -> List[str]:
+    """Content codings this process can read and write, in preference order."""
+    available = {"gzip": True, "zstd": zstandard is not None}
+    return [name for name in WIRE_COMPRESSION if available.get(name)]
+
+
+def supported_media_types() -> List[str]:
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def preferred_media_type() -> str:
+    return MSGPACK if WIRE_FORMAT == "msgpack" and msgpack is not None else JSON
+
+
+# -----------------------------
+# Codecs
+# -----------------------------
+def dumps(obj: Any) -> bytes:
+    """Compact JSON; orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def encode(obj: Any, media_type: str = JSON) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    return dumps(obj)
+
+
+def decode(data: bytes, media_type: Optional[str] = JSON) -> Any:
+    if media_type_of(media_type) == MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    return loads(data)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return data
+
+
+def decompress(data: bytes, encoding: str, max_size: int = WIRE_MAX_BODY_BYTES) -> bytes:
+    # Bounded output so a small compressed body cannot expand without limit
+    if encoding == "zstd":
+        with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+            result = reader.read(max_size + 1)
+    elif encoding == "gzip":
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as reader:
+            result = reader.read(max_size + 1)
+    else:
+        result = data
+    if len(result) > max_size:
+        raise OverflowError(f"Decompressed body exceeds {max_size} bytes")
+    return result
+
+
+# -----------------------------
+# Negotiation
+# -----------------------------
+def media_type_of(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    return MEDIA_TYPE_ALIASES.get(content_type.split(";")[0].strip().lower())
+
+
+def parse_header_list(value: Optional[str]) -> List[str]:
+    return [item.split(";")[0].strip().lower() for item in (value or "").split(",") if item.strip()]
+
+
+def negotiate(header: Optional[str], offered: List[str], wildcard: str) -> Optional[str]:
+    """Pick from offered (in our preference order) the value with the highest q in an Accept-style header."""
+    weights = {}
+    for item in (header or "").split(","):
+        name, *params = [part.strip().lower() for part in item.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[MEDIA_TYPE_ALIASES.get(name, name)] = q
+    best, best_q = None, 0.0
+    for value in offered:
+        q = weights.get(value, weights.get(wildcard, 0.0))
+        if q > best_q:
+            best, best_q = value, q
+    return best
+
+
+def advertised_headers() -> List[tuple]:
+    # RFC 7694: Accept-Encoding on a response lists codings the server accepts in requests;
+    # Accept-Post lists the request media types it accepts
+    return [
+        (b"accept-encoding", ", ".join(supported_encodings()).encode() or b"identity"),
+        (b"accept-post", ", ".join(supported_media_types()).encode()),
+    ]
+
+
+# -----------------------------
+# ASGI middleware
+# -----------------------------
+async def _send_error(send, status: int, detail: str):
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", JSON.encode()), (b"content-length", str(len(body)).encode())] + advertised_headers(),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class WireMiddleware:
+    """Content negotiation for agent endpoints.
+
+    Compressed and msgpack request bodies reach the app as plain JSON; JSON responses are
+    re-encoded to the caller's best Accept / Accept-Encoding match. Streaming and non-JSON
+    responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.lower(): value.decode("latin-1") for name, value in scope.get("headers") or []}
+        encoding = headers.get(b"content-encoding", "identity").strip().lower() or "identity"
+        media_type = media_type_of(headers.get(b"content-type"))
+        if encoding != "identity" and encoding not in supported_encodings():
+            await _send_error(send, 415, f"Unsupported Content-Encoding '{encoding}'")
+            return
+        if media_type == MSGPACK and msgpack is None:
+            await _send_error(send, 415, "msgpack request bodies are not supported")
+            return
+
+        if encoding != "identity" or media_type == MSGPACK:
+            body = bytearray()
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if len(body) > WIRE_MAX_BODY_BYTES:
+                    await _send_error(send, 413, "Request body too large")
+                    return
+                if not message.get("more_body"):
+                    break
+            try:
+                body = decompress(bytes(body), encoding)
+                if media_type == MSGPACK:
+                    body = dumps(decode(body, MSGPACK))
+            except OverflowError as e:
+                await _send_error(send, 413, str(e))
+                return
+            except Exception as e:
+                await _send_error(send, 400, f"Could not decode request body: {e}")
+                return
+
+            scope = dict(scope, headers=[
+                (name, value) for name, value in scope["headers"]
+                if name.lower() not in (b"content-encoding", b"content-length", b"content-type")
+            ] + [(b"content-type", JSON.encode()), (b"content-length", str(len(body)).encode())])
+            receive = _replay(body, receive)
+
+        response_media_type = negotiate(headers.get(b"accept"), supported_media_types(), "*/*") or JSON
+        response_encoding = negotiate(headers.get(b"accept-encoding"), supported_encodings(), "*")
+        await self.app(scope, receive, _ResponseEncoder(send, response_media_type, response_encoding))
+
+
+def _replay(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()  # Disconnect notifications still come from the server
+
+    return replay
+
+
+class _ResponseEncoder:
+    def __init__(self, send, media_type: str, encoding: Optional[str]):
+        self.send = send
+        self.media_type = media_type
+        self.encoding = encoding
+        self.start = None
+        self.body = bytearray()
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = list(message.get("headers", [])) + advertised_headers() + [(b"vary", b"Accept, Accept-Encoding")]
+            names = {name.lower(): value for name, value in headers}
+            is_json = media_type_of(names.get(b"content-type", b"").decode("latin-1")) == JSON
+            if is_json and b"content-encoding" not in names and (self.media_type != JSON or self.encoding):
+                self.start = dict(message, headers=headers)  # Held until the whole body is in
+                return
+            message = dict(message, headers=headers)
+        elif message["type"] == "http.response.body" and self.start is not None:
+            self.body += message.get("body", b"")
+            if message.get("more_body"):
+                return
+            await self._send_encoded()
+            return
+        await self.send(message)
+
+    async def _send_encoded(self):
+        body = bytes(self.body)
+        headers = [(name, value) for name, value in self.start["headers"] if name.lower() not in (b"content-length", b"content-type")]
+        content_type = JSON
+        if self.media_type == MSGPACK and body:
+            body = encode(loads(body), MSGPACK)
+            content_type = MSGPACK
+        headers.append((b"content-type", content_type.encode()))
+        if self.encoding and len(body) >= WIRE_COMPRESSION_MIN_BYTES:
+            body = compress(body, self.encoding)
+            headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await self.send(dict(self.start, headers=headers))
+        await self.send({"type": "http.response.body", "body": body})